@@ -0,0 +1,199 @@
+"""
+效能基準測試：在合成的遊戲檔案上量測各處理階段，並與 baselines.json 比較。
+
+    python -m benchmarks.run                     # quick 規模，與基準比較
+    python -m benchmarks.run --spec full         # 4096² 圖集等完整規模
+    python -m benchmarks.run --update-baseline   # 以本次結果更新基準
+
+基準以「校正迴圈」的耗時正規化，使不同速度的機器可以共用同一份基準。
+任何項目超出基準 (1 + tolerance) 倍時以結束代碼 1 結束。
+"""
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import UnityPy
+
+import sk_cht
+from benchmarks import synthetic
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+CALIBRATION_BYTES = 64 * 1024 * 1024
+# 低於此差距 (秒) 的變動視為雜訊，避免毫秒級的項目誤報退步
+NOISE_FLOOR = 0.02
+
+
+def calibrate():
+    """固定的 CPU 與記憶體工作量 (SHA-256 與大區塊複製)，不依賴任何專案程式碼"""
+    data = bytes(CALIBRATION_BYTES)
+    start = time.perf_counter()
+    hashlib.sha256(data).digest()
+    bytearray(data)
+    return time.perf_counter() - start
+
+
+def _load(path):
+    env = UnityPy.load(path)
+    env.typetree_generator = sk_cht.create_typetree_generator()
+    return env
+
+
+def case_text_assets(game):
+    env = _load(game.paths["TEXT_ASSETS_FILE_PATH"])
+    return lambda: sk_cht.process_text_assets(env, synthetic.TEXT_FOLDER)
+
+
+def case_font(game):
+    env = _load(game.paths["BUNDLE_FILE_PATH"])
+    fonts = list(sk_cht.get_object_index(env).of_type(sk_cht.ClassIDType.MonoBehaviour))
+    return lambda: [sk_cht.process_font(obj) for obj in fonts]
+
+
+def case_material(game):
+    env = _load(game.paths["BUNDLE_FILE_PATH"])
+    materials = list(sk_cht.get_object_index(env).of_type(sk_cht.ClassIDType.Material))
+    return lambda: [sk_cht.process_material(obj) for obj in materials]
+
+
+def case_ress_texture_group(game):
+    env = _load(game.paths["BUNDLE_FILE_PATH"])
+    textures = [
+        obj.read() for obj in sk_cht.get_object_index(env).of_type(sk_cht.ClassIDType.Texture2D)
+    ]
+    textures.sort(key=lambda data: int(data.m_StreamData.offset))
+    return lambda: sk_cht.process_ress_texture_group(textures)
+
+
+def case_run_modding(game):
+    # 每次量測都從原始遊戲檔案開始，避免增量修補直接略過
+    pristine = game.root + ".pristine"
+    if not os.path.exists(pristine):
+        shutil.copytree(game.root, pristine)
+    else:
+        shutil.rmtree(game.root)
+        shutil.copytree(pristine, game.root)
+
+    def run():
+        if not sk_cht.run_modding(synthetic.TEXT_FOLDER, "new", assume_yes=True):
+            raise RuntimeError("run_modding 失敗")
+
+    return run
+
+
+CASES = {
+    "process_text_assets": case_text_assets,
+    "process_font": case_font,
+    "process_material": case_material,
+    "process_ress_texture_group": case_ress_texture_group,
+    "run_modding": case_run_modding,
+}
+
+
+def measure(game, work_folder, setup, repeat):
+    """回傳最佳耗時；每次量測前重新載入並使用全新的快取資料夾 (冷快取)"""
+    best = None
+    for attempt in range(repeat):
+        work_root = os.path.join(work_folder, f"work-{attempt}")
+        synthetic.configure(game, work_root)
+        os.makedirs(work_root, exist_ok=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            func = setup(game)
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+        shutil.rmtree(work_root, ignore_errors=True)
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_suite(spec_name="quick", repeat=3, names=None, workers=None):
+    """產生合成資料並量測指定項目，回傳 (校正耗時, {項目: 秒})"""
+    spec = synthetic.SPECS[spec_name]
+    if workers is not None:
+        sk_cht.Config.MAX_WORKERS = workers
+        sk_cht.Config.TEXTURE_WORKERS = workers
+        sk_cht.Config.BC7_WORKERS = workers
+    calibration = min(calibrate() for _ in range(3))
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="sk_cht_bench_") as root:
+        game = synthetic.generate_game(root, spec)
+        for name, setup in CASES.items():
+            if names and name not in names:
+                continue
+            results[name] = measure(game, root, setup, repeat)
+    return calibration, results
+
+
+def load_baselines():
+    if not os.path.exists(BASELINE_PATH):
+        return {}
+    with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(spec_name, calibration, results, baselines, tolerance):
+    """印出比較表，回傳超出容許範圍的項目"""
+    reference = baselines.get(spec_name, {})
+    regressions = []
+    print(f"\n規模: {spec_name}  校正耗時: {calibration:.3f}s")
+    print(f"{'項目':<28}{'耗時 (s)':>10}{'正規化':>10}{'基準':>10}{'比例':>8}")
+    for name, elapsed in results.items():
+        score = elapsed / calibration
+        base = reference.get(name)
+        ratio = score / base if base else None
+        flag = ""
+        if (
+            ratio is not None
+            and ratio > 1 + tolerance
+            and elapsed - base * calibration > NOISE_FLOOR
+        ):
+            regressions.append(name)
+            flag = "  <-- 退步"
+        print(
+            f"{name:<28}{elapsed:>10.3f}{score:>10.2f}"
+            f"{base if base is not None else float('nan'):>10.2f}"
+            f"{ratio if ratio is not None else float('nan'):>8.2f}{flag}"
+        )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark sk_cht on synthetic Unity files")
+    parser.add_argument("--spec", choices=sorted(synthetic.SPECS), default="quick")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the best is kept")
+    parser.add_argument("--case", action="append", choices=sorted(CASES), help="Only run CASE")
+    parser.add_argument("--jobs", type=int, help="Worker processes for pipelines and encoding")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.3, help="Allowed slowdown over baseline (0.3 = 30%%)"
+    )
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    calibration, results = run_suite(args.spec, max(1, args.repeat), args.case, args.jobs)
+    baselines = load_baselines()
+    regressions = compare(args.spec, calibration, results, baselines, args.tolerance)
+
+    if args.update_baseline:
+        baselines.setdefault(args.spec, {}).update(
+            {name: round(elapsed / calibration, 3) for name, elapsed in results.items()}
+        )
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\n已更新基準: {BASELINE_PATH}")
+        return 0
+    if regressions:
+        print(f"\n[警告] 效能退步: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
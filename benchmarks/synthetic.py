@@ -0,0 +1,313 @@
+"""產生效能測試用的合成遊戲檔案與 CHT 資源 (內容由亂數種子決定，可重現)"""
+import json
+import os
+import random
+from dataclasses import dataclass
+
+from PIL import Image, ImageFilter
+
+import sk_cht
+from benchmarks.unity_builders import (
+    build_bundle_file,
+    build_serialized_file,
+    make_typetree_node,
+    tpk_typetree_node,
+)
+
+SEED = 20250904
+TEXT_ASSET_NAMES = [
+    "ZH_Achievements", "ZH_AutoSaveNames", "ZH_Belltown", "ZH_Bonebottom",
+    "ZH_Caravan", "ZH_City", "ZH_Coral", "ZH_Crawl", "ZH_Credits List",
+    "ZH_Deprecated", "ZH_Dust", "ZH_Enclave", "ZH_Error", "ZH_Fast Travel",
+    "ZH_Forge", "ZH_General", "ZH_Greymoor", "ZH_Inspect", "ZH_Journal",
+    "ZH_Lore", "ZH_MainMenu", "ZH_Map Zones", "ZH_Peak", "ZH_Pilgrims",
+    "ZH_Prompts", "ZH_Quests", "ZH_Shellwood", "ZH_Shop", "ZH_Song",
+    "ZH_Titles", "ZH_Tools", "ZH_UI", "ZH_Under", "ZH_Wanderers",
+    "ZH_Weave", "ZH_Wilds",
+]
+TEXT_FOLDER = "Text_Re"
+FONT_CAB = "CAB-fonts"
+BC7 = 25
+
+
+@dataclass(frozen=True)
+class SyntheticSpec:
+    """合成資料的規模"""
+
+    text_assets: int  # resources.assets 中的 TextAsset 總數 (含 36 個 ZH_ 目標)
+    text_bytes: int  # 每個目標文本的位元組數
+    glyphs: int  # 每個 TMP 字型的字形數
+    texture_size: int  # 字型圖集的邊長 (BC7，存放於 .resS)
+    map_texts: int  # 地圖 Bundle 中引用字型的 MonoBehaviour 數
+
+
+SPECS = {
+    "tiny": SyntheticSpec(text_assets=60, text_bytes=2_000, glyphs=200, texture_size=64, map_texts=10),
+    "quick": SyntheticSpec(
+        text_assets=2_000, text_bytes=200_000, glyphs=20_000, texture_size=1024, map_texts=200
+    ),
+    "full": SyntheticSpec(
+        text_assets=20_000, text_bytes=1_000_000, glyphs=60_000, texture_size=4096, map_texts=2_000
+    ),
+}
+
+
+def default_value(node):
+    """依 TypeTree 節點建立預設值 (數值為 0、字串與陣列為空)"""
+    children = node.m_Children
+    if node.m_Type == "string":
+        return ""
+    if node.m_Type == "TypelessData":
+        return b""
+    if children and children[0].m_Type == "Array":
+        return []
+    if node.m_Type == "pair":
+        return (default_value(children[0]), default_value(children[1]))
+    if children:
+        return {child.m_Name: default_value(child) for child in children}
+    if node.m_Type in ("float", "double"):
+        return 0.0
+    if node.m_Type == "bool":
+        return False
+    return 0
+
+
+def pptr_nodes(level, typ, name):
+    return [(level, typ, name, 12, 0), (level + 1, "int", "m_FileID", 4, 0),
+            (level + 1, "SInt64", "m_PathID", 8, 0)]
+
+
+def string_nodes(level, name):
+    return [(level, "string", name, -1, 0x8000), (level + 1, "Array", "Array", -1, 0x4001),
+            (level + 2, "int", "size", 4, 1), (level + 2, "char", "data", 1, 1)]
+
+
+def mono_header_nodes():
+    nodes = [(0, "MonoBehaviour", "Base", -1, 0)]
+    nodes += pptr_nodes(1, "PPtr<GameObject>", "m_GameObject")
+    nodes += [(1, "UInt8", "m_Enabled", 1, 0x4000)]
+    nodes += pptr_nodes(1, "PPtr<MonoScript>", "m_Script")
+    nodes += string_nodes(1, "m_Name")
+    return nodes
+
+
+def tmp_font_node():
+    """TMP_FontAsset (舊版字形格式) 的精簡 TypeTree"""
+    nodes = mono_header_nodes()
+    nodes += [(1, "int", "hashCode", 4, 0), (1, "FaceInfo_Legacy", "m_fontInfo", -1, 0)]
+    nodes += string_nodes(2, "Name")
+    nodes += [(2, "float", field, 4, 0) for field in (
+        "PointSize", "Scale", "LineHeight", "Ascender", "Baseline", "Descender",
+        "Padding", "AtlasWidth", "AtlasHeight",
+    )]
+    nodes += pptr_nodes(1, "PPtr<Texture2D>", "atlas")
+    nodes += [(1, "vector", "m_glyphInfoList", -1, 0), (2, "Array", "Array", -1, 0x4000),
+              (3, "int", "size", 4, 0), (3, "TMP_Glyph", "data", -1, 0)]
+    nodes += [(4, "int" if field == "id" else "float", field, 4, 0) for field in sk_cht.GLYPH_FIELDS]
+    nodes += pptr_nodes(1, "PPtr<Material>", "material")
+    return make_typetree_node(nodes)
+
+
+def map_text_node():
+    """地圖文字元件：含指向中文字型的 fontZH"""
+    nodes = mono_header_nodes()
+    nodes += pptr_nodes(1, "PPtr<TMP_FontAsset>", "fontZH")
+    nodes += string_nodes(1, "key")
+    return make_typetree_node(nodes)
+
+
+def _glyphs(rng, count, scale=1.0):
+    return [
+        {
+            "id": 0x4E00 + index,
+            "x": float(rng.randrange(4096)),
+            "y": float(rng.randrange(4096)),
+            "width": 64.0 * scale,
+            "height": 66.0 * scale,
+            "xOffset": rng.uniform(-2, 2),
+            "yOffset": 57.0,
+            "xAdvance": 67.0 * scale,
+            "scale": 1.0,
+        }
+        for index in range(count)
+    ]
+
+
+def _font_info(name, size):
+    return {
+        "Name": name, "PointSize": 67.0, "Scale": 1.0, "LineHeight": 90.0,
+        "Ascender": 70.0, "Baseline": 0.0, "Descender": -20.0, "Padding": 5.0,
+        "AtlasWidth": float(size), "AtlasHeight": float(size),
+    }
+
+
+def _mono(name, path_id=0, **fields):
+    pptr = {"m_FileID": 0, "m_PathID": path_id}
+    return {"m_GameObject": pptr, "m_Enabled": 1, "m_Script": pptr, "m_Name": name, **fields}
+
+
+def _texture(name, size, offset, resS_path):
+    node = tpk_typetree_node(28)
+    value = default_value(node)
+    data_size = size * size  # BC7：每像素 1 位元組
+    value.update(
+        m_Name=name, m_Width=size, m_Height=size, m_CompleteImageSize=data_size,
+        m_TextureFormat=BC7, m_MipCount=1, m_ImageCount=1, m_TextureDimension=2,
+        m_StreamData={"offset": offset, "size": data_size, "path": resS_path},
+    )
+    value["m_TextureSettings"].update(m_FilterMode=1, m_Aniso=1)
+    return node, value, data_size
+
+
+def _material(name):
+    node = tpk_typetree_node(21)
+    value = default_value(node)
+    value["m_Name"] = name
+    value["m_SavedProperties"]["m_Floats"] = [
+        ("_TextureWidth", 1024.0), ("_TextureHeight", 1024.0),
+        *((f"_Property{index}", float(index)) for index in range(40)),
+    ]
+    return node, value
+
+
+def atlas_image(size, seed):
+    """白色字形圖集：alpha 為模糊後的亂數，近似 SDF 的平滑分佈"""
+    rng = random.Random(seed)
+    alpha = Image.frombytes("L", (size, size), rng.randbytes(size * size))
+    alpha = alpha.filter(ImageFilter.BoxBlur(2))
+    white = Image.new("L", (size, size), 255)
+    return Image.merge("RGBA", (white, white, white, alpha))
+
+
+def build_font_bundle(spec):
+    rng = random.Random(SEED)
+    font_node = tmp_font_node()
+    objects, offset = [], 0
+    for path_id, name in ((1, "chinese_body"), (2, "chinese_body_bold")):
+        objects.append((path_id, 114, font_node, _mono(
+            name, hashCode=path_id, m_fontInfo=_font_info("Old Font", 1024),
+            atlas={"m_FileID": 0, "m_PathID": path_id + 4},
+            m_glyphInfoList=_glyphs(rng, spec.glyphs // 2),
+            material={"m_FileID": 0, "m_PathID": path_id + 2},
+        )))
+    for path_id, name in ((3, "simsun_tmpro Material"), (4, "chinese_body_bold Material")):
+        objects.append((path_id, 21, *_material(name)))
+    resS_path = f"archive:/{FONT_CAB}/{FONT_CAB}.resS"
+    for path_id, name in ((5, "chinese_body Atlas"), (6, "chinese_body_bold Atlas")):
+        node, value, data_size = _texture(name, spec.texture_size, offset, resS_path)
+        objects.append((path_id, 28, node, value))
+        offset += data_size
+    serialized = build_serialized_file(objects)
+    return build_bundle_file([(FONT_CAB, serialized, 4), (f"{FONT_CAB}.resS", bytes(offset), 0)])
+
+
+def build_title_bundle():
+    cab = "CAB-title"
+    node, value, data_size = _texture(
+        "sactx-0-1024x1024-BC7-Title-00000000", 256, 0, f"archive:/{cab}/{cab}.resS"
+    )
+    serialized = build_serialized_file([(1, 28, node, value)])
+    return build_bundle_file([(cab, serialized, 4), (f"{cab}.resS", bytes(data_size), 0)])
+
+
+def build_map_bundle(spec):
+    node = map_text_node()
+    objects = [
+        (index + 1, 114, node, _mono(
+            f"MapText{index}", fontZH={"m_FileID": 0, "m_PathID": 0}, key=f"MAP_{index}"
+        ))
+        for index in range(spec.map_texts)
+    ]
+    return build_bundle_file([("CAB-maps", build_serialized_file(objects), 4)])
+
+
+def build_text_assets(spec):
+    rng = random.Random(SEED + 1)
+    node = tpk_typetree_node(49)
+    names = TEXT_ASSET_NAMES + [f"Filler_{index}" for index in range(spec.text_assets - 36)]
+    objects = [
+        (index + 1, 49, node, {"m_Name": name, "m_Script": "x" * rng.randrange(200, 4000)})
+        for index, name in enumerate(names)
+    ]
+    return build_serialized_file(objects)
+
+
+def _text_body(rng, size):
+    line = "「繁體中文化」效能測試文本，" * 4
+    lines, total = [], 0
+    while total < size:
+        entry = f"KEY_{rng.randrange(1 << 30)}={line}\n"
+        lines.append(entry)
+        total += len(entry.encode("utf-8"))
+    return "".join(lines)
+
+
+def build_cht_folder(root, spec):
+    """建立 CHT 資料夾：文本、字型 JSON、圖集 PNG 與標題 Logo"""
+    rng = random.Random(SEED + 2)
+    cht = os.path.join(root, "CHT")
+    text_folder = os.path.join(cht, TEXT_FOLDER)
+    font_folder = os.path.join(cht, "font_new")
+    logo_folder = os.path.join(cht, "logo")
+    for folder in (text_folder, font_folder, logo_folder):
+        os.makedirs(folder, exist_ok=True)
+
+    for name in TEXT_ASSET_NAMES:
+        with open(os.path.join(text_folder, f"{name}.txt"), "w", encoding="utf-8") as f:
+            f.write(_text_body(rng, spec.text_bytes))
+    for name in ("chinese_body", "chinese_body_bold"):
+        source = {
+            "m_fontInfo": _font_info("Noto Serif CJK TC", 4096),
+            "m_glyphInfoList": _glyphs(rng, spec.glyphs, scale=1.1),
+        }
+        with open(os.path.join(font_folder, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(source, f)
+    for seed, name in enumerate(("chinese_body Atlas", "chinese_body_bold Atlas")):
+        png_name = f"{sk_cht.sanitize_filename(name)}.png"
+        atlas_image(spec.texture_size, SEED + seed).save(os.path.join(font_folder, png_name))
+    atlas_image(256, SEED + 9).save(os.path.join(logo_folder, "logo.png"))
+    return cht
+
+
+@dataclass(frozen=True)
+class SyntheticGame:
+    root: str
+    cht: str
+    paths: dict  # Config 屬性名稱 -> 檔案路徑
+
+
+def generate_game(root, spec):
+    """於 root 下建立遊戲檔案與 CHT 資源，回傳各路徑"""
+    game = os.path.join(root, "game")
+    data = os.path.join(game, "Synthetic_Data")
+    os.makedirs(data, exist_ok=True)
+    files = {
+        "BUNDLE_FILE_PATH": ("fonts_assets_chinese.bundle", build_font_bundle(spec)),
+        "TEXT_ASSETS_FILE_PATH": ("resources.assets", build_text_assets(spec)),
+        "TITLE_BUNDLE_PATH": ("title.spriteatlas.bundle", build_title_bundle()),
+        "MAP_FONT_BUNDLE_PATH": ("maps_assets_all.bundle", build_map_bundle(spec)),
+    }
+    paths = {}
+    for attr, (name, content) in files.items():
+        paths[attr] = os.path.join(data, name)
+        with open(paths[attr], "wb") as f:
+            f.write(content)
+    return SyntheticGame(root=game, cht=build_cht_folder(root, spec), paths=paths)
+
+
+def configure(game, work_root):
+    """
+    將 Config 指向合成遊戲；備份、紀錄與快取放在 work_root，
+    每次量測使用新的 work_root 即可從冷快取開始。
+    """
+    for attr, path in game.paths.items():
+        setattr(sk_cht.Config, attr, path)
+    sk_cht.Config.GAME_ROOT_PATH = game.root
+    sk_cht.Config.CHT_FOLDER_PATH = game.cht
+    sk_cht.Config.CURRENT_ASSET_FOLDER = os.path.join(game.cht, "font_new")
+    sk_cht.Config.LOGO_SOURCE_FOLDER = os.path.join(game.cht, "logo")
+    sk_cht.Config.BACKUP_FOLDER = os.path.join(work_root, "Backup")
+    sk_cht.Config.MANIFEST_PATH = os.path.join(work_root, "Backup_manifest.json")
+    sk_cht.Config.JOURNAL_PATH = os.path.join(work_root, "Backup_journal.json")
+    sk_cht.Config.CACHE_FOLDER = os.path.join(work_root, "cht_cache")
+    sk_cht.Config.PREBAKED_PACK_PATH = ""
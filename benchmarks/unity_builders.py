@@ -0,0 +1,142 @@
+"""以位元組建立最小的 Unity 檔案 (SerializedFile、UnityFS Bundle)，供效能測試與單元測試共用"""
+
+
+def build_serialized_file(objects, unity_version="6000.0.50f1", version=22):
+    """
+    以位元組建立最小的 SerializedFile (含 TypeTree)。
+    objects: [(path_id, class_id, node, value_dict)]
+    """
+    from UnityPy.helpers import TypeTreeHelper
+    from UnityPy.streams import EndianBinaryWriter
+
+    types, type_index, datas = [], {}, []
+    for path_id, class_id, node, value in objects:
+        if class_id not in type_index:
+            type_index[class_id] = len(types)
+            types.append((class_id, node))
+        data_writer = EndianBinaryWriter(endian="<")
+        TypeTreeHelper.write_typetree(value, node, data_writer)
+        datas.append((path_id, type_index[class_id], data_writer.bytes))
+
+    meta = EndianBinaryWriter(endian="<")
+    meta.write_string_to_null(unity_version)
+    meta.write_int(19)  # StandaloneWindows64
+    meta.write_boolean(True)
+    meta.write_int(len(types))
+    for class_id, node in types:
+        meta.write_int(class_id)
+        meta.write_boolean(False)
+        meta.write_short(-1)
+        if class_id == 114:
+            meta.write_bytes(bytes(16))
+        meta.write_bytes(bytes(16))
+        node.dump_blob(meta, version)
+        meta.write_int(0)  # type dependencies
+
+    data = EndianBinaryWriter(endian="<")
+    meta.write_int(len(datas))
+    for path_id, type_id, raw in datas:
+        meta.align_stream()
+        meta.write_long(path_id)
+        meta.write_long(data.Position)
+        meta.write_u_int(len(raw))
+        meta.write_int(type_id)
+        data.write(raw)
+        data.align_stream(8)
+    meta.write_int(0)  # script types
+    meta.write_int(0)  # externals
+    meta.write_int(0)  # ref types
+    meta.write_string_to_null("")
+
+    metadata = meta.bytes
+    data_offset = 48 + len(metadata)
+    data_offset += (16 - data_offset % 16) % 16
+    writer = EndianBinaryWriter()
+    for value in (0, 0, version, 0):
+        writer.write_u_int(value)
+    writer.write_boolean(False)
+    writer.write_bytes(bytes(3))
+    writer.write_u_int(len(metadata))
+    writer.write_long(data_offset + data.Length)
+    writer.write_long(data_offset)
+    writer.write_long(0)
+    writer.write_bytes(metadata)
+    writer.align_stream(16)
+    writer.write_bytes(data.bytes)
+    return writer.bytes
+
+
+def make_typetree_node(nodes):
+    """由 (level, type, name, byte_size, meta_flag) 清單建立可寫入 blob 的 TypeTree"""
+    from UnityPy.helpers.TypeTreeNode import TypeTreeNode
+
+    return TypeTreeNode.from_list(
+        [
+            {
+                "m_Level": level,
+                "m_Type": typ,
+                "m_Name": name,
+                "m_ByteSize": byte_size,
+                "m_Version": 1,
+                "m_TypeFlags": 1 if typ == "Array" else 0,
+                "m_Index": index,
+                "m_MetaFlag": meta_flag,
+                "m_RefTypeHash": 0,
+            }
+            for index, (level, typ, name, byte_size, meta_flag) in enumerate(nodes)
+        ]
+    )
+
+
+def tpk_typetree_node(class_id):
+    """取自 UnityPy 內建型別資料 (Unity 6000.0.50f1) 的 TypeTree 節點"""
+    from UnityPy.helpers.Tpk import get_typetree_node
+
+    def flatten(node):
+        yield (node.m_Level, node.m_Type, node.m_Name, node.m_ByteSize, node.m_MetaFlag or 0)
+        for child in node.m_Children:
+            yield from flatten(child)
+
+    return make_typetree_node(list(flatten(get_typetree_node(class_id, (6000, 0, 50, 1)))))
+
+
+def build_bundle_file(entries, unity_version="6000.0.50f1"):
+    """
+    以位元組建立未壓縮的 UnityFS Bundle。
+    entries: [(名稱, 內容 bytes, flags)]
+    """
+    from UnityPy.streams import EndianBinaryWriter
+
+    info = EndianBinaryWriter(b"\x00" * 0x10)
+    data = b"".join(content for _, content, _ in entries)
+    info.write_int(1)
+    info.write_u_int(len(data))
+    info.write_u_int(len(data))
+    info.write_u_short(64)
+    info.write_int(len(entries))
+    offset = 0
+    for name, content, flags in entries:
+        info.write_long(offset)
+        info.write_long(len(content))
+        info.write_u_int(flags)
+        info.write_string_to_null(name)
+        offset += len(content)
+    block_info = info.bytes
+
+    writer = EndianBinaryWriter()
+    writer.write_string_to_null("UnityFS")
+    writer.write_u_int(8)
+    writer.write_string_to_null("5.x.x")
+    writer.write_string_to_null(unity_version)
+    size_position = writer.Position
+    writer.write_long(0)
+    writer.write_u_int(len(block_info))
+    writer.write_u_int(len(block_info))
+    writer.write_u_int(64)
+    writer.align_stream(16)
+    writer.write_bytes(block_info)
+    writer.write_bytes(data)
+    end = writer.Position
+    writer.Position = size_position
+    writer.write_long(end)
+    return writer.bytes
@@ -1,47 +1,251 @@
+import collections
 import collections.abc
+import contextlib
 import ctypes
+import functools
+import gc
+import hashlib
 import json
+import lzma
+import mmap
+import multiprocessing
 import os
 import shutil
+import struct
 import sys
+import threading
 import time
 import traceback
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Sequence, Union
 
 import uuid
 import argparse
-import etcpak
-
-import UnityPy
-import UnityPy.config
+import importlib
 from io import BytesIO
-from PIL import Image
-from UnityPy.files import BundleFile, SerializedFile
-from UnityPy.files.SerializedFile import FileIdentifier
-from UnityPy.helpers.TypeTreeGenerator import TypeTreeGenerator
-from UnityPy.export import Texture2DConverter
-from UnityPy.streams import EndianBinaryReader
-from UnityPy.enums import ClassIDType, TextureFormat
+
+
+# ==============================================================================
+# --- 延遲匯入 ---
+# ==============================================================================
+class LazyImport:
+    """
+    首次使用時才匯入的模組或物件。UnityPy 的匯入需時約一秒，
+    選單、還原與檢查等不處理 Unity 檔案的路徑因此能立即啟動。
+    """
+
+    _SLOTS = ("_module", "_attr", "_on_load", "_target")
+
+    def __init__(self, module, attr=None, on_load=None):
+        self._module = module
+        self._attr = attr
+        self._on_load = on_load
+        self._target = None
+
+    def resolve(self):
+        if self._target is None:
+            target = importlib.import_module(self._module)
+            if self._attr:
+                target = getattr(target, self._attr)
+            self._target = target
+            if self._on_load:
+                self._on_load()
+        return self._target
+
+    def __getattr__(self, name):
+        # 複製或反序列化時內部屬性尚未設定，直接失敗以免 resolve 無限遞迴
+        if name in LazyImport._SLOTS:
+            raise AttributeError(name)
+        return getattr(self.resolve(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __getitem__(self, key):
+        return self.resolve()[key]
+
+    def __instancecheck__(self, obj):
+        return isinstance(obj, self.resolve())
+
+    def __repr__(self):
+        name = f"{self._module}.{self._attr}" if self._attr else self._module
+        return f"<LazyImport {name}>"
+
+
+def _unitypy(module, attr=None):
+    """UnityPy 相關匯入：任何一項載入時一併套用 BC7 補丁。"""
+    # ensure_bc7_patch 定義於後方，因此以 lambda 延後查找
+    return LazyImport(module, attr, on_load=lambda: ensure_bc7_patch())
+
+
+etcpak = LazyImport("etcpak")
+Image = LazyImport("PIL.Image")
+UnityPy = _unitypy("UnityPy")
+BundleFile = _unitypy("UnityPy.files", "BundleFile")
+SerializedFile = _unitypy("UnityPy.files", "SerializedFile")
+FileIdentifier = _unitypy("UnityPy.files.SerializedFile", "FileIdentifier")
+CompressionHelper = _unitypy("UnityPy.helpers.CompressionHelper")
+TypeTreeHelper = _unitypy("UnityPy.helpers.TypeTreeHelper")
+TypeTreeGenerator = _unitypy("UnityPy.helpers.TypeTreeGenerator", "TypeTreeGenerator")
+TypeTreeNode = _unitypy("UnityPy.helpers.TypeTreeNode", "TypeTreeNode")
+Texture2DConverter = _unitypy("UnityPy.export.Texture2DConverter")
+EndianBinaryReader = _unitypy("UnityPy.streams", "EndianBinaryReader")
+EndianBinaryWriter = _unitypy("UnityPy.streams", "EndianBinaryWriter")
+BuildTarget = _unitypy("UnityPy.enums", "BuildTarget")
+ClassIDType = _unitypy("UnityPy.enums", "ClassIDType")
+TextureFormat = _unitypy("UnityPy.enums", "TextureFormat")
 
 
 # ==============================================================================
 # --- Monkey-Patch for BC7 Compression ---
 # ==============================================================================
-print("[資訊] 應用 BC7 壓縮修正補丁...")
-original_compress_etcpak = Texture2DConverter.compress_etcpak
+original_compress_etcpak = None
+_bc7_patch_installed = False
+
+
+# BC7 編碼設定檔：balanced 即 etcpak 預設值
+BC7_PROFILES = {
+    # 只搜尋 mode 6、不做分割與最小平方法，適合反覆調整圖集時使用
+    "fast": {
+        "m_mode_mask": 1 << 6,
+        "m_max_partitions": 0,
+        "m_try_least_squares": False,
+        "m_mode17_partition_estimation_filterbank": False,
+    },
+    "balanced": {},
+    "max": {"m_uber_level": 4, "m_max_partitions": 64},
+}
+
+
+def make_bc7_params(profile):
+    params = etcpak.BC7CompressBlockParams()
+    for key, value in BC7_PROFILES[profile].items():
+        setattr(params, key, value)
+    return params
+
+
+def bc7_psnr(source: bytes, compressed: bytes, width: int, height: int) -> float:
+    """解碼 BC7 結果並計算與來源 RGBA 的 PSNR (dB)。"""
+    import math
+
+    import texture2ddecoder
+    from PIL import ImageChops, ImageStat
+
+    decoded = texture2ddecoder.decode_bc7(compressed, width, height)
+    original = Image.frombytes("RGBA", (width, height), source)
+    restored = Image.frombytes("RGBA", (width, height), decoded, "raw", "BGRA")
+    sum2 = ImageStat.Stat(ImageChops.difference(original, restored)).sum2
+    mse = sum(sum2) / (width * height * 4)
+    return float("inf") if mse == 0 else 10 * math.log10(255 ** 2 / mse)
+
+
+# 小於此像素數的紋理直接單次壓縮，避免程序池的啟動成本
+BC7_TILED_MIN_PIXELS = 1024 * 1024
+BC7_BLOCK_BYTES = 16
+
+
+def _compress_bc7_strip(strip: bytes, width: int, rows: int, profile: str) -> bytes:
+    return etcpak.compress_bc7(strip, width, rows, make_bc7_params(profile))
+
+
+# 目前這批紋理共用的條帶壓縮程序池 (見 bc7_strip_pool)
+_bc7_strip_executor = None
+
+
+@contextlib.contextmanager
+def bc7_strip_pool():
+    """
+    在一批紋理編碼期間共用同一個條帶壓縮程序池，避免每張紋理重新啟動程序。
+    子程序只在實際提交條帶時才建立，沒有大型 BC7 紋理時幾乎沒有成本。
+    """
+    global _bc7_strip_executor
+    if _bc7_strip_executor is not None or Config.BC7_WORKERS <= 1:
+        yield _bc7_strip_executor
+        return
+    with ProcessPoolExecutor(max_workers=Config.BC7_WORKERS) as executor:
+        _bc7_strip_executor = executor
+        try:
+            yield executor
+        finally:
+            _bc7_strip_executor = None
+
+
+def compress_bc7_tiled(data, width, height, profile, workers, executor=None):
+    """
+    將 RGBA 緩衝區切成高度為 4 倍數的水平條帶並平行壓縮。BC7 區塊彼此獨立，
+    依序寫回預先配置的輸出緩衝區後，結果與單次呼叫完全相同。
+    executor 未指定時建立僅供本次使用的程序池。
+    """
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return compress_bc7_tiled(data, width, height, profile, workers, executor)
+
+    row_bytes = width * 4
+    block_rows = height // 4
+    # 條帶數多於工作數，讓先完成的程序能接手剩餘條帶
+    strip_blocks = max(1, -(-block_rows // (workers * 4)))
+    out_row_bytes = (width // 4) * BC7_BLOCK_BYTES
+    output = bytearray(out_row_bytes * block_rows)
+    futures = {}
+    for first in range(0, block_rows, strip_blocks):
+        count = min(strip_blocks, block_rows - first)
+        strip = data[first * 4 * row_bytes:(first + count) * 4 * row_bytes]
+        future = executor.submit(_compress_bc7_strip, strip, width, count * 4, profile)
+        futures[future] = first
+    for future in futures:
+        first = futures[future]
+        compressed = future.result()
+        output[first * out_row_bytes:first * out_row_bytes + len(compressed)] = compressed
+    return bytes(output)
 
 
 def patched_compress_etcpak(
     data: bytes, width: int, height: int, target_texture_format: TextureFormat
 ) -> bytes:
     if target_texture_format == TextureFormat.BC7:
-        params = etcpak.BC7CompressBlockParams()
-        return etcpak.compress_bc7(data, width, height, params)
+        start = time.perf_counter()
+        if (
+            Config.BC7_WORKERS > 1
+            and width % 4 == 0
+            and height % 4 == 0
+            and height >= 8
+            and width * height >= BC7_TILED_MIN_PIXELS
+        ):
+            compressed = compress_bc7_tiled(
+                data, width, height, Config.BC7_PROFILE, Config.BC7_WORKERS,
+                _bc7_strip_executor,
+            )
+        else:
+            params = make_bc7_params(Config.BC7_PROFILE)
+            compressed = etcpak.compress_bc7(data, width, height, params)
+        if Config.REPORT_TEXTURE_PSNR:
+            elapsed = time.perf_counter() - start
+            psnr = bc7_psnr(data, compressed, width, height)
+            print(
+                f"    - [品質] BC7 ({Config.BC7_PROFILE}) {width}x{height}: "
+                f"PSNR {psnr:.2f} dB，耗時 {elapsed:.2f} 秒"
+            )
+        return compressed
     else:
         return original_compress_etcpak(data, width, height, target_texture_format)
 
 
-Texture2DConverter.compress_etcpak = patched_compress_etcpak
-print("[資訊] 補丁應用成功。")
+def ensure_bc7_patch():
+    """以 patched_compress_etcpak 取代 UnityPy 的 BC7 壓縮；重複呼叫不會重複套用。"""
+    global _bc7_patch_installed, original_compress_etcpak
+    if _bc7_patch_installed:
+        return
+    _bc7_patch_installed = True
+    converter = Texture2DConverter.resolve()
+    original_compress_etcpak = converter.compress_etcpak
+    converter.compress_etcpak = patched_compress_etcpak
 
 # ==============================================================================
 # --- 0. 執行環境與權限檢查 ---
@@ -59,28 +263,58 @@ def get_base_path():
 # --- FileWrapper 輔助類別 ---
 # ==============================================================================
 class FileWrapper:
-    def __init__(self, original_file, new_data_stream):
+    """
+    以新資料取代 Bundle 內的檔案。新資料可為 bytes、bytearray、memoryview、
+    BytesIO，或由多個片段組成的 list；片段一律以零複製的 memoryview 保存。
+    """
+
+    def __init__(self, original_file, new_data):
         self._original = original_file
-        self._stream = new_data_stream
+        if isinstance(new_data, BytesIO):
+            new_data = new_data.getbuffer()
+        if not isinstance(new_data, (list, tuple)):
+            new_data = [new_data]
+        self._segments = [memoryview(segment).cast("B") for segment in new_data]
+        self._length = sum(len(segment) for segment in self._segments)
+        self._position = 0
 
     @property
     def Length(self):
-        return len(self._stream.getbuffer())
+        return self._length
 
     @property
     def Position(self):
-        return self._stream.tell()
+        return self._position
 
     @Position.setter
     def Position(self, value):
-        self._stream.seek(value)
+        self._position = value
+
+    @property
+    def segments(self):
+        return self._segments
 
     def read_bytes(self, length):
-        return self._stream.read(length)
+        chunks, start, end = [], self._position, min(self._position + length, self._length)
+        segment_start = 0
+        for segment in self._segments:
+            segment_end = segment_start + len(segment)
+            if segment_end > start and segment_start < end:
+                chunks.append(segment[max(start - segment_start, 0):end - segment_start])
+            segment_start = segment_end
+        data = b"".join(chunks)
+        self._position += len(data)
+        return data
 
     def save(self):
-        self.Position = 0
-        return self._stream.read()
+        self._position = self._length
+        return b"".join(self._segments)
+
+    def getbuffer(self):
+        """回傳新資料的 memoryview；單一片段時為零複製。"""
+        if len(self._segments) == 1:
+            return self._segments[0]
+        return memoryview(self.save())
 
     def __getattr__(self, name):
         return getattr(self._original, name)
@@ -103,6 +337,9 @@ class Config:
 
     UNITY_VERSION: str = "6000.0.50f1"
     BACKUP_FOLDER: str = ""
+    MANIFEST_PATH: str = ""
+    CACHE_FOLDER: str = ""
+    PREBAKED_PACK_PATH: str = ""
     BUNDLED_DATA_PATH: str = ""
     CHT_FOLDER_PATH: str = ""
     
@@ -110,7 +347,26 @@ class Config:
     CURRENT_ASSET_FOLDER: str = "" 
     LOGO_SOURCE_FOLDER: str = ""  # 新增：獨立的 logo 資料夾路徑
     TEXT_SOURCE_FOLDER: str = ""
-    TEMP_WORKSPACE_FOLDER: str = ""
+    JOURNAL_PATH: str = ""
+    PROFILE_PATH: str = ""  # 非空時記錄各階段的效能資料
+    PROFILE_FORMAT: str = "json"  # json 或 chrome (chrome://tracing 格式)
+
+    # Bundle 輸出壓縮方式: none / lz4 / lzma / original
+    BUNDLE_PACKER: str = "none"
+
+    # 平行處理設定 (1 = 依序執行)
+    MAX_WORKERS: int = min(3, os.cpu_count() or 1)
+    TEXTURE_WORKERS: int = os.cpu_count() or 1
+
+    # 單張大型紋理切條帶壓縮時使用的子程序數 (1 = 單次壓縮)
+    BC7_WORKERS: int = os.cpu_count() or 1
+
+    # BC7 編碼設定檔 (fast / balanced / max) 與是否輸出 PSNR
+    BC7_PROFILE: str = "balanced"
+    REPORT_TEXTURE_PSNR: bool = False
+
+    # 文字檔直接以原始位元組寫入 m_Script (False = 經 UnityPy 解碼後重新序列化)
+    TEXT_RAW_SCRIPT: bool = True
 
 
 def detect_environment(*, game_build: str = "Unknown"):
@@ -174,13 +430,16 @@ def detect_environment(*, game_build: str = "Unknown"):
 
     Config.BUNDLED_DATA_PATH = get_base_path()
     Config.BACKUP_FOLDER = os.path.join(Config.GAME_ROOT_PATH, "Backup")
+    Config.MANIFEST_PATH = os.path.join(Config.GAME_ROOT_PATH, "Backup_manifest.json")
+    Config.CACHE_FOLDER = os.path.join(Config.GAME_ROOT_PATH, "cht_cache")
     Config.CHT_FOLDER_PATH = os.path.join(Config.BUNDLED_DATA_PATH, "CHT")
+    Config.PREBAKED_PACK_PATH = os.path.join(Config.CHT_FOLDER_PATH, "prebaked.pack")
     
     # 修改：獨立定義 Logo 資料夾
     Config.LOGO_SOURCE_FOLDER = os.path.join(Config.CHT_FOLDER_PATH, "logo")
     
     Config.TEXT_SOURCE_FOLDER = os.path.join(Config.CHT_FOLDER_PATH, "Text")
-    Config.TEMP_WORKSPACE_FOLDER = os.path.join(Config.GAME_ROOT_PATH, "temp_workspace")
+    Config.JOURNAL_PATH = os.path.join(Config.GAME_ROOT_PATH, "Backup_journal.json")
 
 
 # ==============================================================================
@@ -207,12 +466,894 @@ def find_cab_name_in_bundle(env):
     return search(env)
 
 
+def get_patch_targets():
+    """回傳 {目標名稱: 遊戲檔案路徑}，順序即為處理與覆蓋順序。"""
+    return {
+        "fonts": Config.BUNDLE_FILE_PATH,
+        "text": Config.TEXT_ASSETS_FILE_PATH,
+        "title": Config.TITLE_BUNDLE_PATH,
+        "map": Config.MAP_FONT_BUNDLE_PATH,
+    }
+
+
+STAGING_SUFFIX = ".cht-staging"
+
+
+def get_workspace_path(game_file_path):
+    """
+    回傳遊戲檔案的暫存輸出路徑。暫存檔與目標位於同一目錄，
+    確保覆蓋時的 os.replace 只是改名，不會退化為跨檔案系統的完整複製。
+    """
+    return game_file_path + STAGING_SUFFIX
+
+
+def fsync_directory(path):
+    """將目錄項目的變更 (改名、新增) 寫入磁碟；Windows 不支援開啟目錄，略過。"""
+    if sys.platform == "win32":
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def replace_file(temp_path, target_path):
+    """將已寫入的暫存檔 fsync 後以 os.replace 原子地取代目標檔案。"""
+    with open(temp_path, "rb+") as f:
+        os.fsync(f.fileno())
+    os.replace(temp_path, target_path)
+    fsync_directory(os.path.dirname(os.path.abspath(target_path)))
+
+
+def write_json_atomic(path, data):
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    replace_file(temp_path, path)
+
+
+# ==============================================================================
+# --- 效能分析 (Profiling) ---
+# ==============================================================================
+PROFILE_PART_SUFFIX = ".part"
+_profile_stream = None
+
+
+def _process_io_bytes():
+    """回傳目前程序累計的 (讀取, 寫入) 位元組數；平台不支援時回傳 None。"""
+    if sys.platform == "win32":
+
+        class IO_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                (name, ctypes.c_ulonglong)
+                for name in (
+                    "ReadOperationCount",
+                    "WriteOperationCount",
+                    "OtherOperationCount",
+                    "ReadTransferCount",
+                    "WriteTransferCount",
+                    "OtherTransferCount",
+                )
+            ]
+
+        counters = IO_COUNTERS()
+        kernel32 = ctypes.windll.kernel32
+        if kernel32.GetProcessIoCounters(kernel32.GetCurrentProcess(), ctypes.byref(counters)):
+            return counters.ReadTransferCount, counters.WriteTransferCount
+        return None
+    try:
+        with open("/proc/self/io", "r") as f:
+            fields = dict(line.split(": ") for line in f.read().splitlines())
+        return int(fields["rchar"]), int(fields["wchar"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _peak_rss_bytes():
+    """回傳目前程序至今的最高常駐記憶體 (高水位)；平台不支援時回傳 None。"""
+    if sys.platform == "win32":
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", ctypes.c_ulong), ("PageFaultCount", ctypes.c_ulong)] + [
+                (name, ctypes.c_size_t)
+                for name in (
+                    "PeakWorkingSetSize",
+                    "WorkingSetSize",
+                    "QuotaPeakPagedPoolUsage",
+                    "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage",
+                    "QuotaNonPagedPoolUsage",
+                    "PagefileUsage",
+                    "PeakPagefileUsage",
+                )
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        kernel32 = ctypes.windll.kernel32
+        if kernel32.K32GetProcessMemoryInfo(
+            kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb
+        ):
+            return counters.PeakWorkingSetSize
+        return None
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KiB 回報，macOS 以位元組回報
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _write_profile_event(event):
+    """每個程序各自附加寫入 <PROFILE_PATH>.<pid>.part，結束時再合併。"""
+    global _profile_stream
+    path = f"{Config.PROFILE_PATH}.{os.getpid()}{PROFILE_PART_SUFFIX}"
+    if _profile_stream is None or _profile_stream.name != path:
+        _profile_stream = open(path, "a", encoding="utf-8")
+    _profile_stream.write(json.dumps(event, ensure_ascii=False) + "\n")
+    _profile_stream.flush()
+
+
+@contextlib.contextmanager
+def profile_span(name, **fields):
+    """
+    記錄一段區間的牆鐘時間、CPU 時間、I/O 位元組與程序的最高記憶體。
+    未啟用 --profile 時不做任何事。
+    """
+    if not Config.PROFILE_PATH:
+        yield
+        return
+    start_ts = time.time()
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+    start_io = _process_io_bytes()
+    try:
+        yield
+    finally:
+        end_io = _process_io_bytes()
+        event = {
+            "name": name,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "ts": start_ts,
+            "wall": time.perf_counter() - start_wall,
+            "cpu": time.process_time() - start_cpu,
+            "peak_rss": _peak_rss_bytes(),
+            "read_bytes": end_io[0] - start_io[0] if start_io and end_io else None,
+            "write_bytes": end_io[1] - start_io[1] if start_io and end_io else None,
+        }
+        if fields:
+            event["args"] = fields
+        _write_profile_event(event)
+
+
+def profiled(func):
+    """以函數名稱作為區間名稱的 profile_span 裝飾器。"""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with profile_span(func.__name__):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def _profile_part_paths():
+    folder, prefix = os.path.split(Config.PROFILE_PATH)
+    folder = folder or "."
+    if not os.path.isdir(folder):
+        return []
+    return [
+        os.path.join(folder, name)
+        for name in os.listdir(folder)
+        if name.startswith(prefix + ".") and name.endswith(PROFILE_PART_SUFFIX)
+    ]
+
+
+def start_profile():
+    """清除上次中斷留下的分段檔。"""
+    for path in _profile_part_paths():
+        os.remove(path)
+
+
+def finish_profile():
+    """合併所有程序的分段檔並輸出 JSON 或 Chrome trace，回傳各區間的彙總。"""
+    global _profile_stream
+    if _profile_stream is not None:
+        _profile_stream.close()
+        _profile_stream = None
+    events = []
+    for path in _profile_part_paths():
+        with open(path, "r", encoding="utf-8") as f:
+            events.extend(json.loads(line) for line in f if line.strip())
+        os.remove(path)
+    events.sort(key=lambda event: event["ts"])
+
+    summary = {}
+    for event in events:
+        entry = summary.setdefault(event["name"], {"count": 0, "wall": 0.0, "cpu": 0.0})
+        entry["count"] += 1
+        entry["wall"] += event["wall"]
+        entry["cpu"] += event["cpu"]
+
+    if Config.PROFILE_FORMAT == "chrome":
+        output = {
+            "traceEvents": [
+                {
+                    "name": event["name"],
+                    "cat": "sk_cht",
+                    "ph": "X",
+                    "ts": event["ts"] * 1e6,
+                    "dur": event["wall"] * 1e6,
+                    "pid": event["pid"],
+                    "tid": event["tid"],
+                    "args": {
+                        key: value
+                        for key, value in event.items()
+                        if key not in ("name", "ts", "wall", "pid", "tid")
+                    },
+                }
+                for event in events
+            ],
+            "displayTimeUnit": "ms",
+        }
+    else:
+        output = {"events": events, "summary": summary}
+    write_json_atomic(Config.PROFILE_PATH, output)
+
+    print(f"\n[資訊] 效能分析結果已寫入: {Config.PROFILE_PATH}")
+    for name, entry in sorted(summary.items(), key=lambda item: -item[1]["wall"])[:10]:
+        print(f"  - {name}: {entry['wall']:.2f}s (CPU {entry['cpu']:.2f}s, {entry['count']} 次)")
+    return summary
+
+
+# ==============================================================================
+# --- 增量修補紀錄 (Manifest) ---
+# ==============================================================================
+MANIFEST_VERSION = 1
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def load_manifest():
+    """讀取修補紀錄；不存在、損毀或版本不符時回傳空紀錄。"""
+    empty = {"version": MANIFEST_VERSION, "files": {}, "targets": {}}
+    if not Config.MANIFEST_PATH or not os.path.exists(Config.MANIFEST_PATH):
+        return empty
+    try:
+        with open(Config.MANIFEST_PATH, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        print("  - [警告] 修補紀錄損毀，將重新建立所有目標。")
+        return empty
+    if manifest.get("version") != MANIFEST_VERSION:
+        return empty
+    manifest.setdefault("files", {})
+    manifest.setdefault("targets", {})
+    return manifest
+
+
+def save_manifest(manifest):
+    write_json_atomic(Config.MANIFEST_PATH, manifest)
+
+
+def hash_file(path, manifest=None):
+    """
+    計算檔案的 SHA-256。提供 manifest 時，大小與修改時間未變的檔案
+    直接沿用紀錄中的雜湊，避免重新讀取大型遊戲檔案。
+    """
+    st = os.stat(path)
+    key = os.path.abspath(path)
+    if manifest is not None:
+        cached = manifest["files"].get(key)
+        if (
+            cached
+            and cached["size"] == st.st_size
+            and cached["mtime_ns"] == st.st_mtime_ns
+        ):
+            return cached["sha256"]
+
+    digest = hashlib.sha256()
+    with profile_span("hash_file", file=os.path.basename(path)), open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    result = digest.hexdigest()
+    if manifest is not None:
+        manifest["files"][key] = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha256": result,
+        }
+    return result
+
+
+def remember_file_hash(manifest, path, sha256):
+    """記錄已知內容的檔案雜湊 (例如剛搬移到位的輸出檔)。"""
+    st = os.stat(path)
+    manifest["files"][os.path.abspath(path)] = {
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha256": sha256,
+    }
+
+
+def hash_folder_files(folder, manifest, extensions):
+    """回傳資料夾中指定副檔名檔案的 (檔名, 雜湊) 清單，依檔名排序。"""
+    if not os.path.isdir(folder):
+        return []
+    return [
+        (name, hash_file(os.path.join(folder, name), manifest))
+        for name in sorted(os.listdir(folder))
+        if name.lower().endswith(extensions)
+    ]
+
+
+def hash_inputs(entries):
+    digest = hashlib.sha256()
+    digest.update(json.dumps(entries, ensure_ascii=False).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def collect_target_inputs(name, text_folder_name, font_mode, sources, manifest):
+    """列出影響指定目標輸出結果的所有來源。"""
+    entries = [["source", sources[name]]]
+    if name == "fonts":
+        entries.append(["font_mode", font_mode])
+        entries.append(
+            ["assets", hash_folder_files(Config.CURRENT_ASSET_FOLDER, manifest, (".json", ".png"))]
+        )
+    elif name == "text":
+        entries.append(["text_folder", text_folder_name])
+        if isinstance(text_folder_name, str):
+            folder = os.path.join(Config.CHT_FOLDER_PATH, text_folder_name)
+            entries.append(["texts", hash_folder_files(folder, manifest, (".txt",))])
+        else:
+            # 疊加層：只記錄實際採用的檔案，被覆蓋的版本不影響輸出
+            layer_index = build_text_layer_index(text_layer_folders(text_folder_name))
+            texts = [[asset, hash_file(layer_index[asset], manifest)] for asset in sorted(layer_index)]
+            entries.append(["texts", texts])
+    elif name == "title":
+        entries.append(["logo", hash_folder_files(Config.LOGO_SOURCE_FOLDER, manifest, (".png",))])
+    elif name == "map":
+        # 地圖引用的是字體 Bundle 的 CAB 名稱與 PathID，取決於原始字體 Bundle
+        entries.append(["font_mode", font_mode])
+        entries.append(["font_source", sources["fonts"]])
+    return entries
+
+
+@profiled
+def plan_incremental_build(text_folder_name, font_mode, manifest):
+    """
+    比對修補紀錄，回傳 {目標: 狀態}。
+    patched: 遊戲檔案是否仍為上次的修補輸出
+    source: 原始檔案雜湊；inputs: 所有來源的綜合雜湊
+    rebuild: 是否需要重新修補
+    """
+    targets = get_patch_targets()
+    names = ["fonts", "text", "title"] + (["map"] if font_mode == "new" else [])
+    current, sources, patched = {}, {}, {}
+    for name in names:
+        current[name] = hash_file(targets[name], manifest)
+        record = manifest["targets"].get(name, {})
+        patched[name] = current[name] == record.get("output_sha256")
+        sources[name] = record["source_sha256"] if patched[name] else current[name]
+
+    plan = {}
+    for name in names:
+        inputs = hash_inputs(
+            collect_target_inputs(name, text_folder_name, font_mode, sources, manifest)
+        )
+        record = manifest["targets"].get(name, {})
+        plan[name] = {
+            "patched": patched[name],
+            "source": sources[name],
+            "inputs": inputs,
+            "rebuild": not (patched[name] and record.get("inputs_sha256") == inputs),
+        }
+    if (
+        "map" in plan
+        and plan["map"]["rebuild"]
+        and not manifest["targets"].get("fonts", {}).get("font_ref")
+    ):
+        plan["fonts"]["rebuild"] = True
+    return plan
+
+
+# ==============================================================================
+# --- 備份 (內容定址) ---
+# ==============================================================================
+BACKUP_INDEX_VERSION = 1
+BACKUP_OBJECTS_FOLDER = "objects"
+BACKUP_INDEX_NAME = "index.json"
+FICLONE = 0x40049409  # Linux ioctl: 以 reflink 共用資料區塊
+
+
+def _reflink_file(src, dst):
+    """以 copy-on-write 方式複製檔案；檔案系統不支援時回傳 False。"""
+    if sys.platform.startswith("linux"):
+        import fcntl
+
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        except OSError:
+            if os.path.exists(dst):
+                os.remove(dst)
+            return False
+        return True
+    if sys.platform == "darwin":
+        libc = ctypes.CDLL(None, use_errno=True)
+        clonefile = getattr(libc, "clonefile", None)
+        if clonefile is None:
+            return False
+        return clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0
+    return False
+
+
+def clone_file(src, dst, allow_hardlink=True):
+    """
+    依序嘗試 reflink、硬連結與一般複製，回傳實際使用的方式。
+    硬連結僅適用於來源之後只會被整檔取代 (而非原地修改) 的情況。
+    """
+    if os.path.exists(dst):
+        os.remove(dst)
+    if _reflink_file(src, dst):
+        shutil.copystat(src, dst)
+        return "reflink"
+    if allow_hardlink:
+        try:
+            os.link(src, dst)
+            return "hardlink"
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+def backup_object_path(sha256):
+    return os.path.join(Config.BACKUP_FOLDER, BACKUP_OBJECTS_FOLDER, sha256[:2], sha256)
+
+
+def backup_key(game_path):
+    return os.path.relpath(game_path, Config.GAME_ROOT_PATH).replace(os.sep, "/")
+
+
+def load_backup_index():
+    """讀取備份索引 {相對路徑: {sha256, size}}；不存在或損毀時回傳空索引。"""
+    path = os.path.join(Config.BACKUP_FOLDER, BACKUP_INDEX_NAME)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {"version": BACKUP_INDEX_VERSION, "files": {}}
+    if index.get("version") != BACKUP_INDEX_VERSION:
+        return {"version": BACKUP_INDEX_VERSION, "files": {}}
+    index.setdefault("files", {})
+    return index
+
+
+def save_backup_index(index):
+    os.makedirs(Config.BACKUP_FOLDER, exist_ok=True)
+    write_json_atomic(os.path.join(Config.BACKUP_FOLDER, BACKUP_INDEX_NAME), index)
+
+
+@profiled
+def store_backup(game_path, sha256, index, key=None):
+    """
+    將原始檔案存入內容定址的備份區，雜湊相同的備份已存在時直接略過。
+    回傳 (備份路徑, 使用的方式)；略過時方式為 None。
+    """
+    target = backup_object_path(sha256)
+    size = os.path.getsize(game_path)
+    index["files"][key or backup_key(game_path)] = {"sha256": sha256, "size": size}
+    if (
+        os.path.exists(target)
+        and os.path.getsize(target) == size
+        and hash_file(target) == sha256
+    ):
+        return target, None
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    temp_path = f"{target}.{os.getpid()}.tmp"
+    # 遊戲檔案不一定會被整檔取代 (匯出差異包、失敗回復) 且可能被原地改寫，不可共用硬連結
+    method = clone_file(game_path, temp_path, allow_hardlink=False)
+    replace_file(temp_path, target)
+    return target, method
+
+
+def prune_backup_objects(index, manifest):
+    """
+    刪除備份索引與修補紀錄都不再引用的備份物件 (例如遊戲更新前的舊版原始檔案)，
+    回傳刪除的數量。有未完成的覆蓋日誌時不清理，以免刪除回復所需的備份。
+    """
+    if load_journal() is not None:
+        return 0
+    referenced = {entry["sha256"] for entry in index["files"].values()}
+    referenced.update(
+        record["source_sha256"]
+        for record in manifest["targets"].values()
+        if record.get("source_sha256")
+    )
+    objects_folder = os.path.join(Config.BACKUP_FOLDER, BACKUP_OBJECTS_FOLDER)
+    if not os.path.isdir(objects_folder):
+        return 0
+    removed = 0
+    for prefix in os.listdir(objects_folder):
+        prefix_folder = os.path.join(objects_folder, prefix)
+        if not os.path.isdir(prefix_folder):
+            continue
+        for name in os.listdir(prefix_folder):
+            if name not in referenced:
+                os.remove(os.path.join(prefix_folder, name))
+                removed += 1
+        if not os.listdir(prefix_folder):
+            os.rmdir(prefix_folder)
+    return removed
+
+
+def find_backup(game_path, index, manifest=None):
+    """
+    回傳指定遊戲檔案的 (備份路徑, 預期雜湊)。舊版以原始目錄結構存放的
+    備份會在此時雜湊並納入索引；找不到時回傳 (None, None)。
+    """
+    key = backup_key(game_path)
+    entry = index["files"].get(key)
+    if entry:
+        return backup_object_path(entry["sha256"]), entry["sha256"]
+    legacy_path = os.path.join(Config.BACKUP_FOLDER, *key.split("/"))
+    if os.path.isfile(legacy_path):
+        sha256 = hash_file(legacy_path, manifest)
+        target, _ = store_backup(legacy_path, sha256, index, key)
+        return target, sha256
+    return None, None
+
+
+# ==============================================================================
+# --- 差異修補包 (Delta) ---
+# ==============================================================================
+DELTA_MAGIC = b"SKDP"
+DELTA_VERSION = 1
+DELTA_EXTENSION = ".skdelta"
+# 魔數、版本、來源 SHA-256、目標 SHA-256、目標大小、區塊大小、描述 JSON 長度
+DELTA_HEADER = struct.Struct("<4sH32s32sQII")
+DELTA_COPY = struct.Struct("<BQQ")
+DELTA_DATA = struct.Struct("<BQ")
+DELTA_OP_COPY, DELTA_OP_DATA = 0, 1
+DELTA_BLOCK_SIZE = 64 * 1024
+DELTA_PROBE_SIZE = 64
+DELTA_SEARCH_WINDOW = 8 * 1024 * 1024
+DELTA_MAX_PROBES = 8
+
+
+def _find_block(source, block, expected, window):
+    """在 expected 附近搜尋與 block 完全相同的來源位置，找不到時回傳 -1。"""
+    n = len(block)
+    if 0 <= expected and expected + n <= len(source) and source[expected:expected + n] == block:
+        return expected
+    if n < DELTA_PROBE_SIZE:
+        return -1
+    probe = block[:DELTA_PROBE_SIZE]
+    lo = max(0, expected - window)
+    hi = min(len(source), expected + window + n)
+    pos = source.find(probe, lo, hi)
+    for _ in range(DELTA_MAX_PROBES):
+        if pos == -1:
+            break
+        if source[pos:pos + n] == block:
+            return pos
+        pos = source.find(probe, pos + 1, hi)
+    return -1
+
+
+def iter_delta_ops(source, target, block_size=DELTA_BLOCK_SIZE, window=DELTA_SEARCH_WINDOW):
+    """
+    以區塊為單位比對來源與目標，產生 ("copy", 來源位移, 長度) 或 ("data", bytes)。
+    相鄰且連續的操作會合併；位移變動 (例如文字長度改變) 後於附近重新同步。
+    """
+    pending, shift = None, 0
+    for start in range(0, len(target), block_size):
+        block = target[start:start + block_size]
+        pos = _find_block(source, block, start + shift, window)
+        if pos != -1:
+            shift = pos - start
+            if pending and pending[0] == "copy" and pending[1] + pending[2] == pos:
+                pending[2] += len(block)
+                continue
+            if pending:
+                yield tuple(pending)
+            pending = ["copy", pos, len(block)]
+        else:
+            if pending and pending[0] == "data":
+                pending[1] += block
+                continue
+            if pending:
+                yield tuple(pending)
+            pending = ["data", bytearray(block)]
+    if pending:
+        yield tuple(pending)
+
+
+def mmap_file(f):
+    """以唯讀 mmap 開啟檔案；空檔案無法 mmap，改以空 bytes 代替。"""
+    if os.fstat(f.fileno()).st_size == 0:
+        return contextlib.nullcontext(b"")
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def write_delta(source_path, target_path, output_path, meta, source_sha256=None):
+    """產生 source_path 至 target_path 的差異檔；回傳 (目標雜湊, 差異檔大小)。"""
+    source_sha256 = source_sha256 or hash_file(source_path)
+    target_sha256 = hash_file(target_path)
+    meta_blob = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+    temp_path = output_path + ".tmp"
+    with open(source_path, "rb") as fs, open(target_path, "rb") as ft, open(temp_path, "wb") as out:
+        out.write(
+            DELTA_HEADER.pack(
+                DELTA_MAGIC,
+                DELTA_VERSION,
+                bytes.fromhex(source_sha256),
+                bytes.fromhex(target_sha256),
+                os.fstat(ft.fileno()).st_size,
+                DELTA_BLOCK_SIZE,
+                len(meta_blob),
+            )
+        )
+        out.write(meta_blob)
+        compressor = lzma.LZMACompressor()
+        with mmap_file(fs) as source, mmap_file(ft) as target:
+            for op in iter_delta_ops(source, target):
+                if op[0] == "copy":
+                    out.write(compressor.compress(DELTA_COPY.pack(DELTA_OP_COPY, op[1], op[2])))
+                else:
+                    out.write(compressor.compress(DELTA_DATA.pack(DELTA_OP_DATA, len(op[1]))))
+                    out.write(compressor.compress(op[1]))
+        out.write(compressor.flush())
+    os.replace(temp_path, output_path)
+    return target_sha256, os.path.getsize(output_path)
+
+
+def read_delta_header(f):
+    header = f.read(DELTA_HEADER.size)
+    if len(header) != DELTA_HEADER.size:
+        raise ValueError("差異檔過短")
+    magic, version, source_raw, target_raw, target_size, _, meta_len = DELTA_HEADER.unpack(header)
+    if magic != DELTA_MAGIC or version != DELTA_VERSION:
+        raise ValueError("不支援的差異檔格式")
+    meta = json.loads(f.read(meta_len).decode("utf-8"))
+    return meta, source_raw.hex(), target_raw.hex(), target_size
+
+
+@profiled
+def apply_delta(delta_path, manifest, backup_index):
+    """
+    將差異檔套用至對應的遊戲檔案：確認來源雜湊、備份原始檔案，
+    寫入同目錄暫存檔並驗證目標雜湊後整檔取代。回傳是否成功。
+    """
+    with open(delta_path, "rb") as f:
+        meta, source_sha256, target_sha256, target_size = read_delta_header(f)
+        game_path = os.path.join(Config.GAME_ROOT_PATH, *meta["path"].split("/"))
+        filename = os.path.basename(game_path)
+        if not os.path.exists(game_path):
+            print(f"  - [錯誤] 找不到遊戲檔案: {filename}")
+            return False
+        current = hash_file(game_path, manifest)
+        if current == target_sha256:
+            print(f"  - 已是修補後的檔案: {filename}")
+            return True
+        if current != source_sha256:
+            print(f"  - [錯誤] {filename} 與差異檔的原始版本不符，無法套用。")
+            return False
+
+        temp_path = game_path + ".delta.tmp"
+        digest = hashlib.sha256()
+        with open(game_path, "rb") as fs, mmap_file(fs) as source, open(temp_path, "wb") as out:
+            body = lzma.LZMAFile(f)
+            while True:
+                op = body.read(1)
+                if not op:
+                    break
+                if op[0] == DELTA_OP_COPY:
+                    _, offset, length = DELTA_COPY.unpack(op + body.read(DELTA_COPY.size - 1))
+                    for start in range(offset, offset + length, HASH_CHUNK_SIZE):
+                        chunk = source[start:min(start + HASH_CHUNK_SIZE, offset + length)]
+                        digest.update(chunk)
+                        out.write(chunk)
+                else:
+                    _, length = DELTA_DATA.unpack(op + body.read(DELTA_DATA.size - 1))
+                    while length:
+                        chunk = body.read(min(length, HASH_CHUNK_SIZE))
+                        if not chunk:
+                            raise ValueError("差異檔資料不完整")
+                        digest.update(chunk)
+                        out.write(chunk)
+                        length -= len(chunk)
+        if digest.hexdigest() != target_sha256 or os.path.getsize(temp_path) != target_size:
+            os.remove(temp_path)
+            print(f"  - [錯誤] {filename} 套用後的雜湊不符，已放棄。")
+            return False
+
+    store_backup(game_path, source_sha256, backup_index)
+    replace_file(temp_path, game_path)
+    remember_file_hash(manifest, game_path, target_sha256)
+    record = {
+        "source_sha256": source_sha256,
+        "inputs_sha256": None,
+        "output_sha256": target_sha256,
+    }
+    if meta.get("font_ref"):
+        record["font_ref"] = meta["font_ref"]
+    manifest["targets"][meta["target"]] = record
+    print(f"  - 已套用: {filename}")
+    return True
+
+
+@profiled
+def export_modding_deltas(output_folder, plan, modified_files, results, manifest):
+    """
+    為所有目標輸出差異檔：重新建立的目標比對暫存輸出，
+    未變更的目標比對目前已修補的遊戲檔案，來源一律為原始備份。
+    """
+    print("\n[步驟 4/4] 正在輸出差異修補包...")
+    os.makedirs(output_folder, exist_ok=True)
+    targets = get_patch_targets()
+    outputs = {name: path for name, path, _ in modified_files}
+    font_ref = results.get("fonts") or manifest["targets"].get("fonts", {}).get("font_ref")
+    for name, state in plan.items():
+        meta = {"target": name, "path": backup_key(targets[name])}
+        if name == "fonts" and font_ref:
+            meta["font_ref"] = font_ref
+        output_path = os.path.join(output_folder, name + DELTA_EXTENSION)
+        _, size = write_delta(
+            backup_object_path(state["source"]),
+            outputs.get(name, targets[name]),
+            output_path,
+            meta,
+            state["source"],
+        )
+        print(f"  - 已輸出 {os.path.basename(output_path)} ({size} bytes)")
+    print("差異修補包輸出完成！")
+
+
+def apply_delta_folder(folder):
+    """套用資料夾內所有差異檔，回傳是否全部成功。"""
+    print(f"\n[開始套用差異修補包] {folder}")
+    names = sorted(
+        name for name in os.listdir(folder) if name.endswith(DELTA_EXTENSION)
+    ) if os.path.isdir(folder) else []
+    if not names:
+        print("[錯誤] 找不到任何差異檔。")
+        return False
+    manifest = load_manifest()
+    backup_index = load_backup_index()
+    ok = True
+    try:
+        for name in names:
+            try:
+                ok = apply_delta(os.path.join(folder, name), manifest, backup_index) and ok
+            except (OSError, ValueError, lzma.LZMAError) as e:
+                print(f"  - [錯誤] 套用 {name} 時發生錯誤: {e}")
+                ok = False
+    finally:
+        save_backup_index(backup_index)
+        save_manifest(manifest)
+        prune_backup_objects(backup_index, manifest)
+    print("\n== 差異修補包套用完成！==" if ok else "\n[警告] 部分差異檔未能套用。")
+    return ok
+
+
+# ==============================================================================
+# --- 覆蓋日誌 (Journal) ---
+# ==============================================================================
+JOURNAL_VERSION = 1
+
+
+def load_journal():
+    if not Config.JOURNAL_PATH or not os.path.exists(Config.JOURNAL_PATH):
+        return None
+    try:
+        with open(Config.JOURNAL_PATH, "r", encoding="utf-8") as f:
+            journal = json.load(f)
+    except (OSError, ValueError):
+        print("  - [警告] 覆蓋日誌損毀，無法自動恢復。")
+        return None
+    return journal if journal.get("version") == JOURNAL_VERSION else None
+
+
+@profiled
+def commit_staged_files(entries, manifest):
+    """
+    以日誌保護的方式將暫存檔換入遊戲目錄。entries 為
+    [{target, path, staging, source_sha256, output_sha256, record}]；
+    每換入一個檔案即更新日誌，中斷後可由 recover_patch_journal 繼續或還原。
+    """
+    journal = {"version": JOURNAL_VERSION, "entries": entries}
+    for entry in entries:
+        entry["done"] = False
+    write_json_atomic(Config.JOURNAL_PATH, journal)
+    for entry in entries:
+        with profile_span("replace", file=os.path.basename(entry["path"])):
+            os.replace(entry["staging"], entry["path"])
+            fsync_directory(os.path.dirname(os.path.abspath(entry["path"])))
+        entry["done"] = True
+        write_json_atomic(Config.JOURNAL_PATH, journal)
+        print(f"  - 已覆蓋: {os.path.basename(entry['path'])}")
+    finish_journal(entries, manifest)
+
+
+def finish_journal(entries, manifest):
+    for entry in entries:
+        manifest["targets"][entry["target"]] = entry["record"]
+        remember_file_hash(manifest, entry["path"], entry["output_sha256"])
+    save_manifest(manifest)
+    os.remove(Config.JOURNAL_PATH)
+
+
+def recover_patch_journal(rollback=False):
+    """
+    處理上次中斷的覆蓋流程。所有暫存檔仍完整時繼續換入；
+    否則 (或 rollback 為 True) 將已換入的檔案還原為原始備份。
+    回傳是否有需要處理的日誌。
+    """
+    journal = load_journal()
+    if journal is None:
+        return False
+    entries = journal["entries"]
+    manifest = load_manifest()
+    pending = [entry for entry in entries if not entry["done"]]
+    resumable = all(
+        os.path.exists(entry["staging"])
+        and hash_file(entry["staging"]) == entry["output_sha256"]
+        for entry in pending
+    )
+    if resumable and not rollback:
+        print("[資訊] 偵測到中斷的覆蓋流程，正在繼續...")
+        for entry in pending:
+            replace_file(entry["staging"], entry["path"])
+            entry["done"] = True
+            write_json_atomic(Config.JOURNAL_PATH, journal)
+        finish_journal(entries, manifest)
+        print("[資訊] 已完成先前中斷的覆蓋。")
+        return True
+
+    print("[資訊] 偵測到中斷的覆蓋流程，正在還原已覆蓋的檔案...")
+    for entry in entries:
+        if os.path.exists(entry["staging"]):
+            os.remove(entry["staging"])
+        if not entry["done"]:
+            continue
+        backup_path = backup_object_path(entry["source_sha256"])
+        if hash_file(entry["path"], manifest) == entry["source_sha256"]:
+            continue
+        temp_path = entry["path"] + ".restore.tmp"
+        clone_file(backup_path, temp_path, allow_hardlink=False)
+        replace_file(temp_path, entry["path"])
+        remember_file_hash(manifest, entry["path"], entry["source_sha256"])
+        print(f"  - 已還原: {os.path.basename(entry['path'])}")
+    save_manifest(manifest)
+    os.remove(Config.JOURNAL_PATH)
+    return True
+
+
 # ==============================================================================
 # --- 選單功能 ---
 # ==============================================================================
-def run_modding(text_folder_name: str, font_mode: str):
+def run_modding(
+    text_folder_name: Union[str, Sequence[str]],
+    font_mode: str,
+    delta_output=None,
+    assume_yes=False,
+) -> bool:
     """
+    text_folder_name: 翻譯資料夾名稱，或 (基底, 疊加層...) 序列
     font_mode: "new" (修改字體) 或 "old" (原版字體)
+    delta_output: 指定時不修改遊戲檔案，改為輸出各目標的差異修補包至此資料夾
+    assume_yes: 略過確認提示 (供批次執行使用)
+    回傳是否成功完成。
     """
     # 設定資源路徑 (影響字體與紋理)
     if font_mode == "new":
@@ -238,121 +1379,145 @@ def run_modding(text_folder_name: str, font_mode: str):
         if not path or not os.path.exists(path):
             print(f"\n[錯誤] 關鍵路徑或檔案不存在: {path}")
             print(f"請確保此程式位於遊戲根目錄下，且資源檔案完整。")
-            return
-
-    print("\n[警告] 此操作將直接修改遊戲檔案。")
-    confirm = input("您是否要繼續執行？ (輸入 'y' 確認): ").strip().lower()
-    if confirm != "y":
-        print("操作已取消。")
-        return
-
+            return False
+    if not check_text_layers(text_folder_name):
+        return False
+
+    recover_patch_journal()
+    manifest = load_manifest()
+    plan = plan_incremental_build(text_folder_name, font_mode, manifest)
+    targets_to_build = [name for name, state in plan.items() if state["rebuild"]]
+    if not targets_to_build and not delta_output:
+        print("\n[資訊] 所有目標檔案與來源皆未變更，無需重新修補。")
+        print("\n== 所有操作已成功完成！==")
+        return True
+    skipped = [name for name in plan if name not in targets_to_build]
+    if skipped:
+        print(f"[資訊] 以下目標未變更，將略過: {', '.join(skipped)}")
+
+    if delta_output:
+        print(f"\n[資訊] 差異修補包模式：不修改遊戲檔案，輸出至 '{delta_output}'。")
+    elif not assume_yes:
+        print("\n[警告] 此操作將直接修改遊戲檔案。")
+        try:
+            confirm = input("您是否要繼續執行？ (輸入 'y' 確認): ").strip().lower()
+        except EOFError:
+            confirm = ""
+        if confirm != "y":
+            print("操作已取消。")
+            return False
+
+    targets = get_patch_targets()
     try:
-        # 2. 備份
-        if os.path.exists(Config.BACKUP_FOLDER):
-            shutil.rmtree(Config.BACKUP_FOLDER)
+        # 2. 備份 (依原始檔案雜湊存放；已由本工具修補過的檔案沿用既有備份)
         print("\n[步驟 1/4] 正在建立新的原始檔案備份...")
-        backup_files = [
-            Config.BUNDLE_FILE_PATH,
-            Config.TEXT_ASSETS_FILE_PATH,
-            Config.TITLE_BUNDLE_PATH,
-            Config.MAP_FONT_BUNDLE_PATH
-        ]
-        
-        for file_path in backup_files:
-            backup_target = os.path.join(
-                Config.BACKUP_FOLDER,
-                os.path.relpath(file_path, Config.GAME_ROOT_PATH),
-            )
-            os.makedirs(os.path.dirname(backup_target), exist_ok=True)
-            shutil.copy2(file_path, backup_target)
-            
+        backup_index = load_backup_index()
+        sources = {}
+        for name in targets_to_build:
+            file_path = targets[name]
+            if plan[name]["patched"]:
+                backup_target = backup_object_path(plan[name]["source"])
+                if not os.path.exists(backup_target):
+                    raise FileNotFoundError(
+                        f"'{os.path.basename(file_path)}' 已被修補，但找不到其原始備份。"
+                    )
+            else:
+                backup_target, method = store_backup(
+                    file_path, plan[name]["source"], backup_index
+                )
+                if method is None:
+                    print(f"  - [資訊] '{os.path.basename(file_path)}' 的相同備份已存在，略過。")
+                else:
+                    print(f"  - 已備份 '{os.path.basename(file_path)}' ({method})")
+            # 一律從原始檔案重新修補，確保輸出只取決於原始檔案與來源資源
+            sources[name] = backup_target
+        save_backup_index(backup_index)
+
         print("新備份已建立至 'Backup' 資料夾。")
 
-        # 3. 載入與修改
+        # 3. 載入、修改與重新打包 (各目標於獨立程序中平行處理)
         print("\n[步驟 2/4] 正在載入資源並應用修改...")
-        if os.path.exists(Config.TEMP_WORKSPACE_FOLDER):
-            shutil.rmtree(Config.TEMP_WORKSPACE_FOLDER)
-        os.makedirs(Config.TEMP_WORKSPACE_FOLDER, exist_ok=True)
         if Config.UNITY_VERSION:
             UnityPy.config.FALLBACK_UNITY_VERSION = Config.UNITY_VERSION
 
-        generator = TypeTreeGenerator(Config.UNITY_VERSION)
-        if sys.platform == "darwin":
-            managed_folder_path = os.path.join(Config.SILKSONG_DATA_PATH, "Managed")
-            generator.load_local_dll_folder(managed_folder_path)
-        else:
-            generator.load_local_game(Config.GAME_ROOT_PATH)
-
-        bundle_env = UnityPy.load(Config.BUNDLE_FILE_PATH)
-        bundle_env.typetree_generator = generator
-        text_env = UnityPy.load(Config.TEXT_ASSETS_FILE_PATH)
-        title_env = UnityPy.load(Config.TITLE_BUNDLE_PATH)
-        title_env.typetree_generator = generator
-        map_font_env = UnityPy.load(Config.MAP_FONT_BUNDLE_PATH)  
-        map_font_env.typetree_generator = generator  
-
-        # 執行修改
-        process_bundle(bundle_env, skip_bold_atlas=(font_mode == "old"))
-        process_text_assets(text_env, text_folder_name)
-        process_title_bundle(title_env)
-
-        # 只有在選擇 "修改字體 (new)" 時，才處理地圖字體引用
-        if font_mode == "new":
-            target_font_path_id = find_target_font_path_id(bundle_env)
-            process_map_font_bundle(map_font_env, bundle_env, target_font_path_id)
-        else:
+        font_ref = manifest["targets"].get("fonts", {}).get("font_ref")
+        tasks = build_modding_tasks(
+            text_folder_name, font_mode, sources, targets_to_build, font_ref
+        )
+        if font_mode != "new":
             print("[資訊] 選擇原版字體模式，跳過地圖字體引用修改 (Map Font Bundle)。")
-
+        results = run_pipeline_tasks(tasks, Config.MAX_WORKERS)
         print("資源修改完成。")
 
-        # 4. 重新打包
-        print("\n[步驟 3/4] 正在重新打包修改後的檔案...")
-        modified_bundle_path = os.path.join(
-            Config.TEMP_WORKSPACE_FOLDER, os.path.basename(Config.BUNDLE_FILE_PATH)
-        )
-        modified_text_assets_path = os.path.join(
-            Config.TEMP_WORKSPACE_FOLDER, os.path.basename(Config.TEXT_ASSETS_FILE_PATH)
-        )
-        modified_title_bundle_path = os.path.join(
-            Config.TEMP_WORKSPACE_FOLDER, os.path.basename(Config.TITLE_BUNDLE_PATH)
-        )
-        modified_map_font_path = os.path.join(
-            Config.TEMP_WORKSPACE_FOLDER, os.path.basename(Config.MAP_FONT_BUNDLE_PATH)
-        )  
-        
-        with open(modified_bundle_path, "wb") as f:
-            f.write(bundle_env.file.save())
-        with open(modified_text_assets_path, "wb") as f:
-            f.write(text_env.file.save())
-        with open(modified_title_bundle_path, "wb") as f:
-            f.write(title_env.file.save())
-        with open(modified_map_font_path, "wb") as f:
-            f.write(map_font_env.file.save())  
+        # 4. 重新打包 (已由各管線寫入目標旁的暫存檔)
+        print("\n[步驟 3/4] 正在確認重新打包的檔案...")
+        modified_files = []
+        for task in tasks:
+            game_path = targets[task.name]
+            modified_path = get_workspace_path(game_path)
+            if not os.path.exists(modified_path):
+                raise FileNotFoundError(f"找不到重新打包的檔案: {modified_path}")
+            modified_files.append((task.name, modified_path, game_path))
         print("打包完成。")
 
-        # 5. 覆蓋檔案
+        if delta_output:
+            export_modding_deltas(delta_output, plan, modified_files, results, manifest)
+            print("\n== 所有操作已成功完成！==")
+            return True
+
+        # 5. 覆蓋檔案 (同目錄改名，並以日誌記錄進度)
         print("\n[步驟 4/4] 正在用新檔案覆蓋遊戲檔案...")
-        shutil.move(modified_bundle_path, Config.BUNDLE_FILE_PATH)
-        shutil.move(modified_text_assets_path, Config.TEXT_ASSETS_FILE_PATH)
-        shutil.move(modified_title_bundle_path, Config.TITLE_BUNDLE_PATH)
-        shutil.move(modified_map_font_path, Config.MAP_FONT_BUNDLE_PATH)  
+        entries = []
+        for name, modified_path, game_path in modified_files:
+            output_hash = hash_file(modified_path)
+            record = {
+                "source_sha256": plan[name]["source"],
+                "inputs_sha256": plan[name]["inputs"],
+                "output_sha256": output_hash,
+            }
+            if name == "fonts":
+                record["font_ref"] = results["fonts"]
+            entries.append(
+                {
+                    "target": name,
+                    "path": game_path,
+                    "staging": modified_path,
+                    "source_sha256": plan[name]["source"],
+                    "output_sha256": output_hash,
+                    "record": record,
+                }
+            )
+        commit_staged_files(entries, manifest)
         print("覆蓋完成！")
+        removed = prune_backup_objects(backup_index, manifest)
+        if removed:
+            print(f"  - [資訊] 已清除 {removed} 個不再使用的舊備份。")
         print("\n== 所有操作已成功完成！==")
+        return True
 
     except Exception as e:
         print(f"\n[嚴重錯誤] 操作過程中發生錯誤: {e}")
         traceback.print_exc()
+        # 覆蓋途中失敗時，將已覆蓋的檔案還原為原始狀態
+        recover_patch_journal(rollback=True)
+        return False
     finally:
-        if os.path.exists(Config.TEMP_WORKSPACE_FOLDER):
-            shutil.rmtree(Config.TEMP_WORKSPACE_FOLDER)
+        for path in targets.values():
+            staging_path = get_workspace_path(path)
+            if os.path.exists(staging_path):
+                os.remove(staging_path)
 
 
-def restore_backup():
+@profiled
+def restore_backup() -> bool:
+    """還原原始檔案，回傳是否成功 (有損毀的備份時視為失敗)。"""
     print("\n[開始執行還原備份流程]")
     if not os.path.exists(Config.BACKUP_FOLDER):
         print("[錯誤] 找不到 'Backup' 資料夾，無法還原。")
-        return
+        return False
+    ok = True
     try:
+        recover_patch_journal(rollback=True)
         # 定義需要還原的檔案列表
         files_to_restore = [
             (Config.BUNDLE_FILE_PATH, "fonts_assets_chinese.bundle"),
@@ -361,25 +1526,76 @@ def restore_backup():
             (Config.MAP_FONT_BUNDLE_PATH, "maps_assets_all.bundle"),
         ]
 
+        manifest = load_manifest()
+        backup_index = load_backup_index()
         print("正在從 'Backup' 資料夾還原原始檔案...")
         for original_path, filename in files_to_restore:
-            backup_path = os.path.join(
-                Config.BACKUP_FOLDER,
-                os.path.relpath(original_path, Config.GAME_ROOT_PATH),
-            )
-            
-            if os.path.exists(backup_path):
-                # 確保目標資料夾存在
-                os.makedirs(os.path.dirname(original_path), exist_ok=True)
-                shutil.copy2(backup_path, original_path)
-                print(f"  - 已還原: {filename}")
-            else:
+            backup_path, expected = find_backup(original_path, backup_index, manifest)
+            if backup_path is None or not os.path.exists(backup_path):
                 print(f"  - [警告] 備份中找不到 {filename}，跳過。")
+                continue
+            if hash_file(backup_path) != expected:
+                print(f"  - [錯誤] {filename} 的備份雜湊不符，可能已損毀，跳過。")
+                ok = False
+                continue
+            if os.path.exists(original_path) and hash_file(original_path, manifest) == expected:
+                print(f"  - 已是原始檔案: {filename}")
+                continue
 
+            # 確保目標資料夾存在，並以同目錄暫存檔整檔取代
+            os.makedirs(os.path.dirname(original_path), exist_ok=True)
+            temp_path = original_path + ".restore.tmp"
+            clone_file(backup_path, temp_path, allow_hardlink=False)
+            replace_file(temp_path, original_path)
+            remember_file_hash(manifest, original_path, expected)
+            print(f"  - 已還原: {filename}")
+
+        save_backup_index(backup_index)
+        if Config.MANIFEST_PATH:
+            save_manifest(manifest)
         print("\n== 檔案還原程序結束！==")
+        return ok
     except Exception as e:
         print(f"\n[嚴重錯誤] 還原過程中發生錯誤: {e}")
         traceback.print_exc()
+        return False
+
+
+@profiled
+def verify_game_files() -> bool:
+    """
+    檢查各目標檔案的狀態 (已修補 / 未修補) 與修補所依賴的原始備份是否完整。
+    只讀取不修改；回傳是否全部正常。
+    """
+    print("\n[開始檢查遊戲檔案]")
+    ok = True
+    if load_journal() is not None:
+        print("  - [錯誤] 有未完成的覆蓋流程，請重新執行修補或還原。")
+        ok = False
+    manifest = load_manifest()
+    backup_index = load_backup_index()
+    for name, path in get_patch_targets().items():
+        filename = os.path.basename(path)
+        if not path or not os.path.exists(path):
+            print(f"  - [錯誤] 找不到 {name}: {path}")
+            ok = False
+            continue
+        current = hash_file(path, manifest)
+        record = manifest["targets"].get(name, {})
+        entry = backup_index["files"].get(backup_key(path))
+        if current == record.get("output_sha256"):
+            backup_path = backup_object_path(record["source_sha256"])
+            if not os.path.exists(backup_path) or hash_file(backup_path) != record["source_sha256"]:
+                print(f"  - [錯誤] {filename}: 已修補，但原始備份遺失或損毀。")
+                ok = False
+            else:
+                print(f"  - {filename}: 已修補 (原始備份完整)")
+        elif entry and current == entry["sha256"]:
+            print(f"  - {filename}: 原始檔案 (已備份)")
+        else:
+            print(f"  - {filename}: 未修補")
+    print("\n== 檢查完成：全部正常 ==" if ok else "\n[警告] 檢查發現問題。")
+    return ok
 
 
 def show_about():
@@ -393,32 +1609,562 @@ def show_about():
     print("=" * 60)
 
 
+# ==============================================================================
+# --- 物件索引 ---
+# ==============================================================================
+# m_Name 位於物件資料開頭的類型 (ClassIDType 名稱)；MonoBehaviour 另行計算位移
+NAME_LEADING_TYPES = {"TextAsset", "Texture2D", "Material", "Font"}
+
+
+def _raw_name_offset(obj):
+    if obj.type.name in NAME_LEADING_TYPES:
+        return 0
+    if obj.type == ClassIDType.MonoBehaviour:
+        # m_GameObject (PPtr) + m_Enabled (對齊至 4) + m_Script (PPtr)
+        pptr_size = 12 if obj.assets_file.header.version >= 14 else 8
+        return pptr_size * 2 + 4
+    return None
+
+
+def read_object_name_raw(obj):
+    """
+    直接從物件的位元組範圍解碼開頭的 m_Name 字串，不經過 TypeTree。
+    版面不符預期時回傳 None。
+    """
+    offset = _raw_name_offset(obj)
+    if offset is None or offset + 4 > obj.byte_size:
+        return None
+    reader = obj.reader
+    position = reader.Position
+    try:
+        if obj.type == ClassIDType.MonoBehaviour:
+            # m_Enabled 緊接在第一個 PPtr 之後，對齊後的填充位元組必為 0
+            reader.Position = obj.byte_start + (offset - 4) // 2
+            enabled = reader.read_bytes(4)
+            if enabled[0] > 1 or any(enabled[1:]):
+                return None
+        reader.Position = obj.byte_start + offset
+        length = reader.read_int()
+        if length < 0 or offset + 4 + length > obj.byte_size:
+            return None
+        return reader.read_bytes(length).decode("utf-8")
+    except Exception:
+        return None
+    finally:
+        reader.Position = position
+
+
+def peek_object_name(obj):
+    """只讀取物件的名稱欄位；無法取得時回傳 None。"""
+    name = read_object_name_raw(obj)
+    if name is not None:
+        return name
+    try:
+        return obj.peek_name()
+    except Exception:
+        return None
+
+
+class ObjectIndex:
+    """
+    以 (ClassIDType, m_Name) 為鍵的物件索引。每種類型只在第一次查詢時
+    掃描一次，且只讀取名稱欄位，完整解析只留給真正命中的物件。
+    """
+
+    def __init__(self, env):
+        self._env = env
+        self._by_type = {}
+        self._by_name = {}
+
+    def _ensure_type(self, class_type):
+        if class_type in self._by_type:
+            return
+        objects = [obj for obj in self._env.objects if obj.type == class_type]
+        self._by_type[class_type] = objects
+        for obj in objects:
+            name = peek_object_name(obj)
+            if name:
+                self._by_name.setdefault((class_type, name), []).append(obj)
+
+    def of_type(self, class_type):
+        self._ensure_type(class_type)
+        return self._by_type[class_type]
+
+    def find(self, class_type, name):
+        self._ensure_type(class_type)
+        return self._by_name.get((class_type, name), [])
+
+    def find_first(self, class_type, names):
+        for name in names:
+            found = self.find(class_type, name)
+            if found:
+                return found[0]
+        return None
+
+    def find_prefix(self, class_type, prefix):
+        self._ensure_type(class_type)
+        return [
+            obj
+            for (typ, name), objs in self._by_name.items()
+            if typ == class_type and name.startswith(prefix)
+            for obj in objs
+        ]
+
+    def path_id(self, class_type, name):
+        found = self.find(class_type, name)
+        return found[0].path_id if found else None
+
+
+def get_object_index(env):
+    """取得 (必要時建立) 附加在環境上的物件索引。"""
+    index = getattr(env, "_object_index", None)
+    if index is None:
+        index = ObjectIndex(env)
+        env._object_index = index
+    return index
+
+
+# ==============================================================================
+# --- 二進位字形表 ---
+# ==============================================================================
+# JSON 仍是可編輯的來源；.glyphs 為預先編譯的版本，標頭記錄來源 JSON 的
+# SHA-256，內容不一致時自動改用 JSON。
+GLYPH_TABLE_MAGIC = b"SKGT"
+GLYPH_TABLE_VERSION = 1
+GLYPH_TABLE_EXTENSION = ".glyphs"
+GLYPH_TABLE_HEADER = struct.Struct("<4sH32sII")
+GLYPH_FIELDS = ("id", "x", "y", "width", "height", "xOffset", "yOffset", "xAdvance", "scale")
+GLYPH_RECORD = struct.Struct("<i8f")
+
+
+def compile_glyph_table(source_dict, source_digest):
+    """將字型 JSON 內容編譯成二進位字形表。欄位不符時拋出 ValueError。"""
+    info_bytes = json.dumps(
+        source_dict["m_fontInfo"], ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+    glyphs = source_dict["m_glyphInfoList"]
+    buffer = bytearray(
+        GLYPH_TABLE_HEADER.size + len(info_bytes) + GLYPH_RECORD.size * len(glyphs)
+    )
+    GLYPH_TABLE_HEADER.pack_into(
+        buffer, 0, GLYPH_TABLE_MAGIC, GLYPH_TABLE_VERSION, source_digest,
+        len(info_bytes), len(glyphs),
+    )
+    offset = GLYPH_TABLE_HEADER.size
+    buffer[offset:offset + len(info_bytes)] = info_bytes
+    offset += len(info_bytes)
+    for glyph in glyphs:
+        if tuple(glyph) != GLYPH_FIELDS:
+            raise ValueError(f"字形欄位不符: {sorted(glyph)}")
+        GLYPH_RECORD.pack_into(buffer, offset, *(glyph[k] for k in GLYPH_FIELDS))
+        offset += GLYPH_RECORD.size
+    return bytes(buffer)
+
+
+def split_glyph_table(blob):
+    """
+    拆解二進位字形表，回傳 (來源雜湊, m_fontInfo, 字形數量, 字形記錄位元組)。
+    格式不符時回傳 None。
+    """
+    magic, version, digest, info_size, count = GLYPH_TABLE_HEADER.unpack_from(blob, 0)
+    if magic != GLYPH_TABLE_MAGIC or version != GLYPH_TABLE_VERSION:
+        return None
+    offset = GLYPH_TABLE_HEADER.size
+    font_info = json.loads(bytes(blob[offset:offset + info_size]).decode("utf-8"))
+    offset += info_size
+    records = memoryview(blob)[offset:offset + GLYPH_RECORD.size * count]
+    return digest, font_info, count, records
+
+
+def parse_glyph_table(blob, source_digest=None):
+    """
+    解析二進位字形表，回傳與字型 JSON 相同結構的 dict。
+    提供 source_digest 時，來源雜湊不符則回傳 None。
+    """
+    parts = split_glyph_table(blob)
+    if parts is None:
+        return None
+    digest, font_info, _, records = parts
+    if source_digest is not None and digest != source_digest:
+        return None
+    return {
+        "m_fontInfo": font_info,
+        "m_glyphInfoList": [
+            dict(zip(GLYPH_FIELDS, values)) for values in GLYPH_RECORD.iter_unpack(records)
+        ],
+    }
+
+
+def _glyph_table_paths(source_json_path):
+    name = os.path.splitext(os.path.basename(source_json_path))[0]
+    yield os.path.splitext(source_json_path)[0] + GLYPH_TABLE_EXTENSION
+    if Config.CACHE_FOLDER:
+        folder = os.path.basename(os.path.dirname(source_json_path))
+        yield os.path.join(Config.CACHE_FOLDER, "glyphs", folder, name + GLYPH_TABLE_EXTENSION)
+
+
+def write_glyph_table(output_path, blob):
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    temp_path = output_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(blob)
+    os.replace(temp_path, output_path)
+
+
+def convert_font_json(source_json_path, output_path=None):
+    """把字型 JSON 轉換成 .glyphs 檔，預設輸出在 JSON 旁邊。"""
+    with open(source_json_path, "rb") as f:
+        raw = f.read()
+    blob = compile_glyph_table(json.loads(raw), hashlib.sha256(raw).digest())
+    if output_path is None:
+        output_path = next(_glyph_table_paths(source_json_path))
+    write_glyph_table(output_path, blob)
+    return output_path
+
+
+def load_glyph_table_blob(source_json_path):
+    """
+    取得與 JSON 內容相符的二進位字形表。沒有現成檔案時由 JSON 編譯，
+    並寫入快取資料夾供下次使用；JSON 不符合字形表格式時回傳 None。
+    """
+    with open(source_json_path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).digest()
+    pack = get_prebaked_pack()
+    baked = pack.get(prebaked_glyph_key(digest)) if pack is not None else None
+    if baked is not None:
+        return bytes(baked[0])
+    for path in _glyph_table_paths(source_json_path):
+        try:
+            with open(path, "rb") as f:
+                blob = f.read()
+            if GLYPH_TABLE_HEADER.unpack_from(blob, 0)[2] == digest:
+                return blob
+        except (OSError, struct.error):
+            continue
+
+    try:
+        blob = compile_glyph_table(json.loads(raw), digest)
+    except (KeyError, ValueError, TypeError, struct.error):
+        return None
+    if Config.CACHE_FOLDER:
+        try:
+            write_glyph_table(list(_glyph_table_paths(source_json_path))[-1], blob)
+        except OSError:
+            pass
+    return blob
+
+
+def load_font_source(source_json_path):
+    """載入字型資料，優先使用二進位字形表，否則解析 JSON。"""
+    blob = load_glyph_table_blob(source_json_path)
+    table = parse_glyph_table(blob) if blob is not None else None
+    if table is not None:
+        return table
+    with open(source_json_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# ==============================================================================
+# --- TypeTree 原始位元組定位 ---
+# ==============================================================================
+TYPETREE_PRIMITIVE_SIZES = {
+    "SInt8": 1, "UInt8": 1, "char": 1, "bool": 1,
+    "short": 2, "SInt16": 2, "unsigned short": 2, "UInt16": 2,
+    "int": 4, "SInt32": 4, "unsigned int": 4, "UInt32": 4, "Type*": 4, "float": 4,
+    "long long": 8, "SInt64": 8, "unsigned long long": 8, "UInt64": 8,
+    "FileSize": 8, "double": 8,
+}
+TYPETREE_ALIGN_FLAG = 0x4000
+TYPETREE_UNSUPPORTED_TYPES = {"ReferencedObject", "ManagedReferencesRegistry"}
+
+
+def _is_aligned_node(node):
+    return bool((node.m_MetaFlag or 0) & TYPETREE_ALIGN_FLAG)
+
+
+def _align4(pos):
+    return (pos + 3) & ~3
+
+
+def typetree_fixed_size(node):
+    """節點序列化後的固定長度；含陣列、字串或對齊時回傳 None。"""
+    if _is_aligned_node(node):
+        return None
+    size = TYPETREE_PRIMITIVE_SIZES.get(node.m_Type)
+    if size is not None:
+        return size
+    if node.m_Type in ("string", "TypelessData") or node.m_Type in TYPETREE_UNSUPPORTED_TYPES:
+        return None
+    if node.m_Children and node.m_Children[0].m_Type == "Array":
+        return None
+    total = 0
+    for child in node.m_Children:
+        size = typetree_fixed_size(child)
+        if size is None:
+            return None
+        total += size
+    return total
+
+
+def skip_typetree_value(node, data, pos, endian):
+    """
+    依 UnityPy read_value 的規則跳過一個欄位，回傳欄位結束位置。
+    固定長度的陣列元素整段跳過，不逐一解析。
+    """
+    align = _is_aligned_node(node)
+    size = TYPETREE_PRIMITIVE_SIZES.get(node.m_Type)
+    if size is not None:
+        pos += size
+    elif node.m_Type == "string":
+        (length,) = struct.unpack_from(endian + "i", data, pos)
+        pos += 4
+        if 0 < length <= len(data) - pos:
+            pos = _align4(pos + length)
+    elif node.m_Type == "TypelessData":
+        (length,) = struct.unpack_from(endian + "i", data, pos)
+        pos += 4 + length
+    elif node.m_Type in TYPETREE_UNSUPPORTED_TYPES:
+        raise ValueError(f"不支援的 TypeTree 類型: {node.m_Type}")
+    elif node.m_Children and node.m_Children[0].m_Type == "Array":
+        array = node.m_Children[0]
+        align = align or _is_aligned_node(array)
+        (count,) = struct.unpack_from(endian + "i", data, pos)
+        pos += 4
+        if count < 0:
+            raise ValueError("TypeTree 陣列長度為負數")
+        subtype = array.m_Children[1]
+        element_size = typetree_fixed_size(subtype)
+        if element_size is not None:
+            pos += element_size * count
+        elif _is_aligned_node(subtype):
+            # 對應 read_value_array：基本型別整段讀取後只對齊一次
+            primitive_size = TYPETREE_PRIMITIVE_SIZES.get(subtype.m_Type)
+            if primitive_size is not None:
+                pos = _align4(pos + primitive_size * count)
+            elif subtype.m_Type == "string":
+                for _ in range(count):
+                    (length,) = struct.unpack_from(endian + "i", data, pos)
+                    pos += 4
+                    if 0 < length <= len(data) - pos:
+                        pos = _align4(pos + length)
+                pos = _align4(pos)
+            else:
+                raise ValueError(f"不支援的對齊陣列元素: {subtype.m_Type}")
+        else:
+            for _ in range(count):
+                pos = skip_typetree_value(subtype, data, pos, endian)
+    else:
+        for child in node.m_Children:
+            pos = skip_typetree_value(child, data, pos, endian)
+
+    if align:
+        pos = _align4(pos)
+    if pos > len(data):
+        raise ValueError("TypeTree 欄位超出物件資料範圍")
+    return pos
+
+
+def find_typetree_field_spans(root, data, endian, names):
+    """回傳最上層欄位在物件資料中的位元組範圍 {欄位名: (起點, 終點)}。"""
+    wanted, spans, pos = set(names), {}, 0
+    for child in root.m_Children:
+        end = skip_typetree_value(child, data, pos, endian)
+        if child.m_Name in wanted:
+            spans[child.m_Name] = (pos, end)
+            if len(spans) == len(wanted):
+                break
+        pos = end
+    return spans
+
+
+def serialize_typetree_field(value, node, endian, start, assets_file=None):
+    """以 UnityPy 序列化單一欄位；start 用來保持與原位置相同的對齊。"""
+    padding = start % 4
+    writer = EndianBinaryWriter(b"\0" * padding, endian=endian)
+    TypeTreeHelper.write_typetree(value, node, writer, assets_file)
+    return writer.bytes[padding:]
+
+
+def splice_typetree_fields(data, replacements):
+    """
+    以新內容取代多個欄位範圍。replacements: [((起點, 終點), 新位元組)]。
+    長度差不是 4 的倍數時會破壞後續欄位的對齊，回傳 None。
+    """
+    parts, pos = [], 0
+    for (start, end), payload in sorted(replacements, key=lambda r: r[0][0]):
+        if (len(payload) - (end - start)) % 4:
+            return None
+        parts.append(data[pos:start])
+        parts.append(payload)
+        pos = end
+    parts.append(data[pos:])
+    return b"".join(parts)
+
+
+# ==============================================================================
+# --- 預先烘焙資源包 ---
+# ==============================================================================
+# 建置時把 CHT 資料夾轉成可直接使用的位元組：紋理編碼結果與二進位字形表。
+# 文字檔本身即 m_Script 內容，執行時直接序列化即可，不納入資源包。
+# 索引鍵皆由來源內容雜湊組成，來源改變時自然失效。
+PREBAKED_PACK_MAGIC = b"SKPK"
+PREBAKED_PACK_VERSION = 1
+PREBAKED_PACK_HEADER = struct.Struct("<4sHI")
+# 平台與格式以 BuildTarget / TextureFormat 名稱記錄，使用時才載入 UnityPy
+PREBAKED_PLATFORMS = {
+    "Windows": "StandaloneWindows64",
+    "macOS": "StandaloneOSX",
+    "Linux": "StandaloneLinux64",
+}
+PREBAKED_TEXTURE_FORMATS = ("BC7",)
+PREBAKED_FONT_FOLDERS = ("font_new", "font_old")
+
+_prebaked_pack_cache = {}
+
+
+class PrebakedPack:
+    """以 mmap 開啟的預先烘焙資源包，依索引鍵取出位元組。"""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_size = PREBAKED_PACK_HEADER.unpack_from(self._mapped, 0)
+        if magic != PREBAKED_PACK_MAGIC or version != PREBAKED_PACK_VERSION:
+            raise ValueError("資源包格式不符")
+        start = PREBAKED_PACK_HEADER.size
+        index = json.loads(self._mapped[start:start + index_size].decode("utf-8"))
+        self.meta = index["meta"]
+        self._entries = index["entries"]
+        self._data_start = start + index_size
+
+    def get(self, key):
+        """回傳 (位元組, 附加資訊)；沒有此鍵時回傳 None。"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        offset, size, extra = entry
+        start = self._data_start + offset
+        return self._mapped[start:start + size], extra
+
+
+def get_prebaked_pack():
+    """取得目前 Unity 版本可用的資源包；不存在或版本不符時回傳 None。"""
+    path = Config.PREBAKED_PACK_PATH
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    cache_key = (path, st.st_size, st.st_mtime_ns)
+    if cache_key not in _prebaked_pack_cache:
+        _prebaked_pack_cache.clear()
+        try:
+            _prebaked_pack_cache[cache_key] = PrebakedPack(path)
+        except (OSError, ValueError, struct.error) as e:
+            print(f"  - [警告] 無法讀取預先烘焙資源包: {e}")
+            _prebaked_pack_cache[cache_key] = None
+    pack = _prebaked_pack_cache[cache_key]
+    if pack is None or pack.meta.get("unity_version") != Config.UNITY_VERSION:
+        return None
+    return pack
+
+
+def prebaked_glyph_key(digest):
+    return "glyphs:" + digest.hex()
+
+
+def bake_prebaked_pack(output_path=None):
+    """建置時執行：把 CHT 資料夾的字形表與紋理烘焙成單一索引資源包。"""
+    output_path = output_path or Config.PREBAKED_PACK_PATH
+    entries, payloads, offset = {}, [], 0
+
+    def add(key, payload, extra=None):
+        nonlocal offset
+        if key in entries:
+            return
+        entries[key] = [offset, len(payload), extra]
+        payloads.append(payload)
+        offset += len(payload)
+
+    png_paths = []
+    for folder in PREBAKED_FONT_FOLDERS + ("logo",):
+        folder_path = os.path.join(Config.CHT_FOLDER_PATH, folder)
+        if not os.path.isdir(folder_path):
+            continue
+        for name in sorted(os.listdir(folder_path)):
+            path = os.path.join(folder_path, name)
+            if name.endswith(".json"):
+                with open(path, "rb") as f:
+                    raw = f.read()
+                digest = hashlib.sha256(raw).digest()
+                add(prebaked_glyph_key(digest), compile_glyph_table(json.loads(raw), digest))
+            elif name.endswith(".png"):
+                png_paths.append(path)
+
+    # 桌面平台的編碼結果相同，每種格式只編碼一次，其餘平台的索引項指向同一份資料
+    platforms = [BuildTarget[name] for name in PREBAKED_PLATFORMS.values()]
+    jobs, keys = [], []
+    for path in png_paths:
+        png_sha256 = hash_file(path)
+        with Image.open(path) as img:
+            img.load()
+        for format_name in PREBAKED_TEXTURE_FORMATS:
+            texture_format = TextureFormat[format_name]
+            keys.append([texture_cache_key(png_sha256, texture_format, platform, img.size) for platform in platforms])
+            jobs.append((img, texture_format, platforms[0]))
+    for platform_keys, (image_binary, new_format) in zip(keys, encode_textures_parallel(jobs)):
+        add(platform_keys[0], image_binary, {"format": int(new_format)})
+        for key in platform_keys[1:]:
+            entries.setdefault(key, entries[platform_keys[0]])
+
+    index = json.dumps(
+        {
+            "meta": {
+                "unity_version": Config.UNITY_VERSION,
+                "platforms": sorted(PREBAKED_PLATFORMS),
+            },
+            "entries": entries,
+        },
+        separators=(",", ":"),
+    ).encode("utf-8")
+    temp_path = output_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(PREBAKED_PACK_HEADER.pack(PREBAKED_PACK_MAGIC, PREBAKED_PACK_VERSION, len(index)))
+        f.write(index)
+        for payload in payloads:
+            f.write(payload)
+    os.replace(temp_path, output_path)
+    print(f"[資訊] 已輸出預先烘焙資源包: {output_path} ({len(entries)} 項, {offset} bytes)")
+    return output_path
+
+
 # ==============================================================================
 # --- 腳本核心邏輯 (處理 Unity 資源) ---
 # ==============================================================================
 def find_target_font_path_id(font_bundle_env):
     """在 fonts_assets_chinese.bundle 中查找目標字體的 PathID"""
     print("[資訊] 正在查找目標字體 PathID...")
-    target_names = {"chinese_body_bold", "do_not_use_chinese_body_bold"}
-    for obj in font_bundle_env.objects:
-        if obj.type.name == "MonoBehaviour":
-            try:
-                data = obj.read()
-                if hasattr(data, "m_Name") and data.m_Name in target_names:
-                    print(
-                        f"  - [資訊] 找到目標字體 '{data.m_Name}'，PathID: {obj.path_id}"
-                    )
-                    return obj.path_id
-            except Exception:
-                continue
+    target_names = ["chinese_body_bold", "do_not_use_chinese_body_bold"]
+    index = get_object_index(font_bundle_env)
+    for name in target_names:
+        path_id = index.path_id(ClassIDType.MonoBehaviour, name)
+        if path_id is not None:
+            print(f"  - [資訊] 找到目標字體 '{name}'，PathID: {path_id}")
+            return path_id
     print(
         "  - [警告] 未在 fonts_assets_chinese.bundle 中找到目標字體。"
     )
     return None
 
 
-def process_map_font_bundle(map_font_env, font_bundle_env, target_font_path_id):
-    """修改 maps_assets_all.bundle，增加對 defaultFont 的檢查"""
+@profiled
+def process_map_font_bundle(map_font_env, target_bundle_internal_name, target_font_path_id):
+    """
+    修改 maps_assets_all.bundle，增加對 defaultFont 的檢查
+    target_bundle_internal_name: fonts_assets_chinese.bundle 的內部 CAB 名稱
+    """
     if not target_font_path_id:
         return
 
@@ -440,7 +2186,6 @@ def process_map_font_bundle(map_font_env, font_bundle_env, target_font_path_id):
         print("  - [錯誤] 在 maps_assets_all.bundle 中找不到主要的 asset 檔案。")
         return
 
-    target_bundle_internal_name = find_cab_name_in_bundle(font_bundle_env)
     if not target_bundle_internal_name:
         print(f"  - [錯誤] 無法在 '{Config.BUNDLE_FILE_PATH}' 中確定內部 CAB 名称。")
         return
@@ -457,7 +2202,8 @@ def process_map_font_bundle(map_font_env, font_bundle_env, target_font_path_id):
             
     if font_bundle_file_id == -1:
         print(f"  - [資訊] 正在添加對 '{target_bundle_internal_name}' 的外部引用...")
-        new_external = FileIdentifier.__new__(FileIdentifier)
+        file_identifier = FileIdentifier.resolve()
+        new_external = file_identifier.__new__(file_identifier)
         new_external.path = (
             f"archive:/{target_bundle_internal_name}/{target_bundle_internal_name}"
         )
@@ -469,19 +2215,23 @@ def process_map_font_bundle(map_font_env, font_bundle_env, target_font_path_id):
         main_asset_file.externals.append(new_external)
         font_bundle_file_id = len(main_asset_file.externals)
 
-    # 修改物件引用
+    # 修改物件引用 (先以 TypeTree 結構篩選含有 fontZH 欄位的腳本類型，再完整讀取)
     modified_count = 0
-    for obj in main_asset_file.objects.values():
-        if obj.type.name == "MonoBehaviour":
-            try:
-                tree = obj.read_typetree()
-                if "fontZH" in tree and isinstance(tree["fontZH"], dict):
-                    tree["fontZH"]["m_FileID"] = font_bundle_file_id
-                    tree["fontZH"]["m_PathID"] = target_font_path_id
-                    obj.save_typetree(tree)
-                    modified_count += 1
-            except Exception:
+    for obj in get_object_index(map_font_env).of_type(ClassIDType.MonoBehaviour):
+        if obj.assets_file is not main_asset_file:
+            continue
+        try:
+            node = obj._get_typetree_node()
+            if not any(child.m_Name == "fontZH" for child in node.m_Children):
                 continue
+            tree = obj.read_typetree(node)
+            if "fontZH" in tree and isinstance(tree["fontZH"], dict):
+                tree["fontZH"]["m_FileID"] = font_bundle_file_id
+                tree["fontZH"]["m_PathID"] = target_font_path_id
+                obj.save_typetree(tree, node)
+                modified_count += 1
+        except Exception:
+            continue
 
     if modified_count > 0:
         print(f"  - [成功] 已成功修改 {modified_count} 個地圖文本物件的字體引用。")
@@ -489,6 +2239,7 @@ def process_map_font_bundle(map_font_env, font_bundle_env, target_font_path_id):
         print("  - [警告] 未找到任何需要修改的目標地圖文本物件。")
 
 
+@profiled
 def process_title_bundle(env):
     print("[資訊] 開始處理 Title Bundle...")
     TARGET_ASSET_NAME_PREFIX = "sactx-0-1024x1024-BC7-Title-"
@@ -500,51 +2251,92 @@ def process_title_bundle(env):
     if not os.path.exists(source_png_path):
         print(f"  - [資訊] 找不到 '{source_png_path}'，跳過 Title Logo 替換。")
         return
-    for obj in env.objects:
-        if obj.type.name == "Texture2D":
-            try:
-                data = obj.read()
-                if hasattr(data, "m_Name") and data.m_Name.startswith(
-                    TARGET_ASSET_NAME_PREFIX
-                ):
-                    print(f"  - [紋理] 找到目標 Title Logo: '{data.m_Name}'")
-                    if not (data.m_StreamData and data.m_StreamData.path):
-                        print("  - [警告] Title Logo 不是 .resS 格式，暫不支援。")
-                        break
-                    with Image.open(source_png_path) as img:
-                        image_binary, new_format = (
-                            Texture2DConverter.image_to_texture2d(
-                                img,
-                                data.m_TextureFormat,
-                                data.assets_file.target_platform,
-                            )
-                        )
-                    resS_path = os.path.basename(data.m_StreamData.path)
-                    bundle_file = data.assets_file.parent
-                    resS_file = bundle_file.files[resS_path]
-                    new_ress_stream = BytesIO(image_binary)
-                    wrapper = FileWrapper(resS_file, new_ress_stream)
-                    bundle_file.files[resS_path] = wrapper
-                    
-                    data.m_StreamData.offset = 0
-                    data.m_StreamData.size = len(image_binary)
-                    data.m_Width = img.width
-                    data.m_Height = img.height
-                    data.m_TextureFormat = new_format
-                    data.m_CompleteImageSize = len(image_binary)
-                    if hasattr(data, "image_data"):
-                        data.image_data = b""
-                    data.save()
-                    print(f"    - [紋理] 已更新 Title Logo。")
-                    break
-            except Exception as e:
-                print(f"  - [嚴重警告] Title Logo 處理錯誤: {e}")
+    index = get_object_index(env)
+    for obj in index.find_prefix(ClassIDType.Texture2D, TARGET_ASSET_NAME_PREFIX):
+        try:
+            data = obj.read()
+            print(f"  - [紋理] 找到目標 Title Logo: '{data.m_Name}'")
+            if not (data.m_StreamData and data.m_StreamData.path):
+                print("  - [警告] Title Logo 不是 .resS 格式，暫不支援。")
+                break
+            [(image_binary, new_format, (width, height))] = encode_png_textures(
+                [(source_png_path, data.m_TextureFormat, data.assets_file.target_platform, None)]
+            )
+            resS_path = os.path.basename(data.m_StreamData.path)
+            bundle_file = data.assets_file.parent
+            rewrite_resS(bundle_file, resS_path, [(data, image_binary)])
+            
+            data.m_Width = width
+            data.m_Height = height
+            data.m_TextureFormat = new_format
+            data.m_CompleteImageSize = len(image_binary)
+            if hasattr(data, "image_data"):
+                data.image_data = b""
+            data.save()
+            print(f"    - [紋理] 已更新 Title Logo。")
+            break
+        except Exception as e:
+            print(f"  - [嚴重警告] Title Logo 處理錯誤: {e}")
+
+
+def patch_font_raw(obj_reader, blob):
+    """
+    直接在物件原始位元組中替換 m_fontInfo 與 m_glyphInfoList，
+    不經過整棵 TypeTree 的 dict 往返。版面不符預期時回傳 False。
+    """
+    node = obj_reader._get_typetree_node()
+    children = {child.m_Name: child for child in node.m_Children}
+    glyph_node = children.get("m_glyphInfoList")
+    info_node = children.get("m_fontInfo")
+    if glyph_node is None or info_node is None or not glyph_node.m_Children:
+        return False
+    element = glyph_node.m_Children[0].m_Children[1]
+    if (
+        tuple(child.m_Name for child in element.m_Children) != GLYPH_FIELDS
+        or typetree_fixed_size(element) != GLYPH_RECORD.size
+        or element.m_Children[0].m_Type not in ("int", "SInt32")
+        or any(child.m_Type != "float" for child in element.m_Children[1:])
+    ):
+        return False
+
+    parts = split_glyph_table(blob)
+    if parts is None:
+        return False
+    _, font_info, count, records = parts
+    endian = obj_reader.reader.endian
+    raw = obj_reader.data or obj_reader.get_raw_data()
+    try:
+        spans = find_typetree_field_spans(node, raw, endian, ("m_fontInfo", "m_glyphInfoList"))
+        if len(spans) != 2:
+            return False
+        info_bytes = serialize_typetree_field(
+            font_info, info_node, endian, spans["m_fontInfo"][0], obj_reader.assets_file
+        )
+    except (KeyError, ValueError, TypeError, struct.error):
+        return False
+
+    if endian == "<":
+        glyph_bytes = struct.pack("<i", count) + bytes(records)
+    else:
+        record = struct.Struct(">i8f")
+        glyph_bytes = struct.pack(">i", count) + b"".join(
+            record.pack(*values) for values in GLYPH_RECORD.iter_unpack(records)
+        )
+    new_raw = splice_typetree_fields(
+        raw,
+        [(spans["m_fontInfo"], info_bytes), (spans["m_glyphInfoList"], glyph_bytes)],
+    )
+    if new_raw is None:
+        return False
+    obj_reader.set_raw_data(new_raw)
+    return True
 
 
+@profiled
 def process_font(obj_reader):
+    asset_name = None
     try:
-        data = obj_reader.read()
-        asset_name = data.m_Name
+        asset_name = peek_object_name(obj_reader)
         source_asset_name = (
             "chinese_body_bold"
             if asset_name == "do_not_use_chinese_body_bold"
@@ -554,9 +2346,14 @@ def process_font(obj_reader):
             Config.CURRENT_ASSET_FOLDER, f"{source_asset_name}.json"
         )
         if os.path.exists(source_json_path):
+            # 快速路徑：直接拼接預先序列化的字形陣列
+            blob = load_glyph_table_blob(source_json_path)
+            if blob is not None and patch_font_raw(obj_reader, blob):
+                print(f"  - [字型] 已更新 '{asset_name}' 的數據")
+                return
+
             original_tree = obj_reader.read_typetree()
-            with open(source_json_path, "r", encoding="utf-8") as f:
-                source_dict = json.load(f)
+            source_dict = load_font_source(source_json_path)
 
             if "m_fontInfo" in source_dict:
                 original_tree["m_fontInfo"] = source_dict["m_fontInfo"]
@@ -566,9 +2363,10 @@ def process_font(obj_reader):
             obj_reader.save_typetree(original_tree)
             print(f"  - [字型] 已更新 '{asset_name}' 的數據")
     except Exception as e:
-        print(f"  - [警告] 處理字型 '{getattr(data, 'm_Name', '未知')}' 時出錯: {e}")
+        print(f"  - [警告] 處理字型 '{asset_name or '未知'}' 時出錯: {e}")
 
 
+@profiled
 def process_material(obj_reader):
     try:
         tree = obj_reader.read_typetree()
@@ -602,6 +2400,7 @@ def process_material(obj_reader):
         print(f"  - [警告] 處理材質 '{getattr(obj_reader, 'm_Name', '未知')}' 時出錯: {e}")
 
 
+@profiled
 def process_embedded_texture(data):
     try:
         asset_name = data.m_Name
@@ -613,16 +2412,292 @@ def process_embedded_texture(data):
         safe_name = sanitize_filename(source_asset_name)
         source_png_path = os.path.join(Config.CURRENT_ASSET_FOLDER, f"{safe_name}.png")
         if os.path.exists(source_png_path):
-            with Image.open(source_png_path) as img:
-                data.image = img
-                data.m_Width = img.width
-                data.m_Height = img.height
-                data.save()
-                print(f"  - [紋理] 已替換 (內嵌) '{asset_name}'")
+            platform = data.object_reader.platform if data.object_reader is not None else 0
+            [(image_binary, new_format, (width, height))] = encode_png_textures(
+                [(source_png_path, data.m_TextureFormat, platform, data.m_PlatformBlob)]
+            )
+            # 與 Texture2D.image 的設定方式相同 (不含 mipmap)
+            data.m_Width = width
+            data.m_Height = height
+            if data.m_MipMap is not None:
+                data.m_MipMap = False
+            if data.m_MipCount is not None:
+                data.m_MipCount = 1
+            data.image_data = image_binary
+            data.m_CompleteImageSize = len(image_binary)
+            data.m_TextureFormat = new_format
+            if data.m_StreamData is not None:
+                data.m_StreamData.path = ""
+                data.m_StreamData.offset = 0
+                data.m_StreamData.size = 0
+            data.save()
+            print(f"  - [紋理] 已替換 (內嵌) '{asset_name}'")
     except Exception as e:
         print(f"  - [警告] 處理內嵌紋理 '{data.m_Name}' 時出錯: {e}")
 
 
+# 可直接以原始像素共享給子程序的影像模式；其他模式先轉為 RGBA
+SHAREABLE_IMAGE_MODES = ("RGBA", "RGB", "LA", "L")
+
+
+def encode_texture_from_shared(shm_name, mode, size, texture_format, platform):
+    """子程序：從共享記憶體取得像素並編碼成 Texture2D 資料。"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        img = Image.frombuffer(mode, size, shm.buf, "raw", mode, 0, 1)
+        image_binary, new_format = Texture2DConverter.image_to_texture2d(
+            img, texture_format, platform
+        )
+        del img
+        return image_binary, int(new_format)
+    finally:
+        shm.close()
+
+
+def encode_textures_parallel(jobs, max_workers=None):
+    """
+    以程序池平行編碼多張紋理，像素透過共享記憶體傳遞。
+    jobs: [(PIL.Image, 目標格式, 平台)]；回傳順序與 jobs 相同的 [(資料, 格式)]。
+    """
+    if max_workers is None:
+        max_workers = Config.TEXTURE_WORKERS
+    if max_workers <= 1 or len(jobs) <= 1:
+        # 依序編碼時大型 BC7 紋理改以條帶平行壓縮，整批共用一個程序池
+        with bc7_strip_pool():
+            return [
+                Texture2DConverter.image_to_texture2d(img, texture_format, platform)
+                for img, texture_format, platform in jobs
+            ]
+
+    workers = min(max_workers, len(jobs))
+    snapshot = get_config_snapshot()
+    # 已依紋理平行處理，子程序內不再巢狀建立條帶壓縮程序池
+    snapshot["BC7_WORKERS"] = 1
+    segments = []
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_pipeline_worker,
+            initargs=(snapshot,),
+        ) as executor:
+            futures = []
+            for img, texture_format, platform in jobs:
+                if img.mode not in SHAREABLE_IMAGE_MODES:
+                    img = img.convert("RGBA")
+                pixels = img.tobytes()
+                shm = shared_memory.SharedMemory(create=True, size=len(pixels))
+                segments.append(shm)
+                shm.buf[: len(pixels)] = pixels
+                del pixels
+                futures.append(
+                    executor.submit(
+                        encode_texture_from_shared,
+                        shm.name, img.mode, img.size, int(texture_format), platform,
+                    )
+                )
+            results = [future.result() for future in futures]
+    except (OSError, BrokenProcessPool) as e:
+        print(f"    - [警告] 無法平行編碼紋理，改為依序處理: {e}")
+        return encode_textures_parallel(jobs, max_workers=1)
+    finally:
+        for shm in segments:
+            shm.close()
+            shm.unlink()
+    return [(image_binary, TextureFormat(fmt)) for image_binary, fmt in results]
+
+
+# --- 壓縮紋理快取 ---
+# 以來源 PNG 雜湊、目標格式、平台、尺寸與編碼參數為鍵，保存編碼後的資料
+TEXTURE_CACHE_MAGIC = b"SKTX"
+TEXTURE_CACHE_VERSION = 1
+TEXTURE_CACHE_HEADER = struct.Struct("<4sHi")
+
+
+def texture_encoder_params(texture_format):
+    """影響編碼結果的參數；任何一項改變都會讓舊快取失效。"""
+    if TextureFormat(texture_format) == TextureFormat.BC7:
+        return f"etcpak-{getattr(etcpak, '__version__', 'unknown')}-bc7-{Config.BC7_PROFILE}"
+    return f"unitypy-{UnityPy.__version__}"
+
+
+def texture_cache_key(png_sha256, texture_format, platform, size, platform_blob=None):
+    payload = json.dumps(
+        [
+            png_sha256,
+            int(texture_format),
+            int(platform),
+            list(size),
+            texture_encoder_params(texture_format),
+            hashlib.sha256(bytes(platform_blob or b"")).hexdigest(),
+        ]
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _texture_cache_path(key):
+    return os.path.join(Config.CACHE_FOLDER, "textures", key[:2], f"{key}.bin")
+
+
+def load_cached_texture(key):
+    """回傳 (資料, TextureFormat)；未命中或快取停用時回傳 None。"""
+    pack = get_prebaked_pack()
+    baked = pack.get(key) if pack is not None else None
+    if baked is not None:
+        payload, extra = baked
+        return payload, TextureFormat(extra["format"])
+    if not Config.CACHE_FOLDER:
+        return None
+    try:
+        with open(_texture_cache_path(key), "rb") as f:
+            blob = f.read()
+        magic, version, fmt = TEXTURE_CACHE_HEADER.unpack_from(blob, 0)
+    except (OSError, struct.error):
+        return None
+    if magic != TEXTURE_CACHE_MAGIC or version != TEXTURE_CACHE_VERSION:
+        return None
+    return blob[TEXTURE_CACHE_HEADER.size:], TextureFormat(fmt)
+
+
+def store_cached_texture(key, image_binary, texture_format):
+    if not Config.CACHE_FOLDER:
+        return
+    path = _texture_cache_path(key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(
+                TEXTURE_CACHE_HEADER.pack(
+                    TEXTURE_CACHE_MAGIC, TEXTURE_CACHE_VERSION, int(texture_format)
+                )
+            )
+            f.write(image_binary)
+        os.replace(temp_path, path)
+    except OSError as e:
+        print(f"    - [警告] 無法寫入紋理快取: {e}")
+
+
+@profiled
+def encode_png_textures(jobs, max_workers=None):
+    """
+    編碼 PNG 為 Texture2D 資料，優先使用快取。
+    jobs: [(PNG 路徑, 目標格式, 平台, platform_blob 或 None)]
+    回傳與 jobs 同順序的 [(資料, TextureFormat, (寬, 高))]。
+    """
+    results = [None] * len(jobs)
+    misses = []
+    for i, (png_path, texture_format, platform, platform_blob) in enumerate(jobs):
+        with Image.open(png_path) as img:
+            size = img.size
+        key = texture_cache_key(
+            hash_file(png_path), texture_format, platform, size, platform_blob
+        )
+        # 需要量測品質時一律重新編碼
+        cached = None if Config.REPORT_TEXTURE_PSNR else load_cached_texture(key)
+        if cached is not None:
+            results[i] = (*cached, size)
+        else:
+            misses.append((i, key))
+    if not misses:
+        print(f"    - [資訊] {len(jobs)} 個紋理皆使用快取。")
+        return results
+
+    images = {}
+    for i, _ in misses:
+        with Image.open(jobs[i][0]) as img:
+            img.load()
+        images[i] = img
+    # 帶有 platform_blob 的紋理 (內嵌紋理) 需要完整參數，直接在本程序編碼
+    parallel = [(i, key) for i, key in misses if jobs[i][3] is None]
+    encoded = dict(
+        zip(
+            [i for i, _ in parallel],
+            encode_textures_parallel(
+                [(images[i], jobs[i][1], jobs[i][2]) for i, _ in parallel], max_workers
+            ),
+        )
+    )
+    for i, key in misses:
+        if i not in encoded:
+            _, texture_format, platform, platform_blob = jobs[i]
+            encoded[i] = Texture2DConverter.image_to_texture2d(
+                images[i], texture_format, platform, platform_blob
+            )
+        image_binary, new_format = encoded[i]
+        store_cached_texture(key, image_binary, new_format)
+        results[i] = (image_binary, new_format, images[i].size)
+    return results
+
+
+# --- resS 重寫 ---
+# 可能把資料放在 .resS 的物件類型 (ClassIDType 名稱，皆具有 m_StreamData)
+STREAMED_RESOURCE_TYPES = ("Texture2D", "Texture2DArray", "Texture3D", "Cubemap", "Mesh")
+
+
+def get_file_view(f):
+    """取得 Bundle 內檔案目前內容的 memoryview。"""
+    if isinstance(f, FileWrapper):
+        return f.getbuffer()
+    view = getattr(f, "view", None)
+    if view is not None:
+        return view
+    return memoryview(f.bytes)
+
+
+def find_resS_users(bundle_file, resS_path, known=()):
+    """
+    找出 Bundle 內所有資料位於 resS_path 的物件，回傳 {path_id: 已讀取的物件}。
+    known 中已讀取的物件直接沿用，確保呼叫端後續的修改作用在同一個實例上。
+    """
+    users = {data.object_reader.path_id: data for data in known}
+    for asset_file in bundle_file.files.values():
+        if not isinstance(asset_file, SerializedFile):
+            continue
+        for path_id, obj in asset_file.objects.items():
+            if path_id in users or obj.type.name not in STREAMED_RESOURCE_TYPES:
+                continue
+            data = obj.read()
+            stream = getattr(data, "m_StreamData", None)
+            if stream and stream.path and os.path.basename(stream.path) == resS_path:
+                users[path_id] = data
+    return users
+
+
+def rewrite_resS(bundle_file, resS_path, replacements):
+    """
+    重寫 resS：replacements 為 [(已讀取的物件, 新資料)]。未替換的資料以
+    原始內容的零複製切片保留，並為所有物件重新計算 offset。
+    被替換的物件只更新 m_StreamData，其餘欄位與 save() 由呼叫端處理；
+    offset 有變動的未替換物件會在此直接 save()。回傳新的 resS 大小。
+    """
+    resS_file = bundle_file.files[resS_path]
+    source_view = get_file_view(resS_file)
+    payloads = {data.object_reader.path_id: payload for data, payload in replacements}
+    users = find_resS_users(bundle_file, resS_path, [data for data, _ in replacements])
+
+    segments, offset = [], 0
+    ordered = sorted(users.items(), key=lambda item: int(item[1].m_StreamData.offset))
+    for path_id, data in ordered:
+        stream = data.m_StreamData
+        if path_id in payloads:
+            segment = memoryview(payloads[path_id]).cast("B")
+        else:
+            start = int(stream.offset)
+            segment = source_view[start:start + int(stream.size)]
+        moved = int(stream.offset) != offset
+        stream.offset = offset
+        stream.size = len(segment)
+        if path_id not in payloads and moved:
+            data.save()
+        segments.append(segment)
+        offset += len(segment)
+
+    original_obj = resS_file._original if isinstance(resS_file, FileWrapper) else resS_file
+    bundle_file.files[resS_path] = FileWrapper(original_obj, segments)
+    return offset
+
+
+@profiled
 def process_ress_texture_group(texture_group):
     if not texture_group:
         return
@@ -642,48 +2717,47 @@ def process_ress_texture_group(texture_group):
             safe_name = sanitize_filename(source_asset_name)
             source_png_path = os.path.join(Config.CURRENT_ASSET_FOLDER, f"{safe_name}.png")
             if os.path.exists(source_png_path):
-                with Image.open(source_png_path) as img:
-                    image_binary, new_format = Texture2DConverter.image_to_texture2d(
-                        img,
-                        tex_data.m_TextureFormat,
-                        tex_data.assets_file.target_platform,
-                    )
-                    new_datas.append(
-                        {
-                            "original_obj": tex_data,
-                            "image_binary": image_binary,
-                            "new_format": new_format,
-                            "img": img.copy(),
-                        }
-                    )
+                new_datas.append({"original_obj": tex_data, "png_path": source_png_path})
 
         if not new_datas:
             return
 
-        new_ress_stream = BytesIO()
-        current_offset = 0
-        for data_dict in new_datas:
-            data_dict["new_offset"] = current_offset
-            new_ress_stream.write(data_dict["image_binary"])
-            current_offset += len(data_dict["image_binary"])
-
-        resS_file = bundle_file.files[resS_path]
-        original_obj = (
-            resS_file._original if isinstance(resS_file, FileWrapper) else resS_file
+        # 各紋理獨立編碼 (或取自快取)，完成後仍依原始 offset 順序寫回
+        encoded = encode_png_textures(
+            [
+                (
+                    data_dict["png_path"],
+                    data_dict["original_obj"].m_TextureFormat,
+                    data_dict["original_obj"].assets_file.target_platform,
+                    None,
+                )
+                for data_dict in new_datas
+            ]
+        )
+        for data_dict, (image_binary, new_format, size) in zip(new_datas, encoded):
+            data_dict["data_size"] = len(image_binary)
+            data_dict["new_format"] = new_format
+            data_dict["size"] = size
+
+        # 未替換的紋理 (例如被略過的粗體圖集) 以原始資料保留在同一個 resS 中
+        new_size = rewrite_resS(
+            bundle_file,
+            resS_path,
+            [
+                (data_dict["original_obj"], image_binary)
+                for data_dict, (image_binary, _, _) in zip(new_datas, encoded)
+            ],
         )
-        wrapper = FileWrapper(original_obj, new_ress_stream)
-        bundle_file.files[resS_path] = wrapper
-        print(f"    - [資訊] 已重建 '{resS_path}'，新大小: {current_offset} bytes")
+        del encoded
+        print(f"    - [資訊] 已重建 '{resS_path}'，新大小: {new_size} bytes")
 
         for data_dict in new_datas:
             tex_data = data_dict["original_obj"]
-            img = data_dict["img"]
-            tex_data.m_StreamData.offset = data_dict["new_offset"]
-            tex_data.m_StreamData.size = len(data_dict["image_binary"])
-            tex_data.m_Width = img.width
-            tex_data.m_Height = img.height
+            width, height = data_dict["size"]
+            tex_data.m_Width = width
+            tex_data.m_Height = height
             tex_data.m_TextureFormat = data_dict["new_format"]
-            tex_data.m_CompleteImageSize = len(data_dict["image_binary"])
+            tex_data.m_CompleteImageSize = data_dict["data_size"]
             if hasattr(tex_data, "image_data"):
                 tex_data.image_data = b""
             tex_data.save()
@@ -693,70 +2767,62 @@ def process_ress_texture_group(texture_group):
         traceback.print_exc()
 
 
+@profiled
 def process_bundle(env, skip_bold_atlas=False):
     """
     skip_bold_atlas: 如果為 True，則在處理紋理時會強制忽略 chinese_body_bold Atlas
     """
     print("[資訊] 正在分析與分類資源...")
-    all_objects = []
+    index = get_object_index(env)
 
-    def find_all_objects(container):
-        if hasattr(container, "files") and container.files is not None:
-            for asset_file in list(container.files.values()):
-                if isinstance(asset_file, SerializedFile):
-                    all_objects.extend(asset_file.objects.values())
-                elif isinstance(asset_file, BundleFile):
-                    find_all_objects(asset_file)
-
-    find_all_objects(env)
+    FONT_NAMES = [
+        "chinese_body",
+        "chinese_body_bold",
+        "do_not_use_chinese_body_bold",
+    ]
+    MATERIAL_NAMES = [
+        "simsun_tmpro Material",
+        "chinese_body_bold Material",
+        "do_not_use_chinese_body_bold Material",
+    ]
+    TEXTURE_NAMES = [
+        "chinese_body Atlas",
+        "chinese_body_bold Atlas",
+        "do_not_use_chinese_body_bold Atlas",
+    ]
 
-    materials_to_process, fonts_to_process, textures_by_ress = [], [], {}
-    embedded_textures = []
+    def read_named(class_type, names):
+        for name in names:
+            for obj in index.find(class_type, name):
+                try:
+                    yield obj.read()
+                except Exception as e:
+                    print(f"  - [警告] 預處理資源時出錯: {e}")
+
+    # Font / Material Logic：由處理函數自行讀取，這裡只依名稱挑出物件
+    fonts_to_process = [
+        obj for name in FONT_NAMES for obj in index.find(ClassIDType.MonoBehaviour, name)
+    ]
+    materials_to_process = [
+        obj for name in MATERIAL_NAMES for obj in index.find(ClassIDType.Material, name)
+    ]
 
-    for obj in all_objects:
-        try:
-            if obj.type.name in ["MonoBehaviour", "Material", "Texture2D"]:
-                data = obj.read()
-                if not (hasattr(data, "m_Name") and data.m_Name):
-                    continue
-                asset_name = data.m_Name
-
-                # Font Logic
-                if obj.type.name == "MonoBehaviour" and asset_name in [
-                    "chinese_body",
-                    "chinese_body_bold",
-                    "do_not_use_chinese_body_bold",
-                ]:
-                    fonts_to_process.append(data)
-                
-                # Material Logic
-                elif obj.type.name == "Material" and asset_name in [
-                    "simsun_tmpro Material",
-                    "chinese_body_bold Material",
-                    "do_not_use_chinese_body_bold Material",
-                ]:
-                    materials_to_process.append(data)
-                
-                # Texture Logic
-                elif obj.type.name == "Texture2D" and asset_name in [
-                    "chinese_body Atlas",
-                    "chinese_body_bold Atlas",
-                    "do_not_use_chinese_body_bold Atlas",
-                ]:
-                    # 關鍵修改：如果是原版字體模式 (skip_bold_atlas=True)，且當前是 bold atlas，則跳過
-                    if skip_bold_atlas and asset_name == "chinese_body_bold Atlas":
-                        print("  - [略過] 原版字體模式：跳過 'chinese_body_bold Atlas'")
-                        continue
-                    
-                    if data.m_StreamData and data.m_StreamData.path:
-                        resS_path = os.path.basename(data.m_StreamData.path)
-                        if resS_path not in textures_by_ress:
-                            textures_by_ress[resS_path] = []
-                        textures_by_ress[resS_path].append(data)
-                    else:
-                        embedded_textures.append(data)
-        except Exception as e:
-            print(f"  - [警告] 預處理資源時出錯: {e}")
+    # Texture Logic
+    textures_by_ress, embedded_textures = {}, []
+    texture_names = TEXTURE_NAMES
+    if skip_bold_atlas:
+        # 關鍵修改：如果是原版字體模式 (skip_bold_atlas=True)，則跳過 bold atlas
+        texture_names = [n for n in TEXTURE_NAMES if n != "chinese_body_bold Atlas"]
+        if index.find(ClassIDType.Texture2D, "chinese_body_bold Atlas"):
+            print("  - [略過] 原版字體模式：跳過 'chinese_body_bold Atlas'")
+    for data in read_named(ClassIDType.Texture2D, texture_names):
+        if data.m_StreamData and data.m_StreamData.path:
+            resS_path = os.path.basename(data.m_StreamData.path)
+            if resS_path not in textures_by_ress:
+                textures_by_ress[resS_path] = []
+            textures_by_ress[resS_path].append(data)
+        else:
+            embedded_textures.append(data)
 
     print("[資訊] 分類完成，開始按依賴順序應用修改...")
     for resS_path, texture_group in textures_by_ress.items():
@@ -764,56 +2830,1033 @@ def process_bundle(env, skip_bold_atlas=False):
         process_ress_texture_group(texture_group)
     for tex_data in embedded_textures:
         process_embedded_texture(tex_data)
-    for font_data in fonts_to_process:
-        process_font(font_data.object_reader)
-    for mat_data in materials_to_process:
-        process_material(mat_data.object_reader)
+    for font_obj in fonts_to_process:
+        process_font(font_obj)
+    for mat_obj in materials_to_process:
+        process_material(mat_obj)
 
 
-def process_text_assets(env, text_folder_name: str):
-    """處理 resources.assets 中的文本替換"""
-    current_text_source_folder = os.path.join(Config.CHT_FOLDER_PATH, text_folder_name)
-    print(f"[文字] 來源資料夾: {text_folder_name}")
-
-    text_target_assets = {
-        "ZH_Achievements", "ZH_AutoSaveNames", "ZH_Belltown", "ZH_Bonebottom",
-        "ZH_Caravan", "ZH_City", "ZH_Coral", "ZH_Crawl", "ZH_Credits List",
-        "ZH_Deprecated", "ZH_Dust", "ZH_Enclave", "ZH_Error", "ZH_Fast Travel",
-        "ZH_Forge", "ZH_General", "ZH_Greymoor", "ZH_Inspect", "ZH_Journal",
-        "ZH_Lore", "ZH_MainMenu", "ZH_Map Zones", "ZH_Peak", "ZH_Pilgrims",
-        "ZH_Prompts", "ZH_Quests", "ZH_Shellwood", "ZH_Shop", "ZH_Song",
-        "ZH_Titles", "ZH_Tools", "ZH_UI", "ZH_Under", "ZH_Wanderers",
-        "ZH_Weave", "ZH_Wilds",
-    }
+def serialize_text_script(raw, endian="<"):
+    """把文字檔位元組序列化成 TextAsset 的 m_Script (對齊字串)。"""
+    padding = (4 - len(raw) % 4) % 4
+    return struct.pack(endian + "i", len(raw)) + raw + b"\0" * padding
+
+
+def text_asset_script_span(obj):
+    """回傳 (原始資料, m_Script 範圍)；無法解析時範圍為 None。"""
+    raw = obj.data or obj.get_raw_data()
+    try:
+        spans = find_typetree_field_spans(
+            obj._get_typetree_node(), raw, obj.reader.endian, ("m_Script",)
+        )
+    except (ValueError, struct.error):
+        return raw, None
+    return raw, spans.get("m_Script")
+
+
+def text_asset_script_unchanged(obj, script_bytes):
+    """TextAsset 目前的 m_Script 是否已與 script_bytes 相同。"""
+    raw, span = text_asset_script_span(obj)
+    return span is not None and raw[span[0]:span[1]] == script_bytes
+
+
+def splice_text_asset_script(obj, script_bytes):
+    """以已序列化的 m_Script (位元組序須與物件相同) 取代 TextAsset 的原始位元組。"""
+    raw, span = text_asset_script_span(obj)
+    if span is None:
+        return False
+    new_raw = splice_typetree_fields(raw, [(span, script_bytes)])
+    if new_raw is None:
+        return False
+    obj.set_raw_data(new_raw)
+    return True
+
+
+TEXT_TARGET_ASSETS = (
+    "ZH_Achievements", "ZH_AutoSaveNames", "ZH_Belltown", "ZH_Bonebottom",
+    "ZH_Caravan", "ZH_City", "ZH_Coral", "ZH_Crawl", "ZH_Credits List",
+    "ZH_Deprecated", "ZH_Dust", "ZH_Enclave", "ZH_Error", "ZH_Fast Travel",
+    "ZH_Forge", "ZH_General", "ZH_Greymoor", "ZH_Inspect", "ZH_Journal",
+    "ZH_Lore", "ZH_MainMenu", "ZH_Map Zones", "ZH_Peak", "ZH_Pilgrims",
+    "ZH_Prompts", "ZH_Quests", "ZH_Shellwood", "ZH_Shop", "ZH_Song",
+    "ZH_Titles", "ZH_Tools", "ZH_UI", "ZH_Under", "ZH_Wanderers",
+    "ZH_Weave", "ZH_Wilds",
+)
+# 文字檔小且彼此獨立，讀取以 I/O 等待為主
+TEXT_PREFETCH_WORKERS = 8
+
+
+def _read_text_source(path):
+    """讀取並檢查單一文字檔；回傳 (位元組, 錯誤訊息)，檔案不存在時位元組為 None。"""
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return None, None
+    try:
+        raw.decode("utf-8")
+    except UnicodeDecodeError as e:
+        return raw, f"第 {e.start} 位元組不是有效的 UTF-8"
+    return raw, None
+
+
+def prefetch_text_sources(paths):
+    """以執行緒池平行讀取 {資源名: 路徑}，並預先檢查編碼；回傳 {資源名: 位元組}。"""
+    names = sorted(paths)
+    with ThreadPoolExecutor(max_workers=TEXT_PREFETCH_WORKERS) as executor:
+        results = list(executor.map(_read_text_source, [paths[name] for name in names]))
+
+    sources = {}
+    for name, (raw, error) in zip(names, results):
+        if raw is None:
+            continue
+        if error:
+            print(f"  - [警告] {name}.txt {error}，將照原始位元組寫入。")
+        sources[name] = raw
+    return sources
+
+
+# --- 翻譯疊加層 ---
+# 疊加層放在 CHT/overlays/<名稱>/，只需包含要覆蓋的 ZH_*.txt
+TEXT_OVERLAY_FOLDER = "overlays"
+
+
+def text_layer_names(text_source):
+    """text_source 為單一翻譯資料夾名稱，或 (基底, 疊加層...) 序列。"""
+    if isinstance(text_source, str):
+        return [text_source]
+    return list(text_source)
+
+
+def text_layer_folders(text_source):
+    """
+    回傳各層的資料夾路徑；第一層位於 CHT/，疊加層一律相對於 CHT/overlays/，
+    只有絕對路徑會原樣使用。
+    """
+    base, *overlays = text_layer_names(text_source)
+    folders = [os.path.join(Config.CHT_FOLDER_PATH, base)]
+    for name in overlays:
+        folders.append(os.path.join(Config.CHT_FOLDER_PATH, TEXT_OVERLAY_FOLDER, name))
+    return folders
+
+
+def check_text_layers(text_source):
+    """確認指定的疊加層資料夾都存在，缺少時印出錯誤並回傳 False。"""
+    overlays = text_layer_folders(text_source)[1:]
+    missing = [folder for folder in overlays if not os.path.isdir(folder)]
+    for folder in missing:
+        print(f"\n[錯誤] 找不到翻譯疊加層: {folder}")
+    return not missing
+
+
+def describe_text_source(text_source):
+    names = text_layer_names(text_source)
+    return " + ".join(os.path.basename(os.path.normpath(name)) for name in names)
+
+
+def list_text_overlays():
+    """列出 CHT/overlays 中可用的疊加層名稱。"""
+    folder = os.path.join(Config.CHT_FOLDER_PATH, TEXT_OVERLAY_FOLDER)
+    if not os.path.isdir(folder):
+        return []
+    return sorted(
+        name for name in os.listdir(folder) if os.path.isdir(os.path.join(folder, name))
+    )
 
-    count = 0
-    for obj in env.objects:
-        if obj.type.name == "TextAsset":
+
+def build_text_layer_index(folders):
+    """
+    回傳 {資源名: 來源檔路徑}，後面的圖層覆蓋前面的。只列出目錄不讀取內容；
+    增量修補所需的檔案雜湊由 hash_file 以修補紀錄快取。
+    """
+    targets = set(TEXT_TARGET_ASSETS)
+    index = {}
+    for folder in folders:
+        if not os.path.isdir(folder):
+            continue
+        for name in os.listdir(folder):
+            asset_name, ext = os.path.splitext(name)
+            if ext.lower() == ".txt" and asset_name in targets:
+                index[asset_name] = os.path.join(folder, name)
+    return index
+
+
+@profiled
+def process_text_assets(env, text_folder_name: Union[str, Sequence[str]]):
+    """處理 resources.assets 中的文本替換"""
+    print(f"[文字] 來源資料夾: {describe_text_source(text_folder_name)}")
+    folders = text_layer_folders(text_folder_name)
+    layer_index = build_text_layer_index(folders)
+    for folder in folders[1:]:
+        overridden = sum(os.path.dirname(path) == folder for path in layer_index.values())
+        print(f"  - [文字] 疊加層 {os.path.basename(folder)}: 覆蓋 {overridden} 個文本。")
+
+    sources = prefetch_text_sources(layer_index)
+    count = unchanged = 0
+    index = get_object_index(env)
+    for asset_name, local_bytes in sources.items():
+        for obj in index.find(ClassIDType.TextAsset, asset_name):
+            script_bytes = serialize_text_script(local_bytes, obj.reader.endian)
+            # 內容與遊戲檔案相同時不修改物件，串流輸出會直接複製原始資料
+            if text_asset_script_unchanged(obj, script_bytes):
+                unchanged += 1
+                continue
+            # 文字檔位元組即 m_Script 內容，序列化後直接拼接，不經解碼與重新編碼
+            if Config.TEXT_RAW_SCRIPT and splice_text_asset_script(obj, script_bytes):
+                count += 1
+                continue
             data = obj.read()
-            if data and data.m_Name in text_target_assets:
-                source_txt_path = os.path.join(
-                    current_text_source_folder, f"{data.m_Name}.txt"
-                )
-                if os.path.exists(source_txt_path):
-                    with open(source_txt_path, "rb") as f:
-                        local_bytes = f.read()
-                    data.m_Script = local_bytes.decode("utf-8", "surrogateescape")
-                    data.save()
-                    count += 1
+            data.m_Script = local_bytes.decode("utf-8", "surrogateescape")
+            data.save()
+            count += 1
     print(f"  - [文字] 已替換 {count} 個文本檔案。")
+    if unchanged:
+        print(f"  - [文字] {unchanged} 個文本內容未變更，已略過。")
+
+
+# ==============================================================================
+# --- 串流載入與輸出 (mmap) ---
+# ==============================================================================
+STREAM_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def load_env_mapped(path):
+    """
+    以唯讀 mmap 載入 Unity 檔案。物件資料以 memoryview 切片取用，
+    不會把整個檔案讀入記憶體。
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    env = UnityPy.Environment()
+    env.path = os.path.dirname(path)
+    env.load_file(memoryview(mapped), name=path)
+    env.file = next(iter(env.files.values()))
+    env._mapped_source = mapped
+    return env
+
+
+def close_mapped_env(env):
+    """釋放 load_env_mapped 建立的映射；仍被引用時交由 GC 處理。"""
+    mapped = getattr(env, "_mapped_source", None)
+    if mapped is None:
+        return
+    env.files.clear()
+    env.cabs.clear()
+    env.file = None
+    gc.collect()
+    try:
+        mapped.close()
+    except BufferError:
+        pass
+
+
+def iter_object_source(obj):
+    """逐段產生物件在來源檔中的原始資料；記憶體來源直接回傳零複製切片。"""
+    reader = obj.reader
+    view = getattr(reader, "view", None)
+    if view is not None:
+        yield view[obj.byte_start : obj.byte_start + obj.byte_size]
+        return
+    position = reader.Position
+    reader.Position = obj.byte_start
+    remaining = obj.byte_size
+    while remaining > 0:
+        chunk = reader.read(min(remaining, STREAM_COPY_CHUNK_SIZE))
+        if not chunk:
+            raise EOFError(f"物件 {obj.path_id} 的資料不完整。")
+        remaining -= len(chunk)
+        yield chunk
+    reader.Position = position
+
+
+class SerializedFileWriter:
+    """
+    SerializedFile.save() 的串流版本，輸出位元組與其完全相同。
+    先計算所有物件的位置與 metadata，寫出時未修改的物件直接從來源切片複製，
+    只有已修改的物件 (obj.data) 需要額外記憶體。
+    """
+
+    def __init__(self, serialized_file):
+        self.serialized_file = serialized_file
+        header = serialized_file.header
+        if header.version < 9:
+            raise NotImplementedError("串流輸出僅支援 SerializedFile 版本 9 以上。")
+
+        self.objects = []
+        data_size = 0
+        for obj in serialized_file.objects.values():
+            size = len(obj.data) if obj.data else obj.byte_size
+            self.objects.append((obj, data_size, size))
+            data_size += size
+            data_size += (8 - data_size % 8) % 8
+        self.data_size = data_size
+
+        meta = self._build_metadata()
+        writer = EndianBinaryWriter()
+        header_size = 16 + (4 if header.version < 22 else 4 + 28)
+        data_offset = header_size + len(meta)
+        data_offset += (16 - data_offset % 16) % 16
+        file_size = data_offset + data_size
+        if header.version < 22:
+            writer.write_u_int(len(meta))
+            writer.write_u_int(file_size)
+            writer.write_u_int(header.version)
+            writer.write_u_int(data_offset)
+            writer.write_boolean(">" == header.endian)
+            writer.write_bytes(header.reserved)
+        else:
+            writer.write_u_int(0)
+            writer.write_u_int(0)
+            writer.write_u_int(header.version)
+            writer.write_u_int(0)
+            writer.write_boolean(">" == header.endian)
+            writer.write_bytes(header.reserved)
+            writer.write_u_int(len(meta))
+            writer.write_long(file_size)
+            writer.write_long(data_offset)
+            writer.write_long(serialized_file.unknown)
+        writer.write_bytes(meta)
+        writer.align_stream(16)
+        self.head = writer.bytes
+        self.size = file_size
+
+    def _build_metadata(self):
+        sf = self.serialized_file
+        header = sf.header
+        meta = EndianBinaryWriter(endian=header.endian)
+        if header.version >= 7:
+            meta.write_string_to_null(sf.unity_version)
+        if header.version >= 8:
+            meta.write_int(sf._m_target_platform)
+        if header.version >= 13:
+            meta.write_boolean(sf._enable_type_tree)
+
+        meta.write_int(len(sf.types))
+        for typ in sf.types:
+            typ.write(sf, meta, False)
+        if 7 <= header.version < 14:
+            meta.write_int(sf.big_id_enabled)
+
+        meta.write_int(len(self.objects))
+        for obj, offset, size in self.objects:
+            self._write_object_info(meta, obj, offset, size)
+
+        if header.version >= 11:
+            meta.write_int(len(sf.script_types))
+            for script_type in sf.script_types:
+                script_type.write(header, meta)
+        meta.write_int(len(sf.externals))
+        for external in sf.externals:
+            external.write(header, meta)
+        if header.version >= 20:
+            meta.write_int(len(sf.ref_types))
+            for ref_type in sf.ref_types:
+                ref_type.write(sf, meta, True)
+        if header.version >= 5:
+            meta.write_string_to_null(sf.userInformation)
+        return meta.bytes
+
+    def _write_object_info(self, meta, obj, offset, size):
+        """對應 ObjectReader.write 的 metadata 部分，但不讀取物件資料。"""
+        header = self.serialized_file.header
+        if self.serialized_file.big_id_enabled:
+            meta.write_long(obj.path_id)
+        elif header.version < 14:
+            meta.write_int(obj.path_id)
+        else:
+            meta.align_stream()
+            meta.write_long(obj.path_id)
+        if header.version >= 22:
+            meta.write_long(offset)
+        else:
+            meta.write_u_int(offset)
+        meta.write_u_int(size)
+        meta.write_int(obj.type_id)
+        if header.version < 16:
+            meta.write_u_short(obj.class_id)
+        if 11 <= header.version < 17:
+            meta.write_short(obj.serialized_type.script_type_index)
+        if header.version == 15 or header.version == 16:
+            meta.write_byte(obj.stripped)
+
+    def write_to(self, out):
+        """寫入任何具有 write() 的目標，回傳寫出的位元組數。"""
+        out.write(self.head)
+        written = 0
+        for obj, offset, size in self.objects:
+            if offset > written:
+                out.write(bytes(offset - written))
+            if obj.data:
+                out.write(obj.data)
+            else:
+                for chunk in iter_object_source(obj):
+                    out.write(chunk)
+            written = offset + size
+        if self.data_size > written:
+            out.write(bytes(self.data_size - written))
+        return self.size
+
+
+BUNDLE_PACKER_FLAGS = {
+    "none": (64, 64),
+    "lz4": (194, 2),
+    "lzma": (65, 1),
+}
+LZ4_BLOCK_SIZE = 0x00020000
+
+
+class _BundleBlockSink:
+    """
+    接收 Bundle 的未壓縮資料流，依區塊壓縮後直接寫入檔案並記錄區塊資訊。
+    LZ4 區塊交由執行緒池壓縮 (lz4 會釋放 GIL)，壓縮與寫入磁碟可同時進行。
+    """
+
+    def __init__(self, out, block_info_flag, max_workers=None):
+        self.out = out
+        self.flag = block_info_flag
+        self.switch = block_info_flag & 0x3F
+        self.blocks = []
+        self.total = 0
+        self._buffer = bytearray()
+        self._pending = collections.deque()
+        self._pool = None
+        self._lzma = None
+        if self.switch in (2, 3):
+            self._max_pending = (max_workers or os.cpu_count() or 1) * 2
+            self._pool = ThreadPoolExecutor(max_workers=max_workers)
+        elif self.switch == 1:
+            self._lzma = lzma.LZMACompressor(
+                format=lzma.FORMAT_RAW,
+                filters=[
+                    {
+                        "id": lzma.FILTER_LZMA1,
+                        "dict_size": 0x800000,
+                        "lc": 3,
+                        "lp": 0,
+                        "pb": 2,
+                        "mode": lzma.MODE_NORMAL,
+                        "mf": lzma.MF_BT4,
+                        "nice_len": 123,
+                    }
+                ],
+            )
+            self._lzma_size = out.write(struct.pack("<BI", 0x5D, 0x800000))
+        elif self.switch != 0:
+            raise NotImplementedError(f"不支援的 Bundle 區塊壓縮方式: {self.switch}")
+
+    def write(self, data):
+        view = memoryview(data).cast("B")
+        self.total += len(view)
+        if self.switch == 0:
+            self.out.write(view)
+        elif self._lzma is not None:
+            self._lzma_size += self.out.write(self._lzma.compress(view))
+        else:
+            while view:
+                take = min(len(view), LZ4_BLOCK_SIZE - len(self._buffer))
+                self._buffer += view[:take]
+                view = view[take:]
+                if len(self._buffer) == LZ4_BLOCK_SIZE:
+                    self._submit(bytes(self._buffer))
+                    self._buffer.clear()
+        return len(data)
+
+    def _compress_block(self, chunk):
+        compressed = CompressionHelper.COMPRESSION_MAP[self.switch](chunk)
+        if len(compressed) > len(chunk):
+            return chunk, self.flag ^ self.switch
+        return compressed, self.flag
+
+    def _submit(self, chunk):
+        self._pending.append((len(chunk), self._pool.submit(self._compress_block, chunk)))
+        while len(self._pending) > self._max_pending:
+            self._flush_oldest()
+
+    def _flush_oldest(self):
+        size, future = self._pending.popleft()
+        data, flag = future.result()
+        self.out.write(data)
+        self.blocks.append((size, len(data), flag))
+
+    def close(self):
+        if self.switch == 0:
+            self.blocks.append((self.total, self.total, self.flag))
+        elif self._lzma is not None:
+            self._lzma_size += self.out.write(self._lzma.flush())
+            self.blocks.append((self.total, self._lzma_size, self.flag))
+        else:
+            if self._buffer:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            while self._pending:
+                self._flush_oldest()
+            self._pool.shutdown()
+        return self.blocks
+
+
+def _bundle_block_count(total_size, block_info_flag):
+    if block_info_flag & 0x3F in (2, 3):
+        return max(1, -(-total_size // LZ4_BLOCK_SIZE))
+    return 1
+
+
+def _plan_bundle_entry(name, f):
+    """回傳 (名稱, flags, 大小, 寫入函數)；寫入函數將內容寫入 sink。"""
+    flags = getattr(f, "flags", 0)
+    if isinstance(f, FileWrapper):
+        segments = f.segments
+
+        def write_segments(sink):
+            for segment in segments:
+                sink.write(segment)
+
+        return name, flags, f.Length, write_segments
+    if isinstance(f, EndianBinaryReader):
+        view = getattr(f, "view", None)
+        data = view if view is not None else f.bytes
+        return name, flags, len(data), lambda sink: sink.write(data)
+    if isinstance(f, EndianBinaryWriter):
+        data = f.stream.getbuffer()
+        return name, flags, len(data), lambda sink: sink.write(data)
+    if isinstance(f, SerializedFile) and f.header.version >= 9:
+        writer = SerializedFileWriter(f)
+        return name, flags, writer.size, writer.write_to
+    data = f.save()
+    return name, flags, len(data), lambda sink: sink.write(data)
+
+
+def save_bundle_streamed(bundle_file, out, packer=None):
+    """
+    將 UnityFS BundleFile 直接串流寫入可 seek 的檔案物件。
+    區塊資訊以未壓縮形式寫在預留位置，因此資料可邊壓縮邊寫入；
+    packer 為 none 時輸出與 BundleFile.save() 完全相同。
+    """
+    if bundle_file.signature != "UnityFS":
+        out.write(bundle_file.save(packer=packer))
+        return
+
+    packer = packer or "none"
+    if packer == "original":
+        data_flag = int(bundle_file.dataflags)
+        block_info_flag = bundle_file._block_info_flags
+    elif packer in BUNDLE_PACKER_FLAGS:
+        data_flag, block_info_flag = BUNDLE_PACKER_FLAGS[packer]
+    else:
+        raise NotImplementedError(f"不支援的 Bundle 壓縮方式: {packer}")
+    encryption_flag = int(bundle_file.dataflags.UsesAssetBundleEncryption)
+    data_flag &= ~encryption_flag
+    block_info_flag &= ~encryption_flag
+    # 區塊資訊本身不壓縮，大小才能在寫出資料前確定
+    data_flag &= ~0x3F
+
+    entries = [_plan_bundle_entry(name, f) for name, f in bundle_file.files.items()]
+    total_size = sum(size for _, _, size, _ in entries)
+    block_count = _bundle_block_count(total_size, block_info_flag)
+    block_info_size = 16 + 4 + block_count * 10 + 4 + sum(
+        8 + 8 + 4 + len(name.encode("utf8")) + 1 for name, _, _, _ in entries
+    )
+
+    head = EndianBinaryWriter()
+    head.write_string_to_null(bundle_file.signature)
+    head.write_u_int(bundle_file.version)
+    head.write_string_to_null(bundle_file.version_player)
+    head.write_string_to_null(bundle_file.version_engine)
+    start = out.tell()
+    size_position = start + head.Position
+    head.write_long(0)
+    head.write_u_int(block_info_size)
+    head.write_u_int(block_info_size)
+    head.write_u_int(data_flag)
+    if bundle_file._uses_block_alignment:
+        head.align_stream(16)
+    out.write(head.bytes)
+
+    info_at_end = bool(data_flag & 0x80)
+    if not info_at_end:
+        block_info_position = out.tell()
+        out.write(bytes(block_info_size))
+    if data_flag & 0x200:
+        out.write(bytes((16 - (out.tell() - start) % 16) % 16))
+
+    sink = _BundleBlockSink(out, block_info_flag)
+    for _, _, _, write in entries:
+        write(sink)
+    blocks = sink.close()
+    if len(blocks) != block_count:
+        raise ValueError("Bundle 區塊數量與預估不符。")
+
+    info = EndianBinaryWriter(b"\x00" * 0x10)
+    info.write_int(len(blocks))
+    for uncompressed_size, compressed_size, flag in blocks:
+        info.write_u_int(uncompressed_size)
+        info.write_u_int(compressed_size)
+        info.write_u_short(flag)
+    info.write_int(len(entries))
+    offset = 0
+    for name, flags, size, _ in entries:
+        info.write_long(offset)
+        info.write_long(size)
+        info.write_u_int(flags)
+        info.write_string_to_null(name)
+        offset += size
+
+    if info_at_end:
+        out.write(info.bytes)
+        end = out.tell()
+    else:
+        end = out.tell()
+        out.seek(block_info_position)
+        out.write(info.bytes)
+    out.seek(size_position)
+    out.write(struct.pack(">q", end - start))
+    out.seek(end)
+
+
+def save_unity_file_streamed(unity_file, output_path, packer=None):
+    """依檔案類型選擇串流輸出方式，直接寫入磁碟。"""
+    with open(output_path, "wb") as f:
+        if isinstance(unity_file, BundleFile):
+            save_bundle_streamed(unity_file, f, packer)
+        elif isinstance(unity_file, SerializedFile) and unity_file.header.version >= 9:
+            SerializedFileWriter(unity_file).write_to(f)
+        else:
+            f.write(unity_file.save())
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# ==============================================================================
+# --- TypeTree 快取 ---
+# ==============================================================================
+TYPETREE_CACHE_VERSION = 1
+TYPETREE_CACHE_NAME = "typetree_cache.json"
+
+
+def get_typetree_sources():
+    """回傳 TypeTree 產生器會讀取的遊戲檔案 (與 load_local_game 的判斷一致)。"""
+    if sys.platform != "darwin":
+        game_assembly = os.path.join(Config.GAME_ROOT_PATH, "GameAssembly.dll")
+        if os.path.exists(game_assembly):
+            metadata = os.path.join(
+                Config.SILKSONG_DATA_PATH, "il2cpp_data", "Metadata", "global-metadata.dat"
+            )
+            return [game_assembly, metadata]
+    managed_folder_path = os.path.join(Config.SILKSONG_DATA_PATH, "Managed")
+    return [
+        os.path.join(managed_folder_path, f)
+        for f in sorted(os.listdir(managed_folder_path))
+    ]
+
+
+def load_typetree_cache():
+    path = os.path.join(Config.CACHE_FOLDER, TYPETREE_CACHE_NAME)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        if cache.get("version") == TYPETREE_CACHE_VERSION:
+            return cache
+    except (OSError, ValueError):
+        pass
+    return {"version": TYPETREE_CACHE_VERSION, "files": {}, "key": None, "types": {}}
+
+
+def save_typetree_cache(cache):
+    """寫入快取；與其他子程序同時寫入時合併既有的類型紀錄。"""
+    path = os.path.join(Config.CACHE_FOLDER, TYPETREE_CACHE_NAME)
+    try:
+        os.makedirs(Config.CACHE_FOLDER, exist_ok=True)
+        current = load_typetree_cache()
+        if current["key"] == cache["key"]:
+            cache["types"] = {**current["types"], **cache["types"]}
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+    except OSError as e:
+        print(f"  - [警告] 無法寫入 TypeTree 快取: {e}")
+
+
+def compute_typetree_cache_key(cache):
+    """以 Unity 版本與遊戲 DLL 的雜湊組成快取鍵。"""
+    digest = hashlib.sha256(Config.UNITY_VERSION.encode("utf-8"))
+    for path in get_typetree_sources():
+        digest.update(os.path.basename(path).encode("utf-8"))
+        digest.update(hash_file(path, cache).encode("ascii"))
+    return digest.hexdigest()
+
+
+def typetree_to_rows(root):
+    """將 TypeTreeNode 樹攤平成 [m_Level, m_Type, m_Name, m_MetaFlag] 列表。"""
+    rows, stack = [], [root]
+    while stack:
+        node = stack.pop()
+        rows.append([node.m_Level, node.m_Type, node.m_Name, node.m_MetaFlag])
+        stack.extend(reversed(node.m_Children))
+    return rows
+
+
+def typetree_from_rows(rows):
+    """typetree_to_rows 的反向操作，依層級重建父子關係。"""
+    nodes = [
+        TypeTreeNode(level, type_name, name, 0, 0, m_MetaFlag=meta_flag)
+        for level, type_name, name, meta_flag in rows
+    ]
+    root = parent = prev = nodes[0]
+    stack = []
+    for node in nodes[1:]:
+        if node.m_Level > prev.m_Level:
+            stack.append(parent)
+            parent = prev
+        elif node.m_Level < prev.m_Level:
+            while node.m_Level <= parent.m_Level:
+                parent = stack.pop()
+        parent.m_Children.append(node)
+        prev = node
+    return root
+
+
+@functools.lru_cache(maxsize=None)
+def cached_typetree_generator_class():
+    """TypeTreeGenerator 需待 UnityPy 載入後才能繼承，因此在首次使用時才定義子類別。"""
+
+    class CachedTypeTreeGenerator(TypeTreeGenerator.resolve()):
+        """
+        命中磁碟快取時直接回傳 TypeTree；只有遇到未快取的類型時
+        才載入遊戲 DLL 進行反射。
+        """
+
+        def __init__(self, unity_version):
+            super().__init__(unity_version)
+            self._game_loaded = False
+            self._disk_cache = load_typetree_cache()
+            try:
+                key = compute_typetree_cache_key(self._disk_cache)
+            except OSError:
+                key = None
+            if self._disk_cache["key"] != key:
+                self._disk_cache["key"] = key
+                self._disk_cache["types"] = {}
+
+        def _load_game(self):
+            if self._game_loaded:
+                return
+            print("  - [資訊] TypeTree 快取未命中，正在解析遊戲 DLL...")
+            with profile_span("typetree_load_game"):
+                if sys.platform == "darwin":
+                    managed_folder_path = os.path.join(Config.SILKSONG_DATA_PATH, "Managed")
+                    self.load_local_dll_folder(managed_folder_path)
+                else:
+                    self.load_local_game(Config.GAME_ROOT_PATH)
+            self._game_loaded = True
+
+        def get_nodes_up(self, assembly, fullname):
+            root = self.cache.get((assembly, fullname))
+            if root is not None:
+                return root
+            cache_key = f"{assembly}:{fullname}"
+            rows = self._disk_cache["types"].get(cache_key)
+            if rows:
+                root = typetree_from_rows(rows)
+                self.cache[(assembly, fullname)] = root
+                return root
+
+            self._load_game()
+            root = super().get_nodes_up(assembly, fullname)
+            self.cache[(assembly, fullname)] = root
+            if self._disk_cache["key"] is not None:
+                self._disk_cache["types"][cache_key] = typetree_to_rows(root)
+                save_typetree_cache(self._disk_cache)
+            return root
+
+    return CachedTypeTreeGenerator
+
+
+# ==============================================================================
+# --- 平行處理管線 ---
+# ==============================================================================
+PipelineTask = collections.namedtuple("PipelineTask", "name func args deps")
+
+
+def get_config_snapshot():
+    """擷取 Config 的所有設定值，供子程序重建相同的執行環境。"""
+    return {
+        key: value
+        for key, value in vars(Config).items()
+        if key.isupper() and not key.startswith("_")
+    }
+
+
+def apply_config_snapshot(snapshot):
+    for key, value in snapshot.items():
+        setattr(Config, key, value)
+
+
+def _init_pipeline_worker(snapshot):
+    apply_config_snapshot(snapshot)
+    if Config.UNITY_VERSION:
+        UnityPy.config.FALLBACK_UNITY_VERSION = Config.UNITY_VERSION
+
+
+def create_typetree_generator():
+    """建立會先查詢磁碟快取、必要時才解析遊戲 DLL 的 TypeTree 產生器。"""
+    with profile_span("typetree_generator"):
+        return cached_typetree_generator_class()(Config.UNITY_VERSION)
+
+
+def save_env_to_workspace(env, game_file_path):
+    output_path = get_workspace_path(game_file_path)
+    with profile_span("save", file=os.path.basename(game_file_path)):
+        save_unity_file_streamed(env.file, output_path, Config.BUNDLE_PACKER)
+    return output_path
+
+
+@profiled
+def pipeline_fonts(source_path, skip_bold_atlas):
+    """字體管線：回傳地圖管線所需的 CAB 名稱與目標字體 PathID。"""
+    with profile_span("load", file=os.path.basename(source_path)):
+        bundle_env = UnityPy.load(source_path)
+    bundle_env.typetree_generator = create_typetree_generator()
+    process_bundle(bundle_env, skip_bold_atlas=skip_bold_atlas)
+    font_ref = {
+        "cab_name": find_cab_name_in_bundle(bundle_env),
+        "path_id": find_target_font_path_id(bundle_env),
+    }
+    save_env_to_workspace(bundle_env, Config.BUNDLE_FILE_PATH)
+    return font_ref
+
+
+@profiled
+def pipeline_text(source_path, text_folder_name):
+    # resources.assets 體積龐大：以 mmap 載入並串流輸出，只有被替換的 TextAsset 佔用記憶體
+    with profile_span("load", file=os.path.basename(source_path)):
+        text_env = load_env_mapped(source_path)
+    try:
+        process_text_assets(text_env, text_folder_name)
+        save_env_to_workspace(text_env, Config.TEXT_ASSETS_FILE_PATH)
+    finally:
+        close_mapped_env(text_env)
+
+
+@profiled
+def pipeline_title(source_path):
+    with profile_span("load", file=os.path.basename(source_path)):
+        title_env = UnityPy.load(source_path)
+    title_env.typetree_generator = create_typetree_generator()
+    process_title_bundle(title_env)
+    save_env_to_workspace(title_env, Config.TITLE_BUNDLE_PATH)
+
+
+@profiled
+def pipeline_map(source_path, font_ref):
+    with profile_span("load", file=os.path.basename(source_path)):
+        map_font_env = UnityPy.load(source_path)
+    map_font_env.typetree_generator = create_typetree_generator()
+    process_map_font_bundle(map_font_env, font_ref["cab_name"], font_ref["path_id"])
+    save_env_to_workspace(map_font_env, Config.MAP_FONT_BUNDLE_PATH)
+
+
+def build_modding_tasks(
+    text_folder_name: Union[str, Sequence[str]],
+    font_mode: str,
+    sources=None,
+    targets_to_build=None,
+    font_ref=None,
+):
+    """
+    建立本次修改的工作清單；只有地圖管線依賴字體管線的結果。
+    sources: {目標: 載入來源路徑}，預設為遊戲檔案本身
+    targets_to_build: 只建立指定目標的工作 (增量修補)
+    font_ref: 字體管線略過時，地圖管線沿用的上次結果
+    """
+    sources = sources or get_patch_targets()
+    selected = set(targets_to_build or get_patch_targets())
+    tasks = []
+    if "fonts" in selected:
+        tasks.append(
+            PipelineTask("fonts", pipeline_fonts, (sources["fonts"], font_mode == "old"), ())
+        )
+    if "text" in selected:
+        tasks.append(
+            PipelineTask("text", pipeline_text, (sources["text"], text_folder_name), ())
+        )
+    if "title" in selected:
+        tasks.append(PipelineTask("title", pipeline_title, (sources["title"],), ()))
+    if font_mode == "new" and "map" in selected:
+        if "fonts" in selected or not font_ref:
+            tasks.append(PipelineTask("map", pipeline_map, (sources["map"],), ("fonts",)))
+        else:
+            tasks.append(PipelineTask("map", pipeline_map, (sources["map"], font_ref), ()))
+    return tasks
+
+
+@profiled
+def run_pipeline_tasks(tasks, max_workers=1):
+    """
+    依相依關係執行工作。相依工作的回傳值會依 deps 順序附加在 args 之後。
+    max_workers <= 1 時於目前程序依序執行。
+    """
+    results = {}
+    pending = list(tasks)
+    known = {task.name for task in tasks}
+    for task in tasks:
+        missing = [dep for dep in task.deps if dep not in known]
+        if missing:
+            raise ValueError(f"工作 '{task.name}' 依賴不存在的工作: {missing}")
+
+    def ready_tasks():
+        return [t for t in pending if all(dep in results for dep in t.deps)]
+
+    def task_args(task):
+        return tuple(task.args) + tuple(results[dep] for dep in task.deps)
+
+    if max_workers <= 1:
+        while pending:
+            ready = ready_tasks()
+            if not ready:
+                raise ValueError("工作之間存在循環依賴。")
+            for task in ready:
+                pending.remove(task)
+                results[task.name] = task.func(*task_args(task))
+        return results
+
+    workers = max(1, min(max_workers, len(tasks)))
+    snapshot = get_config_snapshot()
+    # 管線子程序內還會建立紋理編碼與條帶壓縮程序池，依管線工作數分攤以免超額使用 CPU
+    snapshot["TEXTURE_WORKERS"] = max(1, Config.TEXTURE_WORKERS // workers)
+    snapshot["BC7_WORKERS"] = max(1, Config.BC7_WORKERS // workers)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_pipeline_worker,
+        initargs=(snapshot,),
+    ) as pool:
+        running = {}
+        while pending or running:
+            for task in ready_tasks():
+                pending.remove(task)
+                running[pool.submit(task.func, *task_args(task))] = task.name
+            if not running:
+                raise ValueError("工作之間存在循環依賴。")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+    return results
 
 
 # ==============================================================================
 # --- 主程式入口 ---
 # ==============================================================================
-def main():
+# 翻譯版本資料夾 (互動選單依此順序編號)
+TEXT_FOLDERS = ("Text", "Text_Re", "Text_Chs")
+
+
+def build_arg_parser():
     parser = argparse.ArgumentParser()
     parser.add_argument("--build", help="Target: Windows, Linux, macOS", required=False)
     parser.add_argument("--root", help="Game root directory", required=False)
-    args = parser.parse_args()
+    parser.add_argument(
+        "--jobs", type=int, help="Parallel worker processes (1 = serial)", required=False
+    )
+    parser.add_argument(
+        "--texture-jobs",
+        type=int,
+        help="Processes used to encode atlas textures (1 = serial)",
+        required=False,
+    )
+    parser.add_argument(
+        "--bc7-profile",
+        choices=sorted(BC7_PROFILES),
+        help="BC7 encoding profile (default: balanced)",
+        required=False,
+    )
+    parser.add_argument(
+        "--bc7-jobs",
+        type=int,
+        help="Processes used to compress one large BC7 texture in strips (1 = single call)",
+        required=False,
+    )
+    parser.add_argument(
+        "--bc7-psnr",
+        action="store_true",
+        help="Re-encode textures and report PSNR against the source PNG",
+    )
+    parser.add_argument(
+        "--packer",
+        choices=["none", "lz4", "lzma", "original"],
+        help="Bundle compression when saving (default: none)",
+        required=False,
+    )
+    parser.add_argument(
+        "--bake-pack",
+        nargs="?",
+        const="",
+        metavar="OUTPUT",
+        help="Pre-bake CHT assets into a single pack file (default: CHT/prebaked.pack) and exit",
+    )
+    parser.add_argument(
+        "--compile-fonts",
+        action="store_true",
+        help="Convert CHT/font_* JSON files to binary .glyphs tables and exit",
+    )
+
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        metavar="OUTPUT",
+        help="Record per-phase timing, CPU, memory and I/O to OUTPUT (default: cht_profile.json)",
+    )
+    parser.add_argument(
+        "--profile-format",
+        choices=["json", "chrome"],
+        default="json",
+        help="Profile output format (chrome: load in chrome://tracing or Perfetto)",
+    )
+
+    subparsers = parser.add_subparsers(
+        dest="command", metavar="COMMAND", help="Run headless; omit for the interactive menu"
+    )
+    patch = subparsers.add_parser("patch", help="Apply the Traditional Chinese patch")
+    patch.add_argument("--text", choices=TEXT_FOLDERS, required=True, help="Translation folder")
+    patch.add_argument(
+        "--overlay",
+        action="append",
+        default=[],
+        metavar="NAME",
+        help="Text overlay folder CHT/overlays/NAME (relative to CHT/overlays; absolute paths "
+        "are used as-is) applied on top of --text; repeat to stack, later overlays win",
+    )
+    patch.add_argument("--font", choices=["new", "old"], required=True, help="Font variant")
+    patch.add_argument("-y", "--yes", action="store_true", help="Do not ask for confirmation")
+    patch.add_argument(
+        "--export-delta",
+        metavar="DIR",
+        help="Write binary delta patches to DIR instead of modifying game files",
+    )
+    subparsers.add_parser("restore", help="Restore the original game files from the backup")
+    subparsers.add_parser("verify", help="Check the game files and backups; exit 1 on problems")
+    apply_delta = subparsers.add_parser("apply-delta", help="Apply delta patches to the game files")
+    apply_delta.add_argument("folder", metavar="DIR", help="Folder containing .skdelta files")
+    return parser
+
+
+def main(argv=None) -> int:
+    """命令列進入點；指定子命令時不進入互動選單，並以回傳值作為結束代碼。"""
+    args = build_arg_parser().parse_args(argv)
 
     if args.root:
         Config.GAME_ROOT_PATH = args.root
+    if args.jobs is not None:
+        Config.MAX_WORKERS = max(1, args.jobs)
+    if args.texture_jobs is not None:
+        Config.TEXTURE_WORKERS = max(1, args.texture_jobs)
+    if args.packer:
+        Config.BUNDLE_PACKER = args.packer
+    if args.bc7_profile:
+        Config.BC7_PROFILE = args.bc7_profile
+    if args.bc7_jobs is not None:
+        Config.BC7_WORKERS = max(1, args.bc7_jobs)
+    if args.bc7_psnr:
+        Config.REPORT_TEXTURE_PSNR = True
 
     initial_build_target = "Unknown"
     if args.build:
@@ -827,6 +3870,60 @@ def main():
 
     detect_environment(game_build=initial_build_target)
 
+    if args.profile is not None:
+        Config.PROFILE_PATH = os.path.abspath(
+            args.profile or os.path.join(Config.GAME_ROOT_PATH, "cht_profile.json")
+        )
+        Config.PROFILE_FORMAT = args.profile_format
+        start_profile()
+    try:
+        return run_command(args)
+    finally:
+        if Config.PROFILE_PATH:
+            finish_profile()
+
+
+def run_command(args) -> int:
+    """執行命令列指定的動作，回傳結束代碼。"""
+    if args.bake_pack is not None:
+        bake_prebaked_pack(args.bake_pack or None)
+        return 0
+
+    if args.compile_fonts:
+        for folder in ("font_new", "font_old"):
+            folder_path = os.path.join(Config.CHT_FOLDER_PATH, folder)
+            if not os.path.isdir(folder_path):
+                continue
+            for name in sorted(os.listdir(folder_path)):
+                if name.endswith(".json"):
+                    output_path = convert_font_json(os.path.join(folder_path, name))
+                    print(f"[資訊] 已輸出字形表: {output_path}")
+        return 0
+
+    if args.command == "patch":
+        text_source = (args.text, *args.overlay) if args.overlay else args.text
+        if not check_text_layers(text_source):
+            return 2
+        ok = run_modding(
+            text_folder_name=text_source,
+            font_mode=args.font,
+            delta_output=args.export_delta,
+            assume_yes=args.yes,
+        )
+    elif args.command == "restore":
+        ok = restore_backup()
+    elif args.command == "verify":
+        ok = verify_game_files()
+    elif args.command == "apply-delta":
+        ok = apply_delta_folder(args.folder)
+    else:
+        run_interactive_menu()
+        return 0
+    return 0 if ok else 1
+
+
+def run_interactive_menu():
+    """互動選單 (未指定子命令時使用)。"""
     while True:
         if sys.platform == "win32":
             os.system("cls")
@@ -858,11 +3955,7 @@ def main():
             print("  3. 新版官方簡中 (修車組轉正)")
             trans_choice = input("請選擇翻譯版本 [1-3]: ").strip()
             
-            folder_map = {
-                "1": "Text",
-                "2": "Text_Re",
-                "3": "Text_Chs"
-            }
+            folder_map = dict(zip(("1", "2", "3"), TEXT_FOLDERS))
             selected_text_folder = folder_map.get(trans_choice)
             
             if not selected_text_folder:
@@ -870,6 +3963,22 @@ def main():
                 time.sleep(1)
                 continue
 
+            overlays = list_text_overlays()
+            if overlays:
+                print("\n[翻譯疊加層] (依輸入順序套用，後者優先)")
+                for i, name in enumerate(overlays, 1):
+                    print(f"  {i}. {name}")
+                overlay_choice = input("請輸入要套用的編號，以逗號分隔 (直接按 Enter 略過): ")
+                selected = []
+                for item in overlay_choice.replace("，", ",").split(","):
+                    item = item.strip()
+                    if item.isdigit() and 1 <= int(item) <= len(overlays):
+                        selected.append(overlays[int(item) - 1])
+                    elif item:
+                        print(f"[警告] 忽略無效的編號: {item}")
+                if selected:
+                    selected_text_folder = (selected_text_folder, *selected)
+
             # --- 子選單 2: 選擇字體版本 ---
             print("\n[字體版本選擇]")
             print("  1. 修改字體 (推薦)")
@@ -920,4 +4029,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -6,6 +6,8 @@ from pathlib import Path
 import pytest
 from unittest.mock import Mock, MagicMock
 
+from benchmarks.unity_builders import build_bundle_file, build_serialized_file, tpk_typetree_node
+
 
 @pytest.fixture
 def temp_dir():
@@ -133,3 +135,41 @@ def mock_file_wrapper():
             return data
 
     return MockFileWrapper
+
+
+def text_asset_node():
+    """TextAsset 的 TypeTree 節點"""
+    return tpk_typetree_node(49)
+
+
+@pytest.fixture
+def text_assets_file(temp_dir):
+    """建立含有數個 TextAsset 的 resources.assets 樣本"""
+    node = text_asset_node()
+    objects = [
+        (1, 49, node, {"m_Name": "ZH_General", "m_Script": "原始一般文字"}),
+        (2, 49, node, {"m_Name": "EN_General", "m_Script": "english"}),
+        (3, 49, node, {"m_Name": "ZH_UI", "m_Script": "原始介面"}),
+    ]
+    path = temp_dir / "resources.assets"
+    path.write_bytes(build_serialized_file(objects))
+    return path
+
+
+@pytest.fixture
+def text_bundle_file(temp_dir):
+    """建立包含一個 SerializedFile 與一個 .resS 的 Bundle 樣本"""
+    node = text_asset_node()
+    objects = [
+        (path_id, 49, node, {"m_Name": f"asset_{path_id}", "m_Script": "內容" * path_id})
+        for path_id in range(1, 40)
+    ]
+    serialized = build_serialized_file(objects)
+    ress = bytes(range(256)) * 2048
+    path = temp_dir / "sample.bundle"
+    path.write_bytes(
+        build_bundle_file(
+            [("CAB-sample", serialized, 4), ("CAB-sample.resS", ress, 0)]
+        )
+    )
+    return path
@@ -103,3 +103,67 @@ class TestCLIInterface:
 
             # 這個測試需要在重構後實現具體的螢幕清理測試
             pytest.skip("需要重構螢幕清理邏輯才能進行測試")
+
+
+class TestBatchCommands:
+    """測試非互動的子命令"""
+
+    @pytest.fixture
+    def headless(self, monkeypatch):
+        """略過環境偵測，並確保子命令不會清除畫面或要求輸入"""
+        import sk_cht
+
+        monkeypatch.setattr(sk_cht, "detect_environment", lambda game_build=None: None)
+        monkeypatch.setattr(sk_cht.os, "system", Mock(side_effect=AssertionError("清除畫面")))
+        monkeypatch.setattr("builtins.input", Mock(side_effect=AssertionError("要求輸入")))
+        return sk_cht
+
+    @pytest.mark.integration
+    def test_patch_command_forwards_options(self, headless, monkeypatch):
+        """patch 子命令將參數傳給 run_modding，失敗時結束代碼為 1"""
+        run_modding = Mock(return_value=False)
+        monkeypatch.setattr(headless, "run_modding", run_modding)
+
+        assert headless.main(["patch", "--text", "Text_Re", "--font", "new", "--yes"]) == 1
+        run_modding.assert_called_once_with(
+            text_folder_name="Text_Re", font_mode="new", delta_output=None, assume_yes=True
+        )
+
+    @pytest.mark.integration
+    def test_patch_rejects_missing_overlay(self, headless, monkeypatch, temp_dir, capsys):
+        """指定不存在的疊加層時不執行修補，結束代碼為 2"""
+        (temp_dir / "overlays" / "fixes").mkdir(parents=True)
+        monkeypatch.setattr(headless.Config, "CHT_FOLDER_PATH", str(temp_dir))
+        run_modding = Mock(return_value=True)
+        monkeypatch.setattr(headless, "run_modding", run_modding)
+        argv = ["patch", "--text", "Text_Re", "--font", "new", "--yes", "--overlay", "fixes"]
+
+        assert headless.main(argv + ["--overlay", "typo"]) == 2
+        assert "找不到翻譯疊加層" in capsys.readouterr().out
+        run_modding.assert_not_called()
+
+        assert headless.main(argv) == 0
+        assert run_modding.call_args.kwargs["text_folder_name"] == ("Text_Re", "fixes")
+
+    @pytest.mark.integration
+    @pytest.mark.parametrize(
+        "argv, target",
+        [
+            (["restore"], "restore_backup"),
+            (["verify"], "verify_game_files"),
+            (["apply-delta", "deltas"], "apply_delta_folder"),
+        ],
+    )
+    def test_commands_return_exit_codes(self, headless, monkeypatch, argv, target):
+        """各子命令成功時結束代碼為 0，失敗時為 1"""
+        monkeypatch.setattr(headless, target, Mock(return_value=True))
+        assert headless.main(argv) == 0
+        monkeypatch.setattr(headless, target, Mock(return_value=False))
+        assert headless.main(argv) == 1
+
+    @pytest.mark.integration
+    def test_patch_requires_options(self, headless):
+        """缺少必要參數時由 argparse 以結束代碼 2 結束"""
+        with pytest.raises(SystemExit) as excinfo:
+            headless.main(["patch", "--text", "Text_Re"])
+        assert excinfo.value.code == 2
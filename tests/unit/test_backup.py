@@ -0,0 +1,168 @@
+"""測試內容定址備份與還原"""
+import pytest
+
+import sk_cht
+from sk_cht import Config
+
+
+@pytest.fixture
+def backup_env(temp_dir, monkeypatch):
+    """建立最小的遊戲檔案，並將 Config 指向暫存資料夾"""
+    game = temp_dir / "game"
+    game.mkdir()
+    paths = {}
+    for attr, name in [
+        ("BUNDLE_FILE_PATH", "fonts_assets_chinese.bundle"),
+        ("TEXT_ASSETS_FILE_PATH", "resources.assets"),
+        ("TITLE_BUNDLE_PATH", "title.spriteatlas.bundle"),
+        ("MAP_FONT_BUNDLE_PATH", "maps_assets_all.bundle"),
+    ]:
+        path = game / name
+        path.write_bytes(name.encode() * 10)
+        monkeypatch.setattr(Config, attr, str(path))
+        paths[name] = path
+
+    monkeypatch.setattr(Config, "GAME_ROOT_PATH", str(game))
+    monkeypatch.setattr(Config, "BACKUP_FOLDER", str(game / "Backup"))
+    monkeypatch.setattr(Config, "MANIFEST_PATH", str(game / "Backup_manifest.json"))
+    return paths
+
+
+def _backup_all(paths):
+    index = sk_cht.load_backup_index()
+    methods = []
+    for path in paths.values():
+        _, method = sk_cht.store_backup(str(path), sk_cht.hash_file(str(path)), index)
+        methods.append(method)
+    sk_cht.save_backup_index(index)
+    return methods
+
+
+def test_identical_backup_is_skipped(backup_env):
+    """相同內容的備份已存在時不再複製"""
+    assert all(method in ("reflink", "copy") for method in _backup_all(backup_env))
+    assert _backup_all(backup_env) == [None] * len(backup_env)
+
+    path = backup_env["resources.assets"]
+    target = sk_cht.backup_object_path(sk_cht.hash_file(str(path)))
+    assert open(target, "rb").read() == path.read_bytes()
+
+
+def test_backup_with_same_size_but_wrong_hash_is_replaced(backup_env):
+    """既有備份大小相同但內容已被改寫時重新備份，且備份不與遊戲檔案共用資料"""
+    path = backup_env["resources.assets"]
+    sha256 = sk_cht.hash_file(str(path))
+    index = sk_cht.load_backup_index()
+    target, _ = sk_cht.store_backup(str(path), sha256, index)
+    with open(target, "r+b") as f:
+        f.write(b"X")
+
+    _, method = sk_cht.store_backup(str(path), sha256, index)
+
+    assert method is not None
+    assert sk_cht.hash_file(target) == sha256
+    assert not sk_cht.os.path.samefile(target, path)
+
+
+def test_restore_only_rewrites_changed_files(backup_env, capsys):
+    """還原時略過內容相同的檔案，並拒絕使用雜湊不符的備份"""
+    originals = {name: path.read_bytes() for name, path in backup_env.items()}
+    _backup_all(backup_env)
+
+    # 以整檔取代模擬修補
+    for name in ("resources.assets", "title.spriteatlas.bundle"):
+        temp = backup_env[name].with_suffix(".new")
+        temp.write_bytes(b"patched")
+        temp.replace(backup_env[name])
+    index = sk_cht.load_backup_index()
+    corrupted = index["files"]["title.spriteatlas.bundle"]["sha256"]
+    with open(sk_cht.backup_object_path(corrupted), "r+b") as f:
+        f.write(b"X")
+
+    sk_cht.restore_backup()
+    output = capsys.readouterr().out
+
+    assert backup_env["resources.assets"].read_bytes() == originals["resources.assets"]
+    assert backup_env["title.spriteatlas.bundle"].read_bytes() == b"patched"
+    assert "雜湊不符" in output
+    assert "已是原始檔案: fonts_assets_chinese.bundle" in output
+
+
+def test_legacy_backup_layout_is_adopted(backup_env):
+    """舊版以原始目錄結構存放的備份仍可找到並納入索引"""
+    legacy = backup_env["resources.assets"].parent / "Backup" / "resources.assets"
+    legacy.parent.mkdir()
+    legacy.write_bytes(b"legacy original")
+
+    index = sk_cht.load_backup_index()
+    path, sha256 = sk_cht.find_backup(str(backup_env["resources.assets"]), index)
+
+    assert open(path, "rb").read() == b"legacy original"
+    assert index["files"] == {"resources.assets": {"sha256": sha256, "size": 15}}
+
+
+def test_verify_reports_missing_original(backup_env):
+    """已修補的檔案缺少原始備份時檢查失敗"""
+    _backup_all(backup_env)
+    assert sk_cht.verify_game_files()
+
+    path = backup_env["resources.assets"]
+    source = sk_cht.hash_file(str(path))
+    path.with_suffix(".new").write_bytes(b"patched")
+    path.with_suffix(".new").replace(path)
+    manifest = sk_cht.load_manifest()
+    manifest["targets"]["text"] = {
+        "source_sha256": source,
+        "inputs_sha256": "x",
+        "output_sha256": sk_cht.hash_file(str(path)),
+    }
+    sk_cht.save_manifest(manifest)
+    assert sk_cht.verify_game_files()
+
+    sk_cht.os.remove(sk_cht.backup_object_path(source))
+    assert not sk_cht.verify_game_files()
+
+
+def test_restore_detects_corruption_with_preserved_mtime(backup_env, capsys):
+    """備份被原地改寫且保留修改時間時，不應沿用修補紀錄中的快取雜湊"""
+    _backup_all(backup_env)
+    path = backup_env["resources.assets"]
+    source = sk_cht.hash_file(str(path))
+    target = sk_cht.backup_object_path(source)
+    manifest = sk_cht.load_manifest()
+    sk_cht.hash_file(target, manifest)  # 將備份的雜湊存入快取
+    sk_cht.save_manifest(manifest)
+
+    stat = sk_cht.os.stat(target)
+    with open(target, "r+b") as f:
+        f.write(b"X")
+    sk_cht.os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    path.with_suffix(".new").write_bytes(b"patched")
+    path.with_suffix(".new").replace(path)
+
+    assert not sk_cht.restore_backup()
+    assert "resources.assets 的備份雜湊不符" in capsys.readouterr().out
+    assert path.read_bytes() == b"patched"
+
+
+def test_prune_removes_unreferenced_objects(backup_env):
+    """遊戲更新後，索引與修補紀錄都不再引用的舊備份會被刪除"""
+    path = backup_env["resources.assets"]
+    index = sk_cht.load_backup_index()
+    old = sk_cht.hash_file(str(path))
+    sk_cht.store_backup(str(path), old, index)
+    kept = sk_cht.hash_file(str(backup_env["title.spriteatlas.bundle"]))
+    sk_cht.store_backup(str(backup_env["title.spriteatlas.bundle"]), kept, index)
+    manifest = sk_cht.load_manifest()
+    manifest["targets"]["title"] = {"source_sha256": kept}
+    del index["files"]["title.spriteatlas.bundle"]
+
+    # 模擬遊戲更新：新的原始檔案取代舊備份在索引中的位置
+    path.write_bytes(b"updated game file")
+    new = sk_cht.hash_file(str(path))
+    sk_cht.store_backup(str(path), new, index)
+
+    assert sk_cht.prune_backup_objects(index, manifest) == 1
+    assert not sk_cht.os.path.exists(sk_cht.backup_object_path(old))
+    assert sk_cht.os.path.exists(sk_cht.backup_object_path(new))
+    assert sk_cht.os.path.exists(sk_cht.backup_object_path(kept))
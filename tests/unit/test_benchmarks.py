@@ -0,0 +1,25 @@
+"""確認效能基準測試的合成資料與各量測項目可正常執行"""
+import pytest
+
+from benchmarks import run
+
+
+@pytest.mark.slow
+def test_tiny_suite_runs_every_case():
+    """tiny 規模下所有項目皆能完成 (run_modding 失敗時會拋出例外)"""
+    calibration, results = run.run_suite("tiny", repeat=1)
+
+    assert calibration > 0
+    assert set(results) == set(run.CASES)
+    assert all(elapsed > 0 for elapsed in results.values())
+
+
+def test_compare_flags_only_real_regressions(capsys):
+    """超出容許比例且高於雜訊門檻的項目才視為退步"""
+    baselines = {"quick": {"slow": 10.0, "noisy": 0.01, "steady": 10.0}}
+    results = {"slow": 1.5, "noisy": 0.002, "steady": 1.05}
+
+    regressions = run.compare("quick", 0.1, results, baselines, tolerance=0.3)
+
+    assert regressions == ["slow"]
+    assert "退步" in capsys.readouterr().out
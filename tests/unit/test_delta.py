@@ -0,0 +1,64 @@
+"""測試差異修補包的產生與套用"""
+import random
+
+import pytest
+
+import sk_cht
+from sk_cht import Config
+
+
+@pytest.fixture
+def delta_env(temp_dir, monkeypatch):
+    """建立原始與修補後的遊戲檔案，並將 Config 指向暫存資料夾"""
+    game = temp_dir / "game"
+    game.mkdir()
+    rng = random.Random(0)
+    source = rng.randbytes(1024 * 1024)
+    # 插入資料造成後續位移，並修改另一處內容
+    target = bytearray(source[:300_000] + rng.randbytes(1000) + source[300_000:])
+    target[700_000:700_100] = bytes(100)
+
+    monkeypatch.setattr(Config, "GAME_ROOT_PATH", str(game))
+    monkeypatch.setattr(Config, "BACKUP_FOLDER", str(game / "Backup"))
+    monkeypatch.setattr(Config, "MANIFEST_PATH", str(game / "Backup_manifest.json"))
+    game_path = game / "resources.assets"
+    game_path.write_bytes(source)
+    patched_path = temp_dir / "patched.assets"
+    patched_path.write_bytes(bytes(target))
+    return {"game": game_path, "patched": patched_path, "source": source, "target": bytes(target)}
+
+
+def _export(delta_env, temp_dir):
+    folder = temp_dir / "delta"
+    folder.mkdir()
+    meta = {"target": "text", "path": "resources.assets"}
+    _, size = sk_cht.write_delta(
+        str(delta_env["game"]), str(delta_env["patched"]), str(folder / "text.skdelta"), meta
+    )
+    return folder, size
+
+
+def test_delta_round_trip_is_compact(delta_env, temp_dir):
+    """位移後仍能重新同步，差異檔遠小於目標檔案，且套用結果完全一致"""
+    folder, size = _export(delta_env, temp_dir)
+    assert size < len(delta_env["target"]) // 4
+
+    assert sk_cht.apply_delta_folder(str(folder))
+    assert delta_env["game"].read_bytes() == delta_env["target"]
+
+    manifest = sk_cht.load_manifest()
+    assert manifest["targets"]["text"]["output_sha256"] == sk_cht.hash_file(str(delta_env["game"]))
+    backup, _ = sk_cht.find_backup(str(delta_env["game"]), sk_cht.load_backup_index())
+    assert open(backup, "rb").read() == delta_env["source"]
+
+    # 再次套用時檔案已是目標內容，直接略過
+    assert sk_cht.apply_delta_folder(str(folder))
+
+
+def test_delta_rejects_unknown_source(delta_env, temp_dir):
+    """遊戲檔案與差異檔的原始版本不符時不套用"""
+    folder, _ = _export(delta_env, temp_dir)
+    delta_env["game"].write_bytes(b"other version")
+
+    assert not sk_cht.apply_delta_folder(str(folder))
+    assert delta_env["game"].read_bytes() == b"other version"
@@ -1,5 +1,4 @@
 """測試 FileWrapper 類別的功能"""
-import pytest
 from io import BytesIO
 from unittest.mock import Mock
 
@@ -48,3 +47,21 @@ def test_file_wrapper_save(mock_file_wrapper):
 
     assert saved_data == test_data
     assert wrapper.Position == 0  # save 後位置應該重設為 0
+
+
+def test_file_wrapper_keeps_zero_copy_view():
+    """實際的 FileWrapper 應直接引用傳入的緩衝區而不複製"""
+    import sk_cht
+
+    original_file = Mock()
+    payload = bytearray(b"0123456789")
+
+    wrapper = sk_cht.FileWrapper(original_file, payload)
+
+    assert wrapper.getbuffer().obj is payload
+    assert wrapper.Length == 10
+    wrapper.Position = 4
+    assert wrapper.read_bytes(3) == b"456"
+    assert wrapper.Position == 7
+    assert wrapper.save() == b"0123456789"
+    assert sk_cht.FileWrapper(original_file, BytesIO(b"stream")).save() == b"stream"
@@ -0,0 +1,127 @@
+"""測試二進位字形表的轉換與載入"""
+import json
+import struct
+
+import pytest
+
+import sk_cht
+
+
+def _float32(value):
+    return struct.unpack("<f", struct.pack("<f", value))[0]
+
+
+@pytest.fixture
+def font_json(temp_dir, monkeypatch):
+    """建立小型字型 JSON，並把快取資料夾指向暫存目錄"""
+    monkeypatch.setattr(sk_cht.Config, "CACHE_FOLDER", str(temp_dir / "cht_cache"))
+    folder = temp_dir / "font_new"
+    folder.mkdir()
+    source = {
+        "m_fontInfo": {"Name": "Noto Serif CJK SC", "PointSize": 67.0, "Padding": 5.0},
+        "m_glyphInfoList": [
+            {"id": 9, "x": 6.0, "y": 4101.0, "width": 0.0, "height": 0.0,
+             "xOffset": 0.0, "yOffset": 0.0, "xAdvance": 18.625, "scale": 1.0},
+            {"id": 20013, "x": 12.5, "y": 30.0, "width": 64.0, "height": 66.0,
+             "xOffset": 1.4, "yOffset": 57.0, "xAdvance": -6.7000003, "scale": 1.0},
+        ],
+    }
+    path = folder / "chinese_body.json"
+    path.write_text(json.dumps(source), encoding="utf-8")
+    return path, source
+
+
+def test_glyph_table_round_trip(font_json):
+    """轉換後載入的結構應與 JSON 相同 (浮點數以 float32 精度比較)"""
+    path, source = font_json
+
+    output = sk_cht.convert_font_json(str(path))
+    table = sk_cht.load_font_source(str(path))
+
+    assert output.endswith("chinese_body.glyphs")
+    assert table["m_fontInfo"] == source["m_fontInfo"]
+    for loaded, expected in zip(table["m_glyphInfoList"], source["m_glyphInfoList"]):
+        assert list(loaded) == list(expected)
+        assert loaded["id"] == expected["id"]
+        assert all(loaded[k] == _float32(expected[k]) for k in sk_cht.GLYPH_FIELDS[1:])
+
+
+def test_stale_glyph_table_falls_back_to_json(font_json):
+    """JSON 修改後，舊的 .glyphs 應被忽略"""
+    path, source = font_json
+    sk_cht.convert_font_json(str(path))
+    source["m_fontInfo"]["PointSize"] = 72.0
+    path.write_text(json.dumps(source), encoding="utf-8")
+
+    assert sk_cht.load_font_source(str(path))["m_fontInfo"]["PointSize"] == 72.0
+
+
+def test_json_load_populates_cache(font_json, temp_dir):
+    """沒有 .glyphs 時由 JSON 編譯，並把結果寫入快取"""
+    path, source = font_json
+
+    table = sk_cht.load_font_source(str(path))
+    assert [g["id"] for g in table["m_glyphInfoList"]] == [9, 20013]
+    cached = temp_dir / "cht_cache" / "glyphs" / "font_new" / "chinese_body.glyphs"
+    assert cached.exists()
+    assert sk_cht.parse_glyph_table(cached.read_bytes())["m_fontInfo"] == source["m_fontInfo"]
+
+
+def tmp_font_node():
+    """精簡的 TMP_FontAsset TypeTree，含未對齊的 bool 以檢驗欄位對齊"""
+    from benchmarks.unity_builders import make_typetree_node
+
+    def pptr(level, typ, name):
+        return [(level, typ, name, 12, 0), (level + 1, "int", "m_FileID", 4, 0),
+                (level + 1, "SInt64", "m_PathID", 8, 0)]
+
+    def string(level, name):
+        return [(level, "string", name, -1, 0x8000), (level + 1, "Array", "Array", -1, 0x4001),
+                (level + 2, "int", "size", 4, 1), (level + 2, "char", "data", 1, 1)]
+
+    nodes = [(0, "MonoBehaviour", "Base", -1, 0)]
+    nodes += pptr(1, "PPtr<GameObject>", "m_GameObject")
+    nodes += [(1, "UInt8", "m_Enabled", 1, 0x4000)]
+    nodes += pptr(1, "PPtr<MonoScript>", "m_Script")
+    nodes += string(1, "m_Name")
+    nodes += [(1, "bool", "m_IsLegacy", 1, 0)]
+    nodes += [(1, "FaceInfo_Legacy", "m_fontInfo", -1, 0)]
+    nodes += string(2, "Name")
+    nodes += [(2, "float", "PointSize", 4, 0), (2, "float", "Padding", 4, 0)]
+    nodes += pptr(1, "PPtr<Texture2D>", "m_atlas")
+    nodes += [(1, "vector", "m_glyphInfoList", -1, 0), (2, "Array", "Array", -1, 0x4000),
+              (3, "int", "size", 4, 0), (3, "TMP_Glyph", "data", -1, 0)]
+    nodes += [(4, "int" if field == "id" else "float", field, 4, 0) for field in sk_cht.GLYPH_FIELDS]
+    nodes += [(1, "float", "m_Trailing", 4, 0)]
+    return make_typetree_node(nodes)
+
+
+def test_raw_font_patch_matches_typetree_round_trip(font_json, temp_dir):
+    """位元組拼接的結果應與 read_typetree/save_typetree 的輸出完全相同"""
+    import UnityPy
+    from benchmarks.unity_builders import build_serialized_file
+
+    path, _ = font_json
+    pptr = {"m_FileID": 0, "m_PathID": 3}
+    glyph = dict(zip(sk_cht.GLYPH_FIELDS, [1, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 1.0]))
+    value = {
+        "m_GameObject": pptr, "m_Enabled": 1, "m_Script": pptr, "m_Name": "chinese_body",
+        "m_IsLegacy": True, "m_fontInfo": {"Name": "Old", "PointSize": 1.0, "Padding": 2.0},
+        "m_atlas": pptr, "m_glyphInfoList": [glyph] * 3, "m_Trailing": 9.5,
+    }
+    assets_path = temp_dir / "font.assets"
+    assets_path.write_bytes(build_serialized_file([(7, 114, tmp_font_node(), value)]))
+
+    fast = UnityPy.load(str(assets_path)).objects[0]
+    assert sk_cht.patch_font_raw(fast, sk_cht.load_glyph_table_blob(str(path)))
+
+    slow = UnityPy.load(str(assets_path)).objects[0]
+    tree = slow.read_typetree()
+    tree.update(sk_cht.load_font_source(str(path)))
+    slow.save_typetree(tree)
+
+    assert fast.data == slow.data
+    reloaded = UnityPy.load(fast.assets_file.save()).objects[0].read_typetree()
+    assert reloaded["m_fontInfo"]["Name"] == "Noto Serif CJK SC"
+    assert [g["id"] for g in reloaded["m_glyphInfoList"]] == [9, 20013]
+    assert reloaded["m_Trailing"] == 9.5
@@ -0,0 +1,68 @@
+"""測試覆蓋日誌的繼續與還原"""
+import pytest
+
+import sk_cht
+from sk_cht import Config
+
+
+@pytest.fixture
+def journal_env(temp_dir, monkeypatch):
+    """建立兩個已備份的遊戲檔案，並模擬第一個已覆蓋、第二個尚在暫存的中斷狀態"""
+    game = temp_dir / "game"
+    game.mkdir()
+    monkeypatch.setattr(Config, "GAME_ROOT_PATH", str(game))
+    monkeypatch.setattr(Config, "BACKUP_FOLDER", str(game / "Backup"))
+    monkeypatch.setattr(Config, "MANIFEST_PATH", str(game / "Backup_manifest.json"))
+    monkeypatch.setattr(Config, "JOURNAL_PATH", str(game / "Backup_journal.json"))
+
+    index = sk_cht.load_backup_index()
+    entries = []
+    for name in ("fonts", "text"):
+        path = game / f"{name}.bundle"
+        path.write_bytes(f"original {name}".encode())
+        source = sk_cht.hash_file(str(path))
+        sk_cht.store_backup(str(path), source, index)
+        staging = sk_cht.get_workspace_path(str(path))
+        with open(staging, "wb") as f:
+            f.write(f"patched {name}".encode())
+        output = sk_cht.hash_file(staging)
+        entries.append(
+            {
+                "target": name,
+                "path": str(path),
+                "staging": staging,
+                "source_sha256": source,
+                "output_sha256": output,
+                "record": {"source_sha256": source, "inputs_sha256": "x", "output_sha256": output},
+                "done": False,
+            }
+        )
+    sk_cht.save_backup_index(index)
+
+    sk_cht.os.replace(entries[0]["staging"], entries[0]["path"])
+    entries[0]["done"] = True
+    sk_cht.write_json_atomic(Config.JOURNAL_PATH, {"version": 1, "entries": entries})
+    return entries
+
+
+def test_interrupted_commit_is_resumed(journal_env):
+    """暫存檔完整時繼續換入剩餘檔案並寫入修補紀錄"""
+    assert sk_cht.recover_patch_journal()
+
+    for entry in journal_env:
+        assert open(entry["path"], "rb").read() == f"patched {entry['target']}".encode()
+    manifest = sk_cht.load_manifest()
+    assert manifest["targets"]["text"]["output_sha256"] == journal_env[1]["output_sha256"]
+    assert sk_cht.load_journal() is None
+    assert not sk_cht.recover_patch_journal()
+
+
+def test_interrupted_commit_is_rolled_back(journal_env):
+    """暫存檔遺失時將已換入的檔案還原為原始備份"""
+    sk_cht.os.remove(journal_env[1]["staging"])
+
+    assert sk_cht.recover_patch_journal()
+
+    for entry in journal_env:
+        assert open(entry["path"], "rb").read() == f"original {entry['target']}".encode()
+    assert sk_cht.load_journal() is None
@@ -0,0 +1,94 @@
+"""測試增量修補紀錄 (Manifest) 的判斷邏輯"""
+import pytest
+
+import sk_cht
+from sk_cht import Config
+
+
+@pytest.fixture
+def patch_env(temp_dir, monkeypatch):
+    """建立最小的遊戲檔案與 CHT 資源，並將 Config 指向它們"""
+    game = temp_dir / "game"
+    cht = temp_dir / "CHT"
+    for folder in (game, cht / "font_new", cht / "Text_Re", cht / "logo"):
+        folder.mkdir(parents=True)
+
+    paths = {}
+    for attr, name in [
+        ("BUNDLE_FILE_PATH", "fonts_assets_chinese.bundle"),
+        ("TEXT_ASSETS_FILE_PATH", "resources.assets"),
+        ("TITLE_BUNDLE_PATH", "title.spriteatlas.bundle"),
+        ("MAP_FONT_BUNDLE_PATH", "maps_assets_all.bundle"),
+    ]:
+        path = game / name
+        path.write_bytes(name.encode())
+        monkeypatch.setattr(Config, attr, str(path))
+        paths[attr] = path
+
+    (cht / "font_new" / "chinese_body.json").write_text("{}")
+    (cht / "Text_Re" / "ZH_UI.txt").write_text("ui")
+    (cht / "logo" / "logo.png").write_bytes(b"png")
+
+    monkeypatch.setattr(Config, "GAME_ROOT_PATH", str(game))
+    monkeypatch.setattr(Config, "CHT_FOLDER_PATH", str(cht))
+    monkeypatch.setattr(Config, "CURRENT_ASSET_FOLDER", str(cht / "font_new"))
+    monkeypatch.setattr(Config, "LOGO_SOURCE_FOLDER", str(cht / "logo"))
+    monkeypatch.setattr(Config, "MANIFEST_PATH", str(temp_dir / "Backup_manifest.json"))
+    return {"cht": cht, **paths}
+
+
+def _record_outputs(manifest, plan):
+    """模擬修補完成：遊戲檔案內容成為輸出並寫入紀錄"""
+    targets = sk_cht.get_patch_targets()
+    for name, state in plan.items():
+        with open(targets[name], "ab") as f:
+            f.write(b"-patched")
+        manifest["targets"][name] = {
+            "source_sha256": state["source"],
+            "inputs_sha256": state["inputs"],
+            "output_sha256": sk_cht.hash_file(targets[name], manifest),
+            "font_ref": {"cab_name": "CAB-test", "path_id": 1},
+        }
+    sk_cht.save_manifest(manifest)
+
+
+def test_first_run_rebuilds_every_target(patch_env):
+    """沒有紀錄時所有目標都需要修補"""
+    plan = sk_cht.plan_incremental_build("Text_Re", "new", sk_cht.load_manifest())
+
+    assert set(plan) == {"fonts", "text", "title", "map"}
+    assert all(state["rebuild"] for state in plan.values())
+
+
+def test_unchanged_inputs_skip_every_target(patch_env):
+    """來源與輸出皆未變更時不需要重新修補"""
+    manifest = sk_cht.load_manifest()
+    _record_outputs(manifest, sk_cht.plan_incremental_build("Text_Re", "new", manifest))
+
+    plan = sk_cht.plan_incremental_build("Text_Re", "new", sk_cht.load_manifest())
+
+    assert not any(state["rebuild"] for state in plan.values())
+    assert all(state["patched"] for state in plan.values())
+
+
+def test_changed_text_only_rebuilds_text(patch_env):
+    """只修改文字檔時只重建 resources.assets"""
+    manifest = sk_cht.load_manifest()
+    _record_outputs(manifest, sk_cht.plan_incremental_build("Text_Re", "new", manifest))
+    (patch_env["cht"] / "Text_Re" / "ZH_UI.txt").write_text("ui v2")
+
+    plan = sk_cht.plan_incremental_build("Text_Re", "new", sk_cht.load_manifest())
+
+    assert [name for name, state in plan.items() if state["rebuild"]] == ["text"]
+
+
+def test_replaced_game_file_is_treated_as_new_source(patch_env):
+    """遊戲更新後的檔案不是上次的輸出，應視為新的原始檔案"""
+    manifest = sk_cht.load_manifest()
+    _record_outputs(manifest, sk_cht.plan_incremental_build("Text_Re", "new", manifest))
+    patch_env["TITLE_BUNDLE_PATH"].write_bytes(b"game update")
+
+    plan = sk_cht.plan_incremental_build("Text_Re", "new", sk_cht.load_manifest())
+
+    assert plan["title"]["rebuild"] and not plan["title"]["patched"]
+    assert not plan["fonts"]["rebuild"]
@@ -0,0 +1,52 @@
+"""測試以類型與名稱建立的物件索引"""
+import UnityPy
+from UnityPy.enums import ClassIDType
+
+import sk_cht
+from benchmarks.unity_builders import build_serialized_file, tpk_typetree_node
+
+
+def test_object_index_finds_by_type_and_name(text_assets_file):
+    """索引應能依名稱、前綴取得物件，且不會誤中其他類型"""
+    env = UnityPy.load(str(text_assets_file))
+    index = sk_cht.get_object_index(env)
+
+    assert [o.path_id for o in index.find(ClassIDType.TextAsset, "ZH_UI")] == [3]
+    assert index.path_id(ClassIDType.TextAsset, "EN_General") == 2
+    assert index.path_id(ClassIDType.Texture2D, "ZH_UI") is None
+    assert sorted(o.path_id for o in index.find_prefix(ClassIDType.TextAsset, "ZH_")) == [1, 3]
+    assert index.find_first(ClassIDType.TextAsset, ["missing", "ZH_General"]).path_id == 1
+    assert sk_cht.get_object_index(env) is index
+
+
+def test_process_text_assets_replaces_only_indexed_matches(text_assets_file, temp_dir, monkeypatch):
+    """文字替換只應修改有對應來源檔的目標 TextAsset"""
+    text_folder = temp_dir / "CHT" / "Text"
+    text_folder.mkdir(parents=True)
+    (text_folder / "ZH_General.txt").write_bytes("新的一般文字".encode("utf-8"))
+    monkeypatch.setattr(sk_cht.Config, "CHT_FOLDER_PATH", str(temp_dir / "CHT"))
+    env = UnityPy.load(str(text_assets_file))
+
+    sk_cht.process_text_assets(env, "Text")
+
+    reloaded = UnityPy.load(env.file.save())
+    scripts = {o.read().m_Name: o.read().m_Script for o in reloaded.objects}
+    assert scripts == {
+        "ZH_General": "新的一般文字",
+        "EN_General": "english",
+        "ZH_UI": "原始介面",
+    }
+
+
+def test_raw_name_read_matches_typetree_name(text_assets_file, temp_dir):
+    """直接解碼的名稱應與 TypeTree 解析結果一致，包含 MonoBehaviour 的位移"""
+    pptr = {"m_FileID": 0, "m_PathID": 7}
+    mono = {"m_GameObject": pptr, "m_Enabled": 1, "m_Script": pptr, "m_Name": "chinese_body"}
+    mono_path = temp_dir / "mono.assets"
+    mono_path.write_bytes(build_serialized_file([(5, 114, tpk_typetree_node(114), mono)]))
+
+    for path in (text_assets_file, mono_path):
+        env = UnityPy.load(str(path))
+        for obj in env.objects:
+            assert sk_cht.read_object_name_raw(obj) == obj.peek_name()
+    assert sk_cht.peek_object_name(env.objects[0]) == "chinese_body"
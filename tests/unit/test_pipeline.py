@@ -0,0 +1,56 @@
+"""測試平行處理管線的排程功能"""
+import operator
+
+import pytest
+
+import sk_cht
+from sk_cht import PipelineTask, run_pipeline_tasks
+
+
+def _tasks():
+    return [
+        PipelineTask("sum", operator.add, (1, 2), ()),
+        PipelineTask("neg", operator.neg, (5,), ()),
+        PipelineTask("product", operator.mul, (10,), ("sum",)),
+    ]
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_run_pipeline_tasks_passes_dependency_results(max_workers):
+    """相依工作應收到前置工作的回傳值"""
+    results = run_pipeline_tasks(_tasks(), max_workers=max_workers)
+
+    assert results == {"sum": 3, "neg": -5, "product": 30}
+
+
+def _encode_worker_counts():
+    return sk_cht.Config.TEXTURE_WORKERS, sk_cht.Config.BC7_WORKERS
+
+
+def test_pipeline_workers_share_encode_processes(monkeypatch):
+    """管線子程序的紋理編碼與條帶壓縮程序數依管線工作數分攤"""
+    monkeypatch.setattr(sk_cht.Config, "TEXTURE_WORKERS", 8)
+    monkeypatch.setattr(sk_cht.Config, "BC7_WORKERS", 5)
+    tasks = [PipelineTask(name, _encode_worker_counts, (), ()) for name in ("a", "b")]
+
+    results = run_pipeline_tasks(tasks, max_workers=3)
+
+    assert results == {"a": (4, 2), "b": (4, 2)}
+
+
+def test_run_pipeline_tasks_rejects_unknown_dependency():
+    """依賴不存在的工作時應報錯"""
+    tasks = [PipelineTask("map", operator.neg, (), ("fonts",))]
+
+    with pytest.raises(ValueError):
+        run_pipeline_tasks(tasks)
+
+
+def test_build_modding_tasks_orders_map_after_fonts():
+    """只有修改字體模式需要地圖管線，且其依賴字體管線"""
+    new_tasks = {t.name: t for t in sk_cht.build_modding_tasks("Text_Re", "new")}
+    old_tasks = {t.name: t for t in sk_cht.build_modding_tasks("Text_Re", "old")}
+
+    assert new_tasks["map"].deps == ("fonts",)
+    assert all(not t.deps for name, t in new_tasks.items() if name != "map")
+    assert "map" not in old_tasks
@@ -0,0 +1,90 @@
+"""測試預先烘焙資源包的建置與使用"""
+import json
+
+import pytest
+from PIL import Image
+from UnityPy.enums import TextureFormat
+
+import sk_cht
+
+
+@pytest.fixture
+def baked_cht(temp_dir, monkeypatch):
+    """建立小型 CHT 資料夾並烘焙成資源包"""
+    cht = temp_dir / "CHT"
+    (cht / "Text").mkdir(parents=True)
+    (cht / "Text" / "ZH_General.txt").write_bytes("烘焙後的一般文字".encode("utf-8"))
+    (cht / "font_new").mkdir()
+    font = {
+        "m_fontInfo": {"Name": "Noto Serif CJK SC", "PointSize": 67.0},
+        "m_glyphInfoList": [dict(zip(sk_cht.GLYPH_FIELDS, [9] + [1.5] * 8))],
+    }
+    (cht / "font_new" / "chinese_body.json").write_text(json.dumps(font), encoding="utf-8")
+    (cht / "logo").mkdir()
+    Image.new("RGBA", (8, 8), (10, 20, 30, 255)).save(cht / "logo" / "logo.png")
+
+    monkeypatch.setattr(sk_cht.Config, "CHT_FOLDER_PATH", str(cht))
+    monkeypatch.setattr(sk_cht.Config, "PREBAKED_PACK_PATH", str(cht / "prebaked.pack"))
+    monkeypatch.setattr(sk_cht.Config, "CACHE_FOLDER", "")
+    monkeypatch.setattr(sk_cht.Config, "TEXTURE_WORKERS", 1)
+    sk_cht.bake_prebaked_pack()
+    return cht
+
+
+def test_pack_serves_textures_and_glyph_tables(baked_cht, monkeypatch):
+    """執行時應直接從資源包取得紋理與字形表，不重新編碼"""
+    def fail(*args, **kwargs):
+        raise AssertionError("資源包命中時不應重新編碼")
+
+    monkeypatch.setattr(sk_cht, "encode_textures_parallel", fail)
+    logo = str(baked_cht / "logo" / "logo.png")
+    platform = sk_cht.BuildTarget[sk_cht.PREBAKED_PLATFORMS["Windows"]]
+
+    [(image_binary, fmt, size)] = sk_cht.encode_png_textures(
+        [(logo, TextureFormat.BC7, platform, None)]
+    )
+
+    assert fmt == TextureFormat.BC7 and size == (8, 8)
+    assert len(image_binary) == 4 * 16  # 8x8 BC7 = 4 個 16 位元組區塊
+    font_json = str(baked_cht / "font_new" / "chinese_body.json")
+    table = sk_cht.parse_glyph_table(sk_cht.load_glyph_table_blob(font_json))
+    assert table["m_fontInfo"]["Name"] == "Noto Serif CJK SC"
+
+
+def test_pack_contains_no_text_entries(baked_cht):
+    """文字於執行時直接序列化拼接，資源包只收錄字形表與紋理"""
+    pack = sk_cht.get_prebaked_pack()
+    assert pack is not None
+    assert not [key for key in pack._entries if key.startswith("text:")]
+
+
+def test_pack_ignored_for_other_unity_version(baked_cht, monkeypatch):
+    """資源包的 Unity 版本與目前設定不同時不應使用"""
+    monkeypatch.setattr(sk_cht.Config, "UNITY_VERSION", "2022.3.0f1")
+
+    assert sk_cht.get_prebaked_pack() is None
+
+
+def test_pack_encodes_each_texture_once_for_all_platforms(temp_dir, monkeypatch):
+    """各桌面平台共用同一份編碼結果，每種格式只編碼一次"""
+    logo_dir = temp_dir / "CHT" / "logo"
+    logo_dir.mkdir(parents=True)
+    Image.new("RGBA", (8, 8), (10, 20, 30, 255)).save(logo_dir / "logo.png")
+    monkeypatch.setattr(sk_cht.Config, "CHT_FOLDER_PATH", str(temp_dir / "CHT"))
+    monkeypatch.setattr(sk_cht.Config, "PREBAKED_PACK_PATH", str(temp_dir / "prebaked.pack"))
+    monkeypatch.setattr(sk_cht.Config, "CACHE_FOLDER", "")
+    monkeypatch.setattr(sk_cht.Config, "TEXTURE_WORKERS", 1)
+    encode = sk_cht.encode_textures_parallel
+    calls = []
+
+    def counting(jobs):
+        calls.append(len(jobs))
+        return encode(jobs)
+
+    monkeypatch.setattr(sk_cht, "encode_textures_parallel", counting)
+    sk_cht.bake_prebaked_pack()
+
+    assert calls == [len(sk_cht.PREBAKED_TEXTURE_FORMATS)]
+    pack = sk_cht.get_prebaked_pack()
+    spans = {tuple(entry[:2]) for entry in pack._entries.values()}
+    assert len(pack._entries) == len(sk_cht.PREBAKED_PLATFORMS) and len(spans) == 1
@@ -0,0 +1,57 @@
+"""測試效能分析紀錄"""
+import json
+import os
+
+import sk_cht
+from sk_cht import Config
+
+
+def test_spans_are_merged_across_processes(temp_dir, monkeypatch):
+    """主程序與管線子程序的區間皆合併至同一份輸出"""
+    profile_path = temp_dir / "profile.json"
+    monkeypatch.setattr(Config, "PROFILE_PATH", str(profile_path))
+    sample = temp_dir / "sample.bin"
+    sample.write_bytes(os.urandom(4096))
+    sk_cht.start_profile()
+
+    tasks = [
+        sk_cht.PipelineTask(name, sk_cht.hash_file, (str(sample),), ())
+        for name in ("a", "b")
+    ]
+    with sk_cht.profile_span("outer", label="測試"):
+        sk_cht.run_pipeline_tasks(tasks, max_workers=2)
+    summary = sk_cht.finish_profile()
+
+    assert summary["hash_file"]["count"] == 2
+    assert summary["outer"]["count"] == 1
+    output = json.loads(profile_path.read_text(encoding="utf-8"))
+    outer = next(event for event in output["events"] if event["name"] == "outer")
+    assert outer["args"] == {"label": "測試"}
+    assert outer["pid"] == os.getpid() and outer["peak_rss"] > 0
+    assert {event["pid"] for event in output["events"] if event["name"] == "hash_file"} != {
+        os.getpid()
+    }
+    assert not [name for name in os.listdir(temp_dir) if name.endswith(".part")]
+
+
+def test_chrome_trace_format(temp_dir, monkeypatch):
+    """chrome 格式輸出完整事件 (ph = X)，時間單位為微秒"""
+    profile_path = temp_dir / "trace.json"
+    monkeypatch.setattr(Config, "PROFILE_PATH", str(profile_path))
+    monkeypatch.setattr(Config, "PROFILE_FORMAT", "chrome")
+
+    with sk_cht.profile_span("phase"):
+        pass
+    sk_cht.finish_profile()
+
+    (event,) = json.loads(profile_path.read_text(encoding="utf-8"))["traceEvents"]
+    assert event["name"] == "phase" and event["ph"] == "X"
+    assert event["ts"] > 1e15 and "cpu" in event["args"]
+
+
+def test_disabled_profile_writes_nothing(temp_dir, monkeypatch):
+    """未啟用時不產生任何檔案"""
+    monkeypatch.setattr(Config, "PROFILE_PATH", "")
+    with sk_cht.profile_span("phase"):
+        pass
+    assert sk_cht._profile_stream is None
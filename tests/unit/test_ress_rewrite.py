@@ -0,0 +1,68 @@
+"""測試共用 .resS 的重寫"""
+import UnityPy
+
+import sk_cht
+from benchmarks.unity_builders import build_bundle_file, build_serialized_file, tpk_typetree_node
+
+RESS_PATH = "archive:/CAB-tex/CAB-tex.resS"
+
+
+def _texture(name, offset, size):
+    return {
+        "m_Name": name,
+        "m_IsAlphaChannelOptional": False,
+        "m_Width": 4,
+        "m_Height": 4,
+        "m_CompleteImageSize": size,
+        "m_MipsStripped": 0,
+        "m_TextureFormat": 4,  # RGBA32
+        "m_MipCount": 1,
+        "m_IsReadable": False,
+        "m_IsPreProcessed": False,
+        "m_IgnoreMipmapLimit": False,
+        "m_MipmapLimitGroupName": "",
+        "m_StreamingMipmaps": False,
+        "m_StreamingMipmapsPriority": 0,
+        "m_ImageCount": 1,
+        "m_TextureDimension": 2,
+        "m_TextureSettings": {
+            "m_FilterMode": 1,
+            "m_Aniso": 1,
+            "m_MipBias": 0.0,
+            "m_WrapU": 0,
+            "m_WrapV": 0,
+            "m_WrapW": 0,
+        },
+        "m_LightmapFormat": 0,
+        "m_ColorSpace": 1,
+        "m_PlatformBlob": [],
+        "image data": b"",
+        "m_StreamData": {"offset": offset, "size": size, "path": RESS_PATH},
+    }
+
+
+def test_untouched_texture_survives_resS_rewrite(temp_dir):
+    """只替換其中一張紋理時，另一張的資料應原樣保留並指向新的 offset"""
+    node = tpk_typetree_node(28)
+    first, second = bytes([1]) * 64, bytes([2]) * 64
+    serialized = build_serialized_file(
+        [(1, 28, node, _texture("replaced", 0, 64)), (2, 28, node, _texture("kept", 64, 64))]
+    )
+    path = temp_dir / "tex.bundle"
+    path.write_bytes(
+        build_bundle_file([("CAB-tex", serialized, 4), ("CAB-tex.resS", first + second, 0)])
+    )
+
+    env = UnityPy.load(str(path))
+    bundle = env.file
+    textures = {obj.peek_name(): obj.read() for obj in env.objects}
+    payload = bytes([9]) * 128
+    total = sk_cht.rewrite_resS(bundle, "CAB-tex.resS", [(textures["replaced"], payload)])
+    textures["replaced"].save()
+    assert total == 192
+
+    reloaded = UnityPy.load(bundle.save())
+    assert reloaded.file.files["CAB-tex.resS"].bytes == payload + second
+    streams = {obj.peek_name(): obj.read().m_StreamData for obj in reloaded.objects}
+    assert (streams["replaced"].offset, streams["replaced"].size) == (0, 128)
+    assert (streams["kept"].offset, streams["kept"].size) == (128, 64)
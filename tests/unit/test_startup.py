@@ -0,0 +1,62 @@
+"""測試延遲匯入：不處理 Unity 檔案的路徑不應載入 UnityPy"""
+import json
+import os
+import subprocess
+import sys
+
+import sk_cht
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+HEAVY_MODULES = ("UnityPy", "PIL", "etcpak")
+# 目前約 0.2 秒；eager 匯入 UnityPy 時超過 1 秒
+IMPORT_BUDGET = 0.6
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import sk_cht
+elapsed = time.perf_counter() - start
+for argv in {commands!r}:
+    try:
+        sk_cht.main(argv)
+    except SystemExit:
+        pass
+loaded = sorted({{name.split(".")[0] for name in sys.modules}} & {heavy!r})
+print(json.dumps({{"elapsed": elapsed, "loaded": loaded}}))
+"""
+
+
+def _probe(tmp_path, commands=()):
+    """在乾淨的子程序中匯入 sk_cht 並執行指令，回傳 (輸出行, 結果)"""
+    code = PROBE.format(commands=list(commands), heavy=set(HEAVY_MODULES))
+    env = dict(os.environ, PYTHONPATH=ROOT, PYTHONDONTWRITEBYTECODE="1")
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=tmp_path, env=env, capture_output=True, text=True, encoding="utf-8", check=True,
+    )
+    lines = completed.stdout.splitlines()
+    return lines[:-1], json.loads(lines[-1])
+
+
+def test_import_is_fast_and_silent(tmp_path):
+    """匯入時不輸出任何訊息、不載入重量級相依套件，且在時間預算內完成"""
+    output, result = _probe(tmp_path)
+
+    assert output == []
+    assert result["loaded"] == []
+    assert result["elapsed"] < IMPORT_BUDGET
+
+
+def test_restore_and_verify_skip_unitypy(tmp_path):
+    """還原、檢查與說明頁面皆不需載入 UnityPy"""
+    _, result = _probe(tmp_path, [["restore"], ["verify"], ["--help"]])
+    assert result["loaded"] == []
+
+
+def test_bc7_patch_applied_on_first_use():
+    """首次使用 UnityPy 相關物件時自動套用 BC7 補丁"""
+    sk_cht.TextureFormat.BC7
+    converter = sk_cht.Texture2DConverter.resolve()
+
+    assert converter.compress_etcpak is sk_cht.patched_compress_etcpak
+    assert sk_cht.original_compress_etcpak is not sk_cht.patched_compress_etcpak
@@ -0,0 +1,72 @@
+"""測試 mmap 載入與串流輸出"""
+from io import BytesIO
+
+import pytest
+import UnityPy
+
+import sk_cht
+
+
+def test_streamed_writer_matches_save_for_unchanged_file(text_assets_file):
+    """未修改時串流輸出應與原始檔案完全相同"""
+    env = UnityPy.load(str(text_assets_file))
+    out = BytesIO()
+
+    size = sk_cht.SerializedFileWriter(env.file).write_to(out)
+
+    assert out.getvalue() == text_assets_file.read_bytes()
+    assert size == len(out.getvalue())
+
+
+def test_mapped_env_streamed_save_matches_unitypy_save(text_assets_file, temp_dir):
+    """mmap 載入並修改後，串流輸出應與 UnityPy 的 save() 位元組相同"""
+    env = sk_cht.load_env_mapped(str(text_assets_file))
+    for obj in env.objects:
+        data = obj.read()
+        if data.m_Name == "ZH_General":
+            data.m_Script = "替換後的一般文字，長度與原本不同"
+            data.save()
+    expected = env.file.save()
+    output_path = temp_dir / "out.assets"
+
+    sk_cht.save_unity_file_streamed(env.file, str(output_path))
+    sk_cht.close_mapped_env(env)
+
+    assert output_path.read_bytes() == expected
+    reloaded = UnityPy.load(str(output_path))
+    scripts = {o.read().m_Name: o.read().m_Script for o in reloaded.objects}
+    assert scripts["ZH_General"] == "替換後的一般文字，長度與原本不同"
+    assert scripts["EN_General"] == "english"
+
+
+def test_streamed_bundle_matches_save_without_compression(text_bundle_file, temp_dir):
+    """不壓縮時串流輸出的 Bundle 應與 BundleFile.save() 完全相同"""
+    env = UnityPy.load(str(text_bundle_file))
+    data = next(o for o in env.objects if o.read().m_Name == "asset_3").read()
+    data.m_Script = "修改後"
+    data.save()
+    expected = env.file.save()
+    output_path = temp_dir / "out.bundle"
+
+    sk_cht.save_unity_file_streamed(env.file, str(output_path))
+
+    assert output_path.read_bytes() == expected
+
+
+@pytest.mark.parametrize("packer", ["lz4", "lzma"])
+def test_streamed_bundle_with_compression_round_trips(text_bundle_file, temp_dir, packer):
+    """壓縮輸出重新載入後，內容與 FileWrapper 替換的 .resS 應保持一致"""
+    env = UnityPy.load(str(text_bundle_file))
+    bundle = env.file
+    new_ress = bytes(300000)
+    bundle.files["CAB-sample.resS"] = sk_cht.FileWrapper(
+        bundle.files["CAB-sample.resS"], BytesIO(new_ress)
+    )
+    output_path = temp_dir / f"out_{packer}.bundle"
+
+    sk_cht.save_unity_file_streamed(bundle, str(output_path), packer)
+
+    reloaded = UnityPy.load(str(output_path))
+    assert reloaded.file.files["CAB-sample.resS"].bytes == new_ress
+    names = sorted(o.read().m_Name for o in reloaded.objects)
+    assert names == sorted(f"asset_{i}" for i in range(1, 40))
@@ -3,6 +3,10 @@ import pytest
 import json
 from unittest.mock import Mock, patch, mock_open
 
+import UnityPy
+
+import sk_cht
+
 
 class TestTextAssetProcessing:
     """測試文字資產處理功能"""
@@ -60,3 +64,105 @@ class TestTextAssetProcessing:
         # 這個測試驗證文字資產列表是否完整
         # 實際的測試邏輯需要在重構後實現
         assert len(expected_assets) == 36  # 驗證我們有正確數量的資產
+        assert set(sk_cht.TEXT_TARGET_ASSETS) == expected_assets
+
+
+@pytest.fixture
+def text_source(temp_dir, monkeypatch):
+    """建立 CHT/Text 資料夾並將 Config 指向它"""
+    folder = temp_dir / "CHT" / "Text"
+    folder.mkdir(parents=True)
+    monkeypatch.setattr(sk_cht.Config, "CHT_FOLDER_PATH", str(temp_dir / "CHT"))
+    monkeypatch.setattr(sk_cht.Config, "PREBAKED_PACK_PATH", "")
+    return folder
+
+
+def test_raw_script_matches_decoded_save(text_assets_file, text_source, monkeypatch):
+    """直接寫入原始位元組的結果應與經 UnityPy 解碼重新序列化的結果相同"""
+    (text_source / "ZH_General.txt").write_bytes("新的一般文字\r\n第二行".encode("utf-8"))
+    (text_source / "ZH_UI.txt").write_bytes(b"\xff\xfe invalid utf-8")
+
+    outputs = []
+    for raw_mode in (True, False):
+        monkeypatch.setattr(sk_cht.Config, "TEXT_RAW_SCRIPT", raw_mode)
+        env = UnityPy.load(str(text_assets_file))
+        with patch.object(sk_cht, "splice_text_asset_script", wraps=sk_cht.splice_text_asset_script) as splice:
+            sk_cht.process_text_assets(env, "Text")
+        assert splice.called == raw_mode
+        outputs.append(env.file.save())
+
+    assert outputs[0] == outputs[1]
+
+
+def test_unchanged_text_is_not_modified(text_assets_file, text_source, capsys):
+    """內容與遊戲檔案相同的文字不會修改物件"""
+    (text_source / "ZH_General.txt").write_bytes("原始一般文字".encode("utf-8"))
+    (text_source / "ZH_UI.txt").write_bytes("新的介面".encode("utf-8"))
+    env = UnityPy.load(str(text_assets_file))
+
+    sk_cht.process_text_assets(env, "Text")
+
+    objects = {obj.path_id: obj for obj in env.objects}
+    assert not objects[1].data  # 未呼叫 set_raw_data
+    reloaded = UnityPy.load(env.file.save())
+    assert {o.read().m_Name: o.read().m_Script for o in reloaded.objects}["ZH_UI"] == "新的介面"
+    output = capsys.readouterr().out
+    assert "已替換 1 個" in output and "1 個文本內容未變更" in output
+
+
+def test_prefetch_reports_invalid_utf8(text_source, capsys):
+    """預先讀取時略過不存在的檔案，並對非 UTF-8 內容發出警告"""
+    (text_source / "ZH_UI.txt").write_bytes(b"ok \xff")
+    (text_source / "ZH_General.txt").write_bytes("正常".encode("utf-8"))
+
+    sources = sk_cht.prefetch_text_sources(sk_cht.build_text_layer_index([str(text_source)]))
+
+    assert sources == {"ZH_General": "正常".encode("utf-8"), "ZH_UI": b"ok \xff"}
+    assert "[警告] ZH_UI.txt 第 3 位元組不是有效的 UTF-8" in capsys.readouterr().out
+
+
+def test_overlay_layers_merge_per_asset(text_assets_file, text_source, monkeypatch):
+    """疊加層逐檔覆蓋基底，後面的疊加層優先"""
+    (text_source / "ZH_General.txt").write_bytes("基底一般".encode("utf-8"))
+    (text_source / "ZH_UI.txt").write_bytes("基底介面".encode("utf-8"))
+    overlays = text_source.parent / sk_cht.TEXT_OVERLAY_FOLDER
+    for name, text in (("fixes", "修正介面"), ("late", "最後介面")):
+        (overlays / name).mkdir(parents=True)
+        (overlays / name / "ZH_UI.txt").write_bytes(text.encode("utf-8"))
+    (overlays / "fixes" / "EN_General.txt").write_bytes(b"not a target")
+
+    layer_index = sk_cht.build_text_layer_index(
+        sk_cht.text_layer_folders(("Text", "fixes", "late"))
+    )
+    assert layer_index == {
+        "ZH_General": str(text_source / "ZH_General.txt"),
+        "ZH_UI": str(overlays / "late" / "ZH_UI.txt"),
+    }
+    assert sk_cht.list_text_overlays() == ["fixes", "late"]
+
+    env = UnityPy.load(str(text_assets_file))
+    sk_cht.process_text_assets(env, ("Text", "fixes", "late"))
+    reloaded = UnityPy.load(env.file.save())
+    scripts = {o.read().m_Name: o.read().m_Script for o in reloaded.objects}
+    assert scripts["ZH_General"] == "基底一般" and scripts["ZH_UI"] == "最後介面"
+
+
+def test_patch_command_accepts_overlays():
+    """patch 子命令可重複指定 --overlay"""
+    args = sk_cht.build_arg_parser().parse_args(
+        ["patch", "--text", "Text_Chs", "--font", "new", "--overlay", "fixes", "--overlay", "late"]
+    )
+    assert args.overlay == ["fixes", "late"]
+
+
+def test_overlay_paths_resolve_under_overlays_folder(text_source, temp_dir, capsys):
+    """相對的疊加層名稱位於 CHT/overlays 下，絕對路徑原樣使用；缺少的疊加層視為錯誤"""
+    outside = temp_dir / "elsewhere"
+    outside.mkdir()
+    folders = sk_cht.text_layer_folders(("Text", "rel/dir", str(outside)))
+
+    overlays = text_source.parent / sk_cht.TEXT_OVERLAY_FOLDER
+    assert folders == [str(text_source), str(overlays / "rel/dir"), str(outside)]
+    assert not sk_cht.check_text_layers(("Text", "rel/dir", str(outside)))
+    assert str(overlays / "rel/dir") in capsys.readouterr().out
+    assert sk_cht.check_text_layers(("Text", str(outside)))
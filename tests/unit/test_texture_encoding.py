@@ -0,0 +1,127 @@
+"""測試紋理編碼：共享記憶體平行處理與壓縮紋理快取"""
+import os
+
+import pytest
+from PIL import Image
+from UnityPy.enums import TextureFormat
+
+import sk_cht
+
+
+def _gradient(mode, size, seed):
+    img = Image.new("RGBA", size)
+    img.putdata([((x * 7 + seed) % 256, (y * 5) % 256, seed, (x + y) % 256)
+                 for y in range(size[1]) for x in range(size[0])])
+    return img.convert(mode)
+
+
+def test_parallel_encoding_matches_serial():
+    """程序池編碼結果與順序應與依序編碼完全相同"""
+    jobs = [
+        (_gradient("RGBA", (16, 8), 1), TextureFormat.RGBA32, 0),
+        (_gradient("RGBA", (8, 8), 2), TextureFormat.Alpha8, 0),
+        (_gradient("RGB", (8, 4), 3), TextureFormat.BC7, 0),
+    ]
+
+    serial = sk_cht.encode_textures_parallel(jobs, max_workers=1)
+    parallel = sk_cht.encode_textures_parallel(jobs, max_workers=2)
+
+    assert parallel == serial
+    assert [fmt for _, fmt in parallel] == [
+        TextureFormat.RGBA32, TextureFormat.Alpha8, TextureFormat.BC7
+    ]
+
+
+def test_palette_images_are_shared_as_rgba():
+    """無法直接共享的影像模式應先轉成 RGBA"""
+    palette = _gradient("RGBA", (8, 8), 4).convert("P")
+    jobs = [(palette, TextureFormat.RGBA32, 0), (palette.copy(), TextureFormat.RGBA32, 0)]
+
+    (first, _), (second, _) = sk_cht.encode_textures_parallel(jobs, max_workers=2)
+
+    expected, _ = sk_cht.Texture2DConverter.image_to_texture2d(
+        palette.convert("RGBA"), TextureFormat.RGBA32, 0
+    )
+    assert first == second == expected
+
+
+def test_encoded_textures_are_served_from_cache(temp_dir, monkeypatch):
+    """第二次編碼同一張 PNG 應直接取自快取，格式不同則重新編碼"""
+    monkeypatch.setattr(sk_cht.Config, "CACHE_FOLDER", str(temp_dir / "cht_cache"))
+    png_path = temp_dir / "logo.png"
+    _gradient("RGBA", (8, 8), 5).save(png_path)
+    job = (str(png_path), TextureFormat.BC7, 0, None)
+
+    [first] = sk_cht.encode_png_textures([job])
+
+    def fail(*args, **kwargs):
+        raise AssertionError("快取命中時不應重新編碼")
+
+    monkeypatch.setattr(sk_cht, "encode_textures_parallel", fail)
+    [second] = sk_cht.encode_png_textures([job])
+    assert second == first
+    assert first[1:] == (TextureFormat.BC7, (8, 8))
+
+    with pytest.raises(AssertionError):
+        sk_cht.encode_png_textures([(str(png_path), TextureFormat.RGBA32, 0, None)])
+
+
+@pytest.mark.parametrize("profile", sorted(sk_cht.BC7_PROFILES))
+def test_bc7_profiles_produce_valid_blocks(profile, monkeypatch):
+    """每個 BC7 設定檔都應輸出完整的區塊，且解碼後品質合理"""
+    monkeypatch.setattr(sk_cht.Config, "BC7_PROFILE", profile)
+    img = _gradient("RGBA", (16, 16), 6)
+
+    compressed = sk_cht.patched_compress_etcpak(img.tobytes(), 16, 16, TextureFormat.BC7)
+
+    assert len(compressed) == 16 * 16
+    assert sk_cht.bc7_psnr(img.tobytes(), compressed, 16, 16) > 25
+
+
+def test_bc7_profile_changes_texture_cache_key(monkeypatch):
+    """BC7 設定檔是編碼參數的一部分，切換時快取鍵應不同"""
+    def key():
+        return sk_cht.texture_cache_key("0" * 64, TextureFormat.BC7, 0, (16, 16))
+
+    balanced = key()
+    monkeypatch.setattr(sk_cht.Config, "BC7_PROFILE", "fast")
+
+    assert key() != balanced
+
+
+def test_tiled_bc7_matches_single_call():
+    """條帶平行壓縮的輸出應與單次呼叫逐位元組相同"""
+    width, height = 64, 40
+    data = os.urandom(width * height * 4)
+
+    single = sk_cht.etcpak.compress_bc7(data, width, height, sk_cht.make_bc7_params("balanced"))
+    tiled = sk_cht.compress_bc7_tiled(data, width, height, "balanced", workers=2)
+
+    assert tiled == single
+
+
+def test_strip_pool_is_shared_across_batch(monkeypatch):
+    """同一批紋理的條帶壓縮共用一個程序池，且結果與單次呼叫相同"""
+    created = []
+
+    class CountingPool(sk_cht.ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            created.append(self)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(sk_cht, "ProcessPoolExecutor", CountingPool)
+    monkeypatch.setattr(sk_cht, "BC7_TILED_MIN_PIXELS", 0)
+    monkeypatch.setattr(sk_cht.Config, "BC7_WORKERS", 2)
+    monkeypatch.setattr(sk_cht.Config, "REPORT_TEXTURE_PSNR", False)
+    width, height = 32, 16
+    images = [os.urandom(width * height * 4) for _ in range(3)]
+
+    with sk_cht.bc7_strip_pool():
+        tiled = [
+            sk_cht.patched_compress_etcpak(data, width, height, TextureFormat.BC7)
+            for data in images
+        ]
+
+    assert len(created) == 1
+    params = sk_cht.make_bc7_params(sk_cht.Config.BC7_PROFILE)
+    assert tiled == [sk_cht.etcpak.compress_bc7(data, width, height, params) for data in images]
@@ -0,0 +1,64 @@
+"""測試 TypeTree 產生器的磁碟快取"""
+import pytest
+from UnityPy.helpers.TypeTreeGenerator import TypeTreeGenerator
+
+import sk_cht
+from benchmarks.unity_builders import tpk_typetree_node
+
+
+@pytest.fixture
+def typetree_game(temp_dir, monkeypatch):
+    """建立只含 Managed DLL 的假遊戲目錄，並記錄 DLL 載入與反射次數"""
+    data_path = temp_dir / "Game_Data"
+    managed = data_path / "Managed"
+    managed.mkdir(parents=True)
+    (managed / "Assembly-CSharp.dll").write_bytes(b"dll v1")
+    monkeypatch.setattr(sk_cht.Config, "GAME_ROOT_PATH", str(temp_dir))
+    monkeypatch.setattr(sk_cht.Config, "SILKSONG_DATA_PATH", str(data_path))
+    monkeypatch.setattr(sk_cht.Config, "CACHE_FOLDER", str(temp_dir / "cht_cache"))
+    monkeypatch.setattr(sk_cht.sys, "platform", "linux")
+
+    calls = {"load": 0, "reflect": 0}
+
+    def fake_load(self, root_dir):
+        calls["load"] += 1
+
+    def fake_get_nodes_up(self, assembly, fullname):
+        calls["reflect"] += 1
+        return tpk_typetree_node(114)
+
+    monkeypatch.setattr(TypeTreeGenerator, "load_local_game", fake_load)
+    monkeypatch.setattr(TypeTreeGenerator, "get_nodes_up", fake_get_nodes_up)
+    return managed, calls
+
+
+def test_typetree_rows_round_trip():
+    """攤平後重建的 TypeTree 應保留層級、類型與名稱"""
+    root = tpk_typetree_node(114)
+
+    rebuilt = sk_cht.typetree_from_rows(sk_cht.typetree_to_rows(root))
+
+    assert sk_cht.typetree_to_rows(rebuilt) == sk_cht.typetree_to_rows(root)
+    assert [c.m_Name for c in rebuilt.m_Children] == [c.m_Name for c in root.m_Children]
+
+
+def test_warm_cache_skips_dll_reflection(typetree_game):
+    """第二次執行應直接使用快取，不再載入 DLL"""
+    _, calls = typetree_game
+    first = sk_cht.create_typetree_generator().get_nodes_up("Assembly-CSharp", "TMP_FontAsset")
+
+    second = sk_cht.create_typetree_generator().get_nodes_up("Assembly-CSharp", "TMP_FontAsset")
+
+    assert calls == {"load": 1, "reflect": 1}
+    assert sk_cht.typetree_to_rows(second) == sk_cht.typetree_to_rows(first)
+
+
+def test_changed_dll_invalidates_cache(typetree_game):
+    """DLL 內容改變後快取應失效並重新反射"""
+    managed, calls = typetree_game
+    sk_cht.create_typetree_generator().get_nodes_up("Assembly-CSharp", "TMP_FontAsset")
+    (managed / "Assembly-CSharp.dll").write_bytes(b"dll v2 with different size")
+
+    sk_cht.create_typetree_generator().get_nodes_up("Assembly-CSharp", "TMP_FontAsset")
+
+    assert calls == {"load": 2, "reflect": 2}